@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from app.config import settings
-from app.models import User, Contract, Analysis
+from app.models import User, Contract, Analysis, StoredBlob
 from sqlmodel import SQLModel
 
 # this is the Alembic Config object, which provides
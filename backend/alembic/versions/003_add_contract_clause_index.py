@@ -0,0 +1,28 @@
+"""Add contract clause index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index de segmentation (articles/clauses) calculé une fois par contrat
+    op.add_column('contracts', sa.Column('clause_index', JSONB, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('contracts', 'clause_index')
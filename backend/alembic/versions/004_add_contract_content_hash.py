@@ -0,0 +1,29 @@
+"""Add contract content hash
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SHA-256 du fichier, calculé pendant l'upload
+    op.add_column('contracts', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_contracts_content_hash', 'contracts', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contracts_content_hash', table_name='contracts')
+    op.drop_column('contracts', 'content_hash')
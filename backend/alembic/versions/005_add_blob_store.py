@@ -0,0 +1,40 @@
+"""Add content-addressed blob store and analysis provenance
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Un fichier par contenu, partagé par les contrats identiques
+    op.create_table(
+        'stored_blobs',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('file_path', sa.String(500), nullable=False),
+        sa.Column('size', sa.Integer, nullable=False),
+        sa.Column('ref_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+    # Modèle et version de prompt: clé de réutilisation d'une analyse
+    op.add_column('analyses', sa.Column('model', sa.String(100), nullable=True))
+    op.add_column('analyses', sa.Column('prompt_version', sa.String(20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analyses', 'prompt_version')
+    op.drop_column('analyses', 'model')
+    op.drop_table('stored_blobs')
@@ -0,0 +1,30 @@
+"""Add contract batch id
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lot d'upload groupé (suivi d'avancement agrégé)
+    op.add_column('contracts', sa.Column('batch_id', UUID(as_uuid=True), nullable=True))
+    op.create_index('ix_contracts_batch_id', 'contracts', ['batch_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contracts_batch_id', table_name='contracts')
+    op.drop_column('contracts', 'batch_id')
@@ -0,0 +1,43 @@
+"""Add LLM result cache entries
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Niveau durable du cache des résultats du LLM (Redis en premier niveau)
+    op.create_table(
+        'llm_cache_entries',
+        sa.Column('cache_key', sa.String(200), primary_key=True),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('prompt_hash', sa.String(64), nullable=False),
+        sa.Column('result', sa.JSON, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_llm_cache_entries_kind', 'llm_cache_entries', ['kind'])
+    op.create_index('ix_llm_cache_entries_created_at', 'llm_cache_entries', ['created_at'])
+
+    # Entrée de cache d'une analyse: supprimée avec le compte de l'utilisateur
+    op.add_column('analyses', sa.Column('llm_cache_key', sa.String(200), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analyses', 'llm_cache_key')
+    op.drop_index('ix_llm_cache_entries_created_at', table_name='llm_cache_entries')
+    op.drop_index('ix_llm_cache_entries_kind', table_name='llm_cache_entries')
+    op.drop_table('llm_cache_entries')
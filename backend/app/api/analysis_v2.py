@@ -6,20 +6,48 @@ Ce module expose les nouveaux endpoints d'analyse avec:
 - Disclaimer obligatoire
 """
 
+import logging
 from typing import Any, cast
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlmodel import col
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.config import settings
 from app.core.security import get_current_user_id
 from app.core.legal_search import search_legal_sources
-from app.db.session import get_db
-from app.models import Contract, Analysis
+from app.core.locks import DUPLICATE_ANALYSIS_METRIC, analysis_lease, claim_lease, release_lease
+from app.core.metrics import increment_daily
+from app.db.session import AsyncSessionLocal, get_db, get_redis_client
+from app.models import Contract, Analysis, AnalysisStatus, ContractStatus
 from app.services.analysis_enhanced import analyze_contract_enhanced, verify_analysis_quality
+from app.services.clause_segmenter import load_or_segment
+from app.services.llm_cache import (
+    KIND_LEGAL_ANALYSIS,
+    cache_key,
+    get_cached_result,
+    store_cached_result,
+)
+from app.services.progress_events import (
+    STAGE_COMPLETED,
+    STAGE_EXTRACTING,
+    STAGE_FAILED,
+    STAGE_SCORING,
+    clear_progress,
+    publish_progress,
+)
 from app.prompts.legal_analysis import get_disclaimer
+from app.services.text_extractor import (
+    DocumentTooComplexError,
+    ExtractionBusyError,
+    extract_document_async,
+)
+from app.services.text_normalizer import describe_extraction, normalize_pages
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analysis/v2", tags=["analysis-v2"])
 
@@ -48,7 +76,8 @@ async def analyze_contract_v2(
         Analyse complète avec métadonnées de confiance
 
     Raises:
-        HTTPException: Si contrat non trouvé ou erreur d'analyse
+        HTTPException: Si contrat non trouvé, déjà en cours d'analyse (409) ou
+            erreur d'analyse
     """
     # Récupère le contrat
     result = await db.execute(
@@ -72,64 +101,23 @@ async def analyze_contract_v2(
             detail="Ce contrat a déjà échoué lors d'une analyse précédente",
         )
 
-    # Récupère le texte du contrat (à adapter selon votre stockage)
-    # Note: Supposons que vous avez une méthode pour extraire le texte
-    contract_text = await _extract_contract_text(contract)
-
-    if not contract_text:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Impossible d'extraire le texte du contrat",
-        )
-
-    # Met à jour le statut
-    contract.status = "processing"
-    await db.commit()
-
+    # Même bail que les workers: pas deux analyses du même contrat en parallèle
+    redis = await get_redis_client()
+    lease = analysis_lease(redis, str(contract_id))
     try:
-        # Lance l'analyse améliorée
-        analysis_result = await analyze_contract_enhanced(
-            contract_text=contract_text,
-            contract_id=str(contract_id),
-            use_web_search=True,
-        )
-
-        # Vérifie la qualité de l'analyse
-        quality_check = await verify_analysis_quality(analysis_result)
-
-        # Ajoute les infos de qualité
-        analysis_result["_quality_check"] = quality_check
-
-        # Crée l'entrée Analysis en base
-        analysis = Analysis(
-            contract_id=contract_id,
-            status="completed",
-            results=analysis_result,
-            score_equity=analysis_result.get("scores_globaux", {}).get("equilibre"),
-            score_clarity=analysis_result.get("scores_globaux", {}).get("clarte"),
-        )
-        db.add(analysis)
-
-        # Met à jour le contrat
-        contract.status = "completed"
-        await db.commit()
-        await db.refresh(analysis)
-
-        # Ajoute l'ID de l'analyse au résultat
-        analysis_result["_analysis_id"] = str(analysis.id)
-        analysis_result["_contract_id"] = str(contract_id)
-
-        return analysis_result
-
-    except Exception as e:
-        # En cas d'erreur, met à jour le statut
-        contract.status = "failed"
-        await db.commit()
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de l'analyse: {str(e)}",
-        )
+        if not await claim_lease(lease):
+            await increment_daily(DUPLICATE_ANALYSIS_METRIC, redis=redis)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Ce contrat est déjà en cours d'analyse",
+            )
+        try:
+            async with lease.heartbeat():
+                return await _analyze_inline(contract, db, redis)
+        finally:
+            await release_lease(lease)
+    finally:
+        await redis.aclose()
 
 
 @router.get("/contracts/{contract_id}/analysis", response_model=dict[str, Any])
@@ -240,25 +228,151 @@ async def get_legal_disclaimer() -> dict[str, str]:
 # ============================================================================
 
 
-async def _extract_contract_text(contract: Contract) -> str | None:
-    """Extrait le texte d'un contrat.
+async def _analyze_inline(contract: Contract, db: AsyncSession, redis: Redis) -> dict[str, Any]:
+    """Analyse un contrat dans la requête (voir `analyze_contract_v2`).
 
-    À adapter selon votre méthode de stockage (PDF, DOCX, etc.)
+    Les étapes sont publiées comme celles des workers (`GET /contracts/{id}/events`).
+    """
+    contract_id = contract.id
+
+    async def on_progress(stage: str) -> None:
+        await publish_progress(redis, str(contract_id), stage)
+
+    await clear_progress(redis, str(contract_id))
+    await on_progress(STAGE_EXTRACTING)
+
+    try:
+        # Récupère le texte du contrat (hors boucle d'événements, 503 si pool saturé)
+        extracted = await _extract_contract_text(contract)
+
+        if not extracted or not extracted[0]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Impossible d'extraire le texte du contrat",
+            )
+    except HTTPException as e:
+        # Les clients du flux d'avancement ne restent pas en attente
+        await publish_progress(redis, str(contract_id), STAGE_FAILED, error=str(e.detail))
+        raise
+
+    contract_text, extraction_meta = extracted
+
+    # Segmente le texte en articles une seule fois par contrat
+    clause_index = load_or_segment(contract.clause_index, contract_text)
+    contract.clause_index = clause_index.as_dict()
+
+    # Met à jour le statut
+    contract.status = ContractStatus.PROCESSING
+    await db.commit()
+
+    try:
+        # Texte déjà analysé avec le même modèle et les mêmes prompts: relu du cache
+        key = cache_key(KIND_LEGAL_ANALYSIS, settings.ANTHROPIC_MODEL, contract_text)
+        cached = await get_cached_result(key, redis, AsyncSessionLocal)
+        if cached is not None:
+            analysis_result = cached
+        else:
+            # Lance l'analyse améliorée
+            analysis_result = await analyze_contract_enhanced(
+                contract_text=contract_text,
+                contract_id=str(contract_id),
+                use_web_search=True,
+                clause_index=clause_index,
+                on_progress=on_progress,
+            )
+            await store_cached_result(key, analysis_result, redis, AsyncSessionLocal)
+
+        # Vérifie la qualité de l'analyse
+        await on_progress(STAGE_SCORING)
+        quality_check = await verify_analysis_quality(analysis_result)
+
+        # Ajoute les infos de qualité
+        analysis_result["_quality_check"] = quality_check
+        analysis_result["_extraction"] = extraction_meta
+
+        # Crée l'entrée Analysis en base
+        analysis = Analysis(
+            contract_id=contract_id,
+            status=AnalysisStatus.COMPLETED,
+            results=analysis_result,
+            score_equity=analysis_result.get("scores_globaux", {}).get("equilibre"),
+            score_clarity=analysis_result.get("scores_globaux", {}).get("clarte"),
+            llm_cache_key=str(key) if key is not None else None,
+        )
+        db.add(analysis)
+
+        # Met à jour le contrat
+        contract.status = ContractStatus.COMPLETED
+        await db.commit()
+        await db.refresh(analysis)
+
+        # Ajoute l'ID de l'analyse au résultat
+        analysis_result["_analysis_id"] = str(analysis.id)
+        analysis_result["_contract_id"] = str(contract_id)
+
+        await publish_progress(
+            redis,
+            str(contract_id),
+            STAGE_COMPLETED,
+            score_equity=analysis.score_equity,
+            score_clarity=analysis.score_clarity,
+        )
+        return analysis_result
+
+    except Exception as e:
+        # En cas d'erreur, met à jour le statut
+        contract.status = ContractStatus.FAILED
+        await db.commit()
+        await publish_progress(redis, str(contract_id), STAGE_FAILED, error=str(e))
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de l'analyse: {str(e)}",
+        )
+
+
+async def _extract_contract_text(contract: Contract) -> tuple[str, dict[str, Any]] | None:
+    """Extrait et normalise le texte d'un contrat depuis son fichier stocké.
+
+    L'extraction tourne dans le pool borné de `text_extractor` pour ne jamais
+    bloquer la boucle d'événements, et s'arrête au budget `EXTRACTION_CHAR_BUDGET`.
 
     Args:
         contract: Objet Contract
 
     Returns:
-        Texte extrait ou None
-    """
-    # TODO: Implémenter l'extraction selon votre stockage
-    # Pour l'instant, retourne un placeholder
-
-    # Exemple si vous stockez le texte en base:
-    # return contract.extracted_text
-
-    # Exemple si vous devez lire un fichier:
-    # from app.core.pdf_parser import extract_text_from_pdf
-    # return await extract_text_from_pdf(contract.file_path)
+        (texte normalisé, métadonnées d'extraction) ou None si l'extraction échoue
 
-    return "Texte du contrat à extraire"
+    Raises:
+        HTTPException: 503 si le pool d'extraction est saturé, 422 si le document
+            dépasse les limites d'extraction (pages, durée, mémoire)
+    """
+    try:
+        extraction = await extract_document_async(
+            contract.file_path,
+            contract.file_type,
+            max_chars=settings.EXTRACTION_CHAR_BUDGET,
+            content_hash=contract.content_hash,
+        )
+    except ExtractionBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service d'extraction saturé, réessayez dans quelques instants",
+            headers={"Retry-After": str(settings.EXTRACTION_RETRY_AFTER_SECONDS)},
+        )
+    except DocumentTooComplexError as e:
+        logger.warning(f"Contrat {contract.id} refusé à l'extraction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.as_dict(),
+        )
+    except ValueError as e:
+        logger.warning(f"Extraction impossible pour le contrat {contract.id}: {e}")
+        return None
+
+    normalized = normalize_pages(extraction.pages)
+    logger.info(
+        f"Contrat {contract.id}: normalisation -{normalized.stats.chars_saved} caractères "
+        f"(~{normalized.stats.tokens_saved} tokens)"
+    )
+    return normalized.text, describe_extraction(extraction, normalized)
@@ -3,32 +3,57 @@
 Ce module définit les endpoints pour la gestion des contrats.
 """
 
+import json
+import logging
 import os
 import shutil
+import time
+from collections.abc import AsyncIterator
 from pathlib import Path
-from typing import cast
-from uuid import UUID
+from typing import Any, cast
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import select
+from fastapi.responses import StreamingResponse
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
 from sqlmodel import col
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 from app.core.security import get_current_user_id
-from app.db.session import get_db
+from app.db.session import get_db, get_redis_client
 from app.models import (
+    BatchStatusResponse,
+    BatchUploadResponse,
     Contract,
     ContractListResponse,
     ContractResponse,
+    ContractStatusesRequest,
     Analysis,
     AnalysisStatus,
     ContractStatus,
     AnalysisStatusResponse,
     AnalysisResponse,
 )
+from app.services.analysis_reuse import apply_reused_analysis, find_reusable_analysis
+from app.services.analysis_scheduler import queue_position, schedule_analyses
+from app.services.blob_store import discard_uploads, store_upload
+from app.services.file_storage import FileTooLargeError
+from app.services.llm_batches import batch_mode_enabled, dispatch_batch_analyses
+from app.services.object_storage import StorageError
+from app.services.progress_events import (
+    STAGE_COMPLETED,
+    STAGE_FAILED,
+    STAGE_QUEUED,
+    progress_event,
+    stream_progress,
+)
 from app.services.text_extractor import extract_text
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
 
@@ -63,6 +88,103 @@ def validate_file(file: UploadFile) -> None:
         )
 
 
+async def _create_contract(
+    db: AsyncSession,
+    file: UploadFile,
+    user_id: UUID,
+    batch_id: UUID | None = None,
+) -> tuple[Contract, bool]:
+    """Stocke un fichier et ajoute son contrat et son analyse à la session (sans commit).
+
+    Le fichier est stocké une seule fois par contenu (reçu par blocs, empreinte
+    calculée au fil de l'eau). Si un contenu identique a déjà été analysé avec
+    le même modèle et le même prompt, l'analyse est reprise telle quelle.
+
+    Args:
+        db: Session de base de données
+        file: Fichier uploadé (déjà validé)
+        user_id: Propriétaire du contrat
+        batch_id: Lot d'upload groupé
+
+    Returns:
+        (contrat, True si l'analyse a été reprise et qu'aucune tâche n'est à lancer)
+
+    Raises:
+        HTTPException: 400 si le fichier est trop volumineux, 503 si le stockage échoue
+    """
+    ext = Path(file.filename or "").suffix.lower()
+    try:
+        stored = await store_upload(db, file, ext)
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{file.filename}: {e}" if batch_id else str(e),
+        )
+    except StorageError:
+        logger.exception("Échec de l'envoi du fichier au stockage")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Stockage des fichiers indisponible, réessayez dans quelques instants",
+        )
+
+    # Identifiant attribué ici: contrat et analyse partent dans le même commit
+    contract = Contract(
+        id=UUID(os.urandom(16).hex()[:32], version=4),
+        user_id=user_id,
+        filename=file.filename or "unknown",
+        file_path=stored.file_path,
+        file_size=stored.size,
+        file_type=file.content_type or "application/octet-stream",
+        content_hash=stored.content_hash,
+        batch_id=batch_id,
+        status=ContractStatus.PENDING,
+    )
+    analysis = Analysis(
+        contract_id=contract.id,
+        status=AnalysisStatus.PENDING,
+    )
+    db.add(contract)
+    db.add(analysis)
+
+    # Contenu identique déjà analysé (même modèle, même prompt): pas de tâche LLM
+    reusable = await find_reusable_analysis(
+        db, stored.content_hash, exclude_contract_id=contract.id
+    )
+    if reusable is not None:
+        apply_reused_analysis(reusable, analysis, contract)
+        return contract, True
+    return contract, False
+
+
+async def _dispatch_analyses(
+    contract_groups: list[list[UUID]],
+    user_id: UUID,
+    priority: bool = False,
+    bulk: bool = False,
+) -> None:
+    """Confie des analyses à la file d'analyses (voir `analysis_scheduler`).
+
+    Chaque sous-liste rassemble des contrats de contenu identique: leurs
+    pipelines d'analyse sont chaînés, de sorte que seul le premier appelle le
+    LLM et que les suivants reprennent son analyse.
+
+    Args:
+        contract_groups: Contrats à analyser, regroupés par contenu
+        user_id: Propriétaire des contrats (file équitable par utilisateur)
+        priority: Voie prioritaire (upload unitaire d'un petit fichier)
+        bulk: Analyses non interactives (upload groupé), soumises en Message
+            Batch si le mode batch est actif (voir `llm_batches`)
+    """
+    jobs = [[str(contract_id) for contract_id in contract_ids] for contract_ids in contract_groups]
+    try:
+        if bulk and batch_mode_enabled():
+            dispatch_batch_analyses(jobs)
+            return
+        await schedule_analyses(jobs, str(user_id), priority=priority)
+    except ImportError:
+        pass  # Celery non configuré, l'analyse sera faite manuellement
+
+
 @router.post("/upload", response_model=ContractResponse, status_code=status.HTTP_201_CREATED)
 async def upload_contract(
     file: UploadFile = File(...),
@@ -82,65 +204,212 @@ async def upload_contract(
     # Valide le fichier
     validate_file(file)
 
-    # Vérifie la taille du fichier
-    content = await file.read()
-    file_size = len(content)
+    try:
+        contract, reused = await _create_contract(db, file, current_user_id)
+        await db.commit()
+    except BaseException:
+        await discard_uploads(db)
+        raise
+    await db.refresh(contract)
+
+    if reused:
+        return contract
+
+    # Déclenche l'analyse asynchrone; un petit contrat passe par la voie prioritaire
+    await _dispatch_analyses(
+        [[contract.id]],
+        current_user_id,
+        priority=contract.file_size <= settings.SCHEDULER_PRIORITY_MAX_BYTES,
+    )
+
+    return contract
+
+
+@router.post("/batch", response_model=BatchUploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_contracts_batch(
+    files: list[UploadFile] = File(...),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> BatchUploadResponse:
+    """Uploader un lot de contrats pour analyse.
+
+    Tous les contrats et analyses du lot sont enregistrés dans une seule
+    transaction, puis les analyses sont mises en file en une fois (file
+    équitable: un gros lot ne retarde pas les contrats des autres utilisateurs).
+    L'avancement se suit sur `GET /contracts/batches/{batch_id}`.
+
+    Args:
+        files: Fichiers à uploader (au plus `MAX_BATCH_FILES`)
+        current_user_id: ID de l'utilisateur connecté
+        db: Session de base de données
+
+    Returns:
+        L'identifiant du lot et les contrats créés
 
-    if file_size > settings.MAX_FILE_SIZE:
+    Raises:
+        HTTPException: 400 si le lot est trop grand ou si un fichier est invalide
+            (rien n'est alors enregistré)
+    """
+    if len(files) > settings.MAX_BATCH_FILES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Fichier trop volumineux. Taille maximale: {settings.MAX_FILE_SIZE / (1024 * 1024):.0f}MB",
+            detail=f"Trop de fichiers dans le lot. Maximum: {settings.MAX_BATCH_FILES}",
         )
+    # Valide tout le lot avant de stocker quoi que ce soit
+    for file in files:
+        validate_file(file)
+
+    batch_id = uuid4()
+    contracts: list[Contract] = []
+    reused = 0
+    to_analyze: dict[str, list[UUID]] = {}
+    try:
+        for file in files:
+            contract, was_reused = await _create_contract(db, file, current_user_id, batch_id)
+            contracts.append(contract)
+            if was_reused:
+                reused += 1
+            else:
+                to_analyze.setdefault(contract.content_hash or str(contract.id), []).append(
+                    contract.id
+                )
+        await db.commit()
+    except BaseException:
+        # Fichiers déjà envoyés au stockage pour le début du lot
+        await discard_uploads(db)
+        raise
+
+    if to_analyze:
+        await _dispatch_analyses(list(to_analyze.values()), current_user_id, bulk=True)
+
+    return BatchUploadResponse(
+        batch_id=batch_id,
+        contracts=[ContractResponse.model_validate(contract) for contract in contracts],
+        reused=reused,
+    )
 
-    # Crée le dossier utilisateur
-    user_upload_dir = settings.upload_path / str(current_user_id)
-    user_upload_dir.mkdir(parents=True, exist_ok=True)
 
-    # Génère un nom de fichier unique
-    contract_id = UUID(os.urandom(16).hex()[:32], version=4)
-    ext = Path(file.filename or "").suffix.lower()
-    file_name = f"{contract_id}{ext}"
-    file_path = user_upload_dir / file_name
+@router.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(
+    batch_id: UUID,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> BatchStatusResponse:
+    """Récupérer l'avancement agrégé d'un lot de contrats.
+
+    Args:
+        batch_id: ID du lot
+        current_user_id: ID de l'utilisateur connecté
+        db: Session de base de données
 
-    # Sauvegarde le fichier
-    with open(file_path, "wb") as f:
-        f.write(content)
+    Returns:
+        Le nombre d'analyses par statut et la progression du lot
 
-    # Crée le contrat en base de données
-    contract = Contract(
-        id=contract_id,
-        user_id=current_user_id,
-        filename=file.filename or "unknown",
-        file_path=str(file_path),
-        file_size=file_size,
-        file_type=file.content_type or "application/octet-stream",
-        status=ContractStatus.PENDING,
+    Raises:
+        HTTPException: Si le lot n'existe pas ou n'appartient pas à l'utilisateur
+    """
+    result = await db.execute(
+        select(col(Analysis.status), func.count())
+        .join(Contract, col(Contract.id) == col(Analysis.contract_id))
+        .where(
+            col(Contract.batch_id) == batch_id,
+            col(Contract.user_id) == current_user_id,
+        )
+        .group_by(col(Analysis.status))
     )
+    counts = {analysis_status: count for analysis_status, count in result.all()}
+    total = sum(counts.values())
 
-    db.add(contract)
-    await db.commit()
-    await db.refresh(contract)
+    if not total:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lot non trouvé",
+        )
 
-    # Crée l'analyse associée
-    analysis = Analysis(
-        contract_id=contract.id,
-        status=AnalysisStatus.PENDING,
+    finished = counts.get(AnalysisStatus.COMPLETED, 0) + counts.get(AnalysisStatus.FAILED, 0)
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        total=total,
+        pending=counts.get(AnalysisStatus.PENDING, 0),
+        processing=counts.get(AnalysisStatus.PROCESSING, 0),
+        completed=counts.get(AnalysisStatus.COMPLETED, 0),
+        failed=counts.get(AnalysisStatus.FAILED, 0),
+        progress=round(finished / total, 4),
+        done=finished == total,
     )
-    db.add(analysis)
-    await db.commit()
 
-    # Déclenche l'analyse asynchrone via Celery si disponible
-    try:
-        from app.celery_app import celery_app
 
-        if celery_app:
-            from app.tasks.analysis import analyze_contract
+@router.post("/statuses", response_model=list[AnalysisStatusResponse])
+async def get_contract_statuses(
+    request: ContractStatusesRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> list[AnalysisStatusResponse]:
+    """Récupérer le statut des analyses de plusieurs contrats en une requête.
 
-            analyze_contract.delay(str(contract.id))
-    except ImportError:
-        pass  # Celery non configuré, l'analyse sera faite manuellement
+    Remplace un appel à `GET /contracts/{id}/status` par contrat suivi: une
+    seule requête jointe, limitée aux colonnes scalaires (les résultats JSON
+    des analyses ne sont jamais chargés). La position en file n'est pas
+    calculée (`queue_position` toujours None).
 
-    return contract
+    Args:
+        request: Contrats à suivre (par défaut, toutes les analyses en attente
+            ou en cours de l'utilisateur)
+        current_user_id: ID de l'utilisateur connecté
+        db: Session de base de données
+
+    Returns:
+        Le statut de chaque analyse trouvée; les contrats inconnus ou
+        appartenant à un autre utilisateur sont omis
+
+    Raises:
+        HTTPException: 400 si trop de contrats sont demandés
+    """
+    contract_ids = request.contract_ids
+    if contract_ids is not None and len(contract_ids) > settings.MAX_STATUS_CONTRACTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trop de contrats (maximum {settings.MAX_STATUS_CONTRACTS})",
+        )
+
+    query = (
+        select(
+            col(Analysis.id),
+            col(Analysis.contract_id),
+            col(Analysis.status),
+            col(Analysis.score_equity),
+            col(Analysis.score_clarity),
+            col(Analysis.error_message),
+            col(Analysis.created_at),
+            col(Analysis.updated_at),
+        )
+        .join(Contract, col(Contract.id) == col(Analysis.contract_id))
+        .where(col(Contract.user_id) == current_user_id)
+        .order_by(col(Analysis.created_at))
+    )
+    if contract_ids is None:
+        query = query.where(
+            col(Analysis.status).in_([AnalysisStatus.PENDING, AnalysisStatus.PROCESSING])
+        )
+    elif not contract_ids:
+        return []
+    else:
+        query = query.where(col(Contract.id).in_(contract_ids))
+
+    result = await db.execute(query)
+    return [
+        AnalysisStatusResponse(
+            contract_id=row.contract_id,
+            analysis_id=row.id,
+            status=row.status,
+            score_equity=row.score_equity,
+            score_clarity=row.score_clarity,
+            error_message=row.error_message,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in result.all()
+    ]
 
 
 @router.get("", response_model=list[ContractListResponse])
@@ -243,6 +512,10 @@ async def get_contract_status(
             detail="Analyse non trouvée",
         )
 
+    position = None
+    if analysis.status == AnalysisStatus.PENDING:
+        position = await queue_position(str(contract_id))
+
     return AnalysisStatusResponse(
         contract_id=contract_id,
         analysis_id=analysis.id,
@@ -252,9 +525,123 @@ async def get_contract_status(
         error_message=analysis.error_message,
         created_at=analysis.created_at,
         updated_at=analysis.updated_at,
+        queue_position=position,
     )
 
 
+@router.get("/{contract_id}/events")
+async def stream_contract_events(
+    contract_id: UUID,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Suivre l'avancement de l'analyse d'un contrat (Server-Sent Events).
+
+    Remplace le sondage de `GET /contracts/{id}/status`: la base n'est lue
+    qu'à l'ouverture du flux, les étapes suivantes (`extracting`,
+    `calling_model`, `scoring`...) sont relayées depuis Redis à mesure que le
+    worker les publie. Le flux se ferme après l'étape `completed` ou `failed`,
+    ou après `PROGRESS_STREAM_MAX_SECONDS` (le navigateur se reconnecte).
+
+    Args:
+        contract_id: ID du contrat
+        current_user_id: ID de l'utilisateur connecté
+        db: Session de base de données
+
+    Returns:
+        Le flux `text/event-stream`, un événement JSON par étape
+
+    Raises:
+        HTTPException: 404 si le contrat ou l'analyse n'existe pas, 503 si le
+            suivi en direct est indisponible (le client revient au sondage)
+    """
+    result = await db.execute(
+        select(Analysis)
+        .join(Contract, col(Contract.id) == col(Analysis.contract_id))
+        .where(
+            col(Contract.id) == contract_id,
+            col(Contract.user_id) == current_user_id,
+        )
+    )
+    analysis = result.scalar_one_or_none()
+
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analyse non trouvée",
+        )
+
+    # Analyse terminée: un seul événement, sans Redis
+    if analysis.status == AnalysisStatus.COMPLETED:
+        final = progress_event(
+            str(contract_id),
+            STAGE_COMPLETED,
+            score_equity=analysis.score_equity,
+            score_clarity=analysis.score_clarity,
+        )
+        return _event_stream_response(_single_event(final))
+    if analysis.status == AnalysisStatus.FAILED:
+        final = progress_event(str(contract_id), STAGE_FAILED, error=analysis.error_message)
+        return _event_stream_response(_single_event(final))
+
+    redis = await get_redis_client()
+    try:
+        await redis.ping()
+    except (RedisError, OSError):
+        await redis.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Suivi en direct indisponible, utilisez GET /contracts/{id}/status",
+        )
+
+    first = None
+    if analysis.status == AnalysisStatus.PENDING:
+        first = progress_event(
+            str(contract_id), STAGE_QUEUED, queue_position=await queue_position(str(contract_id))
+        )
+    return _event_stream_response(_progress_events(redis, str(contract_id), first))
+
+
+def _event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Réponse SSE, sans mise en tampon par les proxies."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_event(event: dict[str, Any]) -> str:
+    """Message SSE portant un événement JSON."""
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def _single_event(event: dict[str, Any]) -> AsyncIterator[str]:
+    """Flux d'un seul événement (analyse déjà terminée)."""
+    yield _format_event(event)
+
+
+async def _progress_events(
+    redis: Redis, contract_id: str, first: dict[str, Any] | None
+) -> AsyncIterator[str]:
+    """Relaie les événements Redis d'un contrat au format SSE."""
+    deadline = time.monotonic() + settings.PROGRESS_STREAM_MAX_SECONDS
+    try:
+        if first is not None:
+            yield _format_event(first)
+        async for event in stream_progress(
+            redis, contract_id, keepalive_seconds=settings.PROGRESS_KEEPALIVE_SECONDS
+        ):
+            yield ": keep-alive\n\n" if event is None else _format_event(event)
+            if time.monotonic() >= deadline:
+                return
+    except (RedisError, OSError) as e:
+        # Flux interrompu: le navigateur se reconnecte ou revient au sondage
+        logger.warning(f"Flux d'événements interrompu pour le contrat {contract_id}: {e}")
+    finally:
+        await redis.aclose()
+
+
 @router.get("/{contract_id}/analysis", response_model=AnalysisResponse)
 async def get_contract_analysis(
     contract_id: UUID,
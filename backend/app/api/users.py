@@ -3,6 +3,7 @@
 Ce module définit les endpoints RGPD pour l'export et la suppression des données utilisateur.
 """
 
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -15,9 +16,12 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 from app.core.security import get_current_user_id
-from app.db.session import get_db
+from app.db.session import get_db, get_redis_client
 from app.models import Analysis, AnalysisStatus, Contract, ContractStatus, User, UserResponse
 from app.models.base import utc_now
+from app.services.blob_store import is_blob_key, purge_blob, release_blob
+from app.services.extraction_cache import compute_file_hash, delete_cached_extraction
+from app.services.llm_cache import delete_cached_results
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -158,21 +162,43 @@ async def delete_user_data(
     contract_ids = [contract.id for contract in contracts]
 
     analyses_count = 0
+    llm_cache_keys: list[str] = []
     if contract_ids:
         analyses_result = await db.execute(
             select(Analysis.id).where(col(Analysis.contract_id).in_(contract_ids))
         )
         analyses_count = len(analyses_result.scalars().all())
+        # Résultats du LLM en cache: ils citent les clauses des contrats
+        keys_result = await db.execute(
+            select(col(Analysis.llm_cache_key)).where(
+                col(Analysis.contract_id).in_(contract_ids),
+                col(Analysis.llm_cache_key).is_not(None),
+            )
+        )
+        llm_cache_keys = sorted({key for key in keys_result.scalars().all() if key})
 
     deleted_files = 0
     failed_files = 0
+    # Fichiers du magasin partagé dont l'utilisateur détenait la dernière référence
+    orphan_blobs: list[tuple[str, str]] = []
 
     for contract in contracts:
         if not contract.file_path:
             continue
+        if contract.content_hash and is_blob_key(contract.file_path):
+            orphan = await release_blob(db, contract.content_hash)
+            if orphan is not None:
+                orphan_blobs.append((orphan, contract.content_hash))
+            continue
+        # Fichiers antérieurs au magasin: chemins locaux sous UPLOAD_DIR/<user_id>
         try:
             file_path = Path(contract.file_path)
             if file_path.exists():
+                # Le texte extrait en cache est aussi une donnée personnelle
+                content_hash = contract.content_hash or await asyncio.to_thread(
+                    compute_file_hash, file_path
+                )
+                delete_cached_extraction(content_hash)
                 file_path.unlink()
                 deleted_files += 1
         except Exception:
@@ -194,6 +220,13 @@ async def delete_user_data(
     except Exception:
         pass
 
+    if llm_cache_keys:
+        redis = await get_redis_client()
+        try:
+            await delete_cached_results(db, redis, llm_cache_keys)
+        finally:
+            await redis.aclose()
+
     if contract_ids:
         await db.execute(delete(Analysis).where(col(Analysis.contract_id).in_(contract_ids)))
         await db.execute(delete(Contract).where(col(Contract.user_id) == current_user_id))
@@ -201,6 +234,14 @@ async def delete_user_data(
     await db.execute(delete(User).where(col(User.id) == current_user_id))
     await db.commit()
 
+    # Supprimés seulement une fois les références rendues en base
+    for key, content_hash in orphan_blobs:
+        try:
+            if await purge_blob(db, key, content_hash):
+                deleted_files += 1
+        except Exception:
+            failed_files += 1
+
     return DeleteUserResponse(
         message="Compte supprimé",
         deleted_contracts=len(contracts),
@@ -27,3 +27,55 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_acks_late=True,
 )
+
+# Files du pipeline d'analyse (voir app/tasks/analysis.py): extraction du texte
+# (CPU) et appels LLM/enregistrement (I/O), consommées par des workers distincts
+CPU_QUEUE = "analysis-cpu"
+IO_QUEUE = "analysis-io"
+
+celery_app.conf.task_routes = {
+    "app.tasks.analysis.extract_contract_text": {"queue": CPU_QUEUE},
+    "app.tasks.analysis.run_llm_analysis": {"queue": IO_QUEUE},
+    "app.tasks.analysis.persist_analysis": {"queue": IO_QUEUE},
+    "app.tasks.analysis.dispatch_scheduled_analyses": {"queue": IO_QUEUE},
+    "app.tasks.analysis.queue_batch_analysis": {"queue": IO_QUEUE},
+    "app.tasks.analysis.poll_llm_batches": {"queue": IO_QUEUE},
+    "app.tasks.analysis.purge_llm_cache": {"queue": IO_QUEUE},
+}
+
+# Rattrapage des places de la file d'analyses (app/services/analysis_scheduler.py)
+celery_app.conf.beat_schedule = {
+    "dispatch-scheduled-analyses": {
+        "task": "app.tasks.analysis.dispatch_scheduled_analyses",
+        "schedule": 60.0,
+    },
+    # Entrées expirées ou d'anciens prompts du cache des résultats du LLM
+    # (app/services/llm_cache.py)
+    "purge-llm-cache": {
+        "task": "app.tasks.analysis.purge_llm_cache",
+        "schedule": 3600.0,
+    },
+}
+
+if settings.LLM_BATCH_ENABLED:
+    # Soumission et relève des Message Batches (app/services/llm_batches.py)
+    celery_app.conf.beat_schedule["poll-llm-batches"] = {
+        "task": "app.tasks.analysis.poll_llm_batches",
+        "schedule": settings.LLM_BATCH_POLL_SECONDS,
+    }
+
+# Mode des workers d'analyse (voir app/tasks/runtime.py). Acquittement tardif et
+# préchargement d'un message par emplacement: un worker ne réserve jamais plus
+# d'analyses qu'il n'en mène en même temps.
+if settings.ANALYSIS_WORKER_MODE == "async":
+    # Un thread par analyse en vol, toutes menées sur la boucle asyncio du processus
+    celery_app.conf.update(
+        worker_pool="threads",
+        worker_concurrency=settings.ANALYSIS_MAX_IN_FLIGHT,
+    )
+else:
+    celery_app.conf.update(
+        worker_pool="prefork",
+        # 0: un processus par cœur
+        worker_concurrency=settings.CELERY_WORKER_CONCURRENCY or None,
+    )
@@ -4,7 +4,10 @@ Ce module fournit des fonctions pour rechercher et valider
 des sources juridiques officielles françaises.
 """
 
-from typing import Any, TypedDict
+from typing import TYPE_CHECKING, Any, TypedDict
+
+if TYPE_CHECKING:
+    from app.services.clause_segmenter import ClauseIndex
 
 
 class OfficialSourceInfo(TypedDict):
@@ -76,55 +79,56 @@ class LegalSearchResults(TypedDict):
     search_queries: list[str]
 
 
+# Mots-clés déclenchant chaque type de clause (l'ordre fixe la priorité des types)
+CLAUSE_TYPE_KEYWORDS: dict[str, list[str]] = {
+    "clause_pénalité": ["pénalité", "pénalités", "retard", "défaut de paiement"],
+    "délai_résiliation": ["résiliation", "résilier", "préavis", "congé", "délai de résiliation"],
+    "confidentialité": ["confidentiel", "confidentialité", "secret"],
+    "responsabilité": ["responsabilité", "dommages", "indemnisation"],
+    "propriété_intellectuelle": ["propriété intellectuelle", "brevet", "marque", "copyright"],
+    "conformité_rgpd": ["rgpd", "données personnelles", "gdpr", "protection des données"],
+    "garantie": ["garantie", "vice caché", "éviction"],
+    "cgv": ["cgv", "conditions générales", "conditions de vente"],
+    "force_majeure": ["force majeure", "cas de force majeure", "événement fortuit"],
+    "non_concurrence": ["non-concurrence", "non concurrence"],
+    "droit_retractation": ["rétractation", "rétracte", "délai de rétractation", "14 jours"],
+}
 
-def detect_clause_type(text: str) -> list[str]:
-    """Détecte les types de clauses présents dans un texte.
+
+def match_clause_types(text_lower: str) -> list[str]:
+    """Types de clauses dont un mot-clé apparaît dans un texte déjà en minuscules.
 
     Args:
-        text: Texte du contrat à analyser
+        text_lower: Texte en minuscules
 
     Returns:
-        Liste des types de clauses détectés
+        Types détectés, dans l'ordre de `CLAUSE_TYPE_KEYWORDS`
     """
-    if not text:
-        return ["general"]
-
-    text_lower = text.lower()
-    detected = []
-
-    if any(word in text_lower for word in ["pénalité", "pénalités", "retard", "défaut de paiement"]):
-        detected.append("clause_pénalité")
-
-    if any(word in text_lower for word in ["résiliation", "résilier", "préavis", "congé", "délai de résiliation"]):
-        detected.append("délai_résiliation")
-
-    if any(word in text_lower for word in ["confidentiel", "confidentialité", "secret"]):
-        detected.append("confidentialité")
-
-    if any(word in text_lower for word in ["responsabilité", "dommages", "indemnisation"]):
-        detected.append("responsabilité")
-
-    if any(word in text_lower for word in ["propriété intellectuelle", "brevet", "marque", "copyright"]):
-        detected.append("propriété_intellectuelle")
-
-    if any(word in text_lower for word in ["rgpd", "données personnelles", "gdpr", "protection des données"]):
-        detected.append("conformité_rgpd")
+    return [
+        clause_type
+        for clause_type, keywords in CLAUSE_TYPE_KEYWORDS.items()
+        if any(word in text_lower for word in keywords)
+    ]
 
-    if any(word in text_lower for word in ["garantie", "vice caché", "éviction"]):
-        detected.append("garantie")
 
-    if any(word in text_lower for word in ["cgv", "conditions générales", "conditions de vente"]):
-        detected.append("cgv")
+def detect_clause_type(text: str, clause_index: "ClauseIndex | None" = None) -> list[str]:
+    """Détecte les types de clauses présents dans un texte.
 
-    if any(word in text_lower for word in ["force majeure", "cas de force majeure", "événement fortuit"]):
-        detected.append("force_majeure")
+    Args:
+        text: Texte du contrat à analyser
+        clause_index: Index de segmentation précalculé (évite un nouveau
+            parcours du texte complet)
 
-    if any(word in text_lower for word in ["non-concurrence", "non concurrence"]):
-        detected.append("non_concurrence")
+    Returns:
+        Liste des types de clauses détectés
+    """
+    if clause_index is not None:
+        return clause_index.clause_types
 
-    if any(word in text_lower for word in ["rétractation", "rétracte", "délai de rétractation", "14 jours"]):
-        detected.append("droit_retractation")
+    if not text:
+        return ["general"]
 
+    detected = match_clause_types(text.lower())
     return detected if detected else ["general"]
 
 
@@ -0,0 +1,174 @@
+"""Distributed lease locks backed by Redis.
+
+A lease is a Redis key holding a random token, with a TTL. The holder renews
+it periodically (heartbeat) while it works; if the holder dies, the lease
+simply expires. Renewal and release only touch the key when it still holds
+the caller's token, so a holder whose lease lapsed never frees a lease that
+another process has taken over since.
+
+Contract analyses hold one lease per contract (`analysis_lease`), so that a
+duplicate job (acks_late redelivery, analysis dispatched twice, inline v2
+analysis) never calls the LLM for a contract already being analyzed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import cast
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_LOCK_KEY = "analysis:lock:{contract_id}"
+# Daily counter of duplicate analyses that were not run (see app/core/metrics.py)
+DUPLICATE_ANALYSIS_METRIC = "analysis.duplicate_suppressed"
+
+# Compare-and-renew / compare-and-delete, atomic on the Redis side
+EXTEND_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def new_lease_token() -> str:
+    """Return a random token identifying one lease holder."""
+    return uuid.uuid4().hex
+
+
+class LeaseLock:
+    """Redis lease on a key, owned by whoever holds `token`.
+
+    Args:
+        redis: Redis client
+        key: Lock key
+        ttl_seconds: Lease duration without renewal
+        token: Holder token (a new random one by default); pass a token from an
+            earlier step to keep the same lease across steps
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key: str,
+        ttl_seconds: float,
+        token: str | None = None,
+    ) -> None:
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token = token or new_lease_token()
+
+    async def acquire(self) -> bool:
+        """Take the lease if nobody holds it.
+
+        Returns:
+            True if the lease is now ours
+        """
+        return bool(await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def extend(self) -> bool:
+        """Renew the lease for another TTL, if we still hold it.
+
+        Returns:
+            False if the lease expired or belongs to someone else
+        """
+        renewed = self.redis.eval(EXTEND_SCRIPT, 1, self.key, self.token, str(self.ttl_ms))
+        return bool(await cast(Awaitable[int], renewed))
+
+    async def claim(self) -> bool:
+        """Renew the lease if we hold it, take it if it is free.
+
+        Returns:
+            False if another holder owns the lease
+        """
+        return await self.extend() or await self.acquire()
+
+    async def release(self) -> bool:
+        """Release the lease if we still hold it.
+
+        Returns:
+            True if the lease was ours and is now released
+        """
+        released = self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+        return bool(await cast(Awaitable[int], released))
+
+    async def holder(self) -> str | None:
+        """Return the token of the current holder, if any."""
+        return cast(str | None, await self.redis.get(self.key))
+
+    @asynccontextmanager
+    async def heartbeat(self) -> AsyncIterator[None]:
+        """Renew the lease every third of its TTL while the block runs.
+
+        The lease must already be held. A failed renewal is logged: the work in
+        progress is not interrupted, but a duplicate may start meanwhile.
+        """
+        task = asyncio.create_task(self._renew_forever())
+        try:
+            yield
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _renew_forever(self) -> None:
+        interval = self.ttl_ms / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self.extend()
+            except Exception:
+                logger.warning(f"Lease renewal failed for {self.key}", exc_info=True)
+                continue
+            if not renewed:
+                logger.warning(f"Lease lost for {self.key}")
+                return
+
+
+def analysis_lease(redis: Redis, contract_id: str, token: str | None = None) -> LeaseLock:
+    """Return the analysis lease of a contract (`ANALYSIS_LEASE_TTL_SECONDS`)."""
+    return LeaseLock(
+        redis,
+        ANALYSIS_LOCK_KEY.format(contract_id=contract_id),
+        settings.ANALYSIS_LEASE_TTL_SECONDS,
+        token=token,
+    )
+
+
+async def claim_lease(lease: LeaseLock) -> bool:
+    """Claim a lease, failing open when Redis is unreachable.
+
+    Returns:
+        False only if another holder owns the lease
+    """
+    try:
+        return await lease.claim()
+    except (RedisError, OSError) as e:
+        logger.warning(f"Lease {lease.key} unavailable, continuing without it: {e}")
+        return True
+
+
+async def release_lease(lease: LeaseLock) -> None:
+    """Release a lease; if Redis is unreachable it expires on its own."""
+    try:
+        await lease.release()
+    except (RedisError, OSError) as e:
+        logger.warning(f"Lease {lease.key} not released: {e}")
@@ -9,6 +9,8 @@ from __future__ import annotations
 import logging
 from datetime import date, datetime, timezone
 
+from redis.asyncio import Redis
+
 from app.db.session import get_redis_client
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,7 @@ async def increment_daily(
     *,
     ttl_days: int = DEFAULT_TTL_DAYS,
     day: date | None = None,
+    redis: Redis | None = None,
 ) -> None:
     """Increment a daily counter stored in Redis.
 
@@ -32,12 +35,14 @@ async def increment_daily(
         metric: Metric name (e.g. "auth.login_failed")
         ttl_days: TTL in days
         day: override day for deterministic tests
+        redis: client to use (e.g. the worker's own), a new one by default
     """
 
-    try:
-        redis = await get_redis_client()
-    except Exception:
-        return
+    if redis is None:
+        try:
+            redis = await get_redis_client()
+        except Exception:
+            return
 
     if not redis:
         return
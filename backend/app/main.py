@@ -11,6 +11,7 @@ from app.api.users import router as users_router
 from app.config import settings
 from app.core.security_middleware import setup_security_middleware
 from app.db.session import get_redis_client
+from app.services.llm_client import close_llm_client, get_llm_client
 
 
 @asynccontextmanager
@@ -25,9 +26,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     redis_client = await get_redis_client()
     app.state.redis = redis_client
 
+    # Client HTTP vers l'API Anthropic, partagé par toutes les requêtes
+    get_llm_client()
+
     yield
 
     # Shutdown
+    await close_llm_client()
     if redis_client:
         await redis_client.close()
 
@@ -5,8 +5,18 @@ Ce module exporte tous les modèles de données de l'application.
 
 from app.models.base import BaseModel, BaseTableModel, TimestampMixin, UUIDMixin
 from app.models.user import User, UserCreate, UserResponse, UserLogin, TokenRefresh
-from app.models.contract import Contract, ContractStatus, ContractResponse, ContractListResponse
+from app.models.contract import (
+    BatchStatusResponse,
+    BatchUploadResponse,
+    Contract,
+    ContractStatus,
+    ContractResponse,
+    ContractListResponse,
+    ContractStatusesRequest,
+)
 from app.models.analysis import Analysis, AnalysisStatus, AnalysisResponse, AnalysisStatusResponse
+from app.models.blob import StoredBlob
+from app.models.llm_cache import LLMCacheEntry
 
 __all__ = [
     # Base
@@ -25,9 +35,16 @@ __all__ = [
     "ContractStatus",
     "ContractResponse",
     "ContractListResponse",
+    "ContractStatusesRequest",
+    "BatchUploadResponse",
+    "BatchStatusResponse",
     # Analysis
     "Analysis",
     "AnalysisStatus",
     "AnalysisResponse",
     "AnalysisStatusResponse",
+    # Blob
+    "StoredBlob",
+    # LLM cache
+    "LLMCacheEntry",
 ]
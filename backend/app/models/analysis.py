@@ -8,7 +8,17 @@ from enum import Enum
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, Text, Enum as SAEnum, Float
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    JSON,
+    String,
+    Text,
+    Enum as SAEnum,
+    Float,
+)
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base import BaseTableModel
@@ -40,6 +50,10 @@ class Analysis(BaseTableModel, table=True):
         score_equity: Score d'équité (0-100)
         score_clarity: Score de clarté (0-100)
         error_message: Message d'erreur en cas d'échec
+        model: Modèle ayant produit les résultats ("mock" pour l'analyse simulée)
+        prompt_version: Version du prompt d'analyse utilisé
+        llm_cache_key: Entrée du cache des résultats du LLM correspondante
+            (supprimée avec le compte de l'utilisateur)
         created_at: Date de création
         updated_at: Date de dernière mise à jour
     """
@@ -65,6 +79,9 @@ class Analysis(BaseTableModel, table=True):
     score_equity: int | None = Field(default=None, sa_column=Column(Integer, nullable=True))
     score_clarity: int | None = Field(default=None, sa_column=Column(Integer, nullable=True))
     error_message: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    model: str | None = Field(default=None, sa_column=Column(String(100), nullable=True))
+    prompt_version: str | None = Field(default=None, sa_column=Column(String(20), nullable=True))
+    llm_cache_key: str | None = Field(default=None, sa_column=Column(String(200), nullable=True))
 
     # Relations
     contract: "Contract" = Relationship(back_populates="analyses")
@@ -98,6 +115,8 @@ class AnalysisStatusResponse(SQLModel):
     error_message: str | None
     created_at: datetime
     updated_at: datetime
+    # Rang dans la file d'analyses (1 = prochaine envoyée), None si non en attente
+    queue_position: int | None = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,37 @@
+"""Stored blob model.
+
+Ce module définit le modèle des fichiers du magasin adressé par contenu:
+un fichier par SHA-256, partagé par tous les contrats de contenu identique.
+"""
+
+from datetime import datetime
+from typing import Any, cast
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlmodel import Field, SQLModel
+
+from app.models.base import utc_now
+
+
+class StoredBlob(SQLModel, table=True):
+    """Fichier du magasin adressé par contenu.
+
+    Attributes:
+        content_hash: SHA-256 du contenu (clé)
+        file_path: Chemin du fichier dans le magasin
+        size: Taille en octets
+        ref_count: Nombre de contrats qui référencent le fichier
+        created_at: Date du premier upload
+    """
+
+    __tablename__ = "stored_blobs"
+
+    content_hash: str = Field(sa_column=Column(String(64), primary_key=True))
+    file_path: str = Field(sa_column=Column(String(500), nullable=False))
+    size: int = Field(sa_column=Column(Integer, nullable=False))
+    ref_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    created_at: datetime = Field(
+        default_factory=utc_now,
+        sa_type=cast(Any, DateTime(timezone=True)),
+        nullable=False,
+    )
@@ -5,9 +5,10 @@ Ce module définit le modèle de données pour les contrats.
 
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Enum as SAEnum
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Enum as SAEnum
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base import BaseTableModel
@@ -38,7 +39,10 @@ class Contract(BaseTableModel, table=True):
         file_path: Chemin de stockage du fichier
         file_size: Taille du fichier en octets
         file_type: Type MIME du fichier
+        content_hash: SHA-256 du fichier, calculé à l'upload
+        batch_id: Lot d'upload du contrat (upload groupé), None pour un upload unitaire
         status: Statut actuel du contrat
+        clause_index: Index des articles/clauses du texte extrait (voir clause_segmenter)
         created_at: Date de création
         updated_at: Date de dernière mise à jour
     """
@@ -56,6 +60,10 @@ class Contract(BaseTableModel, table=True):
     file_path: str = Field(sa_column=Column(String(500), nullable=False))
     file_size: int = Field(sa_column=Column(Integer, nullable=False))
     file_type: str = Field(sa_column=Column(String(100), nullable=False))
+    content_hash: str | None = Field(
+        default=None, sa_column=Column(String(64), nullable=True, index=True)
+    )
+    batch_id: UUID | None = Field(default=None, nullable=True, index=True)
     status: ContractStatus = Field(
         default=ContractStatus.PENDING,
         sa_column=Column(
@@ -64,6 +72,7 @@ class Contract(BaseTableModel, table=True):
             nullable=False,
         ),
     )
+    clause_index: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON, nullable=True))
 
     # Relations
     analyses: list["Analysis"] = Relationship(back_populates="contract")
@@ -78,6 +87,7 @@ class ContractResponse(SQLModel):
     file_size: int
     file_type: str
     status: ContractStatus
+    batch_id: UUID | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -95,3 +105,34 @@ class ContractListResponse(SQLModel):
 
     class Config:
         from_attributes = True
+
+
+class BatchUploadResponse(SQLModel):
+    """Schéma pour la réponse d'un upload groupé."""
+
+    batch_id: UUID
+    contracts: list[ContractResponse]
+    reused: int
+
+
+class ContractStatusesRequest(SQLModel):
+    """Schéma pour la lecture groupée des statuts d'analyse.
+
+    Sans `contract_ids`, ce sont les analyses en attente ou en cours de
+    l'utilisateur qui sont renvoyées.
+    """
+
+    contract_ids: list[UUID] | None = None
+
+
+class BatchStatusResponse(SQLModel):
+    """Schéma pour l'avancement agrégé d'un lot de contrats."""
+
+    batch_id: UUID
+    total: int
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    progress: float
+    done: bool
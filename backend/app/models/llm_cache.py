@@ -0,0 +1,41 @@
+"""LLM cache entry model.
+
+Ce module définit le niveau Postgres du cache des résultats du LLM (voir
+`app/services/llm_cache.py`): une entrée par clé de cache, relue quand Redis
+ne l'a pas (expirée ou Redis vidé). Les entrées sont supprimées après
+`LLM_CACHE_DB_TTL_DAYS` jours, et avec le compte des utilisateurs dont une
+analyse les référence (`Analysis.llm_cache_key`).
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Column, DateTime, String
+from sqlmodel import Field, SQLModel
+
+from app.models.base import utc_now
+
+
+class LLMCacheEntry(SQLModel, table=True):
+    """Résultat du LLM mis en cache.
+
+    Attributes:
+        cache_key: Clé de cache (type d'analyse, modèle, empreintes du prompt et du texte)
+        kind: Type d'analyse (`KIND_ANALYSIS`, `KIND_LEGAL_ANALYSIS`)
+        model: Modèle ayant produit le résultat
+        prompt_hash: Empreinte des prompts utilisés (entrées obsolètes si elle change)
+        result: Résultat de l'analyse
+        created_at: Date de l'analyse
+    """
+
+    __tablename__ = "llm_cache_entries"
+
+    cache_key: str = Field(sa_column=Column(String(200), primary_key=True))
+    kind: str = Field(sa_column=Column(String(20), nullable=False, index=True))
+    model: str = Field(sa_column=Column(String(100), nullable=False))
+    prompt_hash: str = Field(sa_column=Column(String(64), nullable=False))
+    result: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
+    )
@@ -7,7 +7,10 @@ Ce module contient les prompts structurés pour garantir:
 - Disclaimer légal obligatoire
 """
 
-from typing import Final
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from app.services.clause_segmenter import ClauseIndex
 
 # ============================================================================
 # DISCLAIMER LÉGAL OBLIGATOIRE
@@ -25,8 +28,13 @@ LEGAL_DISCLAIMER: Final[str] = (
 # ============================================================================
 # PROMPT PRINCIPAL D'ANALYSE JURIDIQUE
 # ============================================================================
+# Le prompt est en deux blocs: les instructions, identiques pour tous les
+# contrats (prompt système, mis en cache côté Anthropic), puis le contrat et
+# ses sources (message utilisateur). Rien de variable ne doit entrer dans les
+# instructions: le cache ne sert que si ce préfixe est identique d'un appel à
+# l'autre.
 
-LEGAL_ANALYSIS_PROMPT: Final[str] = """
+LEGAL_ANALYSIS_INSTRUCTIONS: Final[str] = """
 Tu es un assistant d'analyse contractuelle pour TPE/PME française.
 
 🚨 OBLIGATIONS STRICTES - NON NÉGOCIABLES:
@@ -106,7 +114,9 @@ Tu es un assistant d'analyse contractuelle pour TPE/PME française.
 - ZERO interprétation sans source citée
 - TOUS les articles DOIVENT avoir une URL legifrance.gouv.fr ou source officielle
 - Si impossible de trouver la source: marquer explicitement [SOURCE NON TROUVÉE]
+""".strip()
 
+LEGAL_ANALYSIS_CONTRACT_TEMPLATE: Final[str] = """
 CONTRAT À ANALYSER:
 ```
 {contract_text}
@@ -116,6 +126,11 @@ SOURCES DE RÉFÉRENCE TROUVÉES:
 {sources_json}
 """.strip()
 
+# Prompt complet (instructions + contrat), pour un appel sans prompt système
+LEGAL_ANALYSIS_PROMPT: Final[str] = (
+    f"{LEGAL_ANALYSIS_INSTRUCTIONS}\n\n{LEGAL_ANALYSIS_CONTRACT_TEMPLATE}"
+)
+
 
 # ============================================================================
 # PROMPT DE VÉRIFICATION ANTI-HALLUCINATION
@@ -269,26 +284,65 @@ def format_legal_analysis_prompt(
     sources: list[dict] | None = None,
     search_results: list[dict] | None = None,
     max_contract_length: int = 80000,
+    clause_index: "ClauseIndex | None" = None,
 ) -> str:
-    """Formate le prompt d'analyse juridique avec le contrat et les sources.
+    """Formate le prompt d'analyse juridique complet (instructions + contrat).
+
+    Pour un appel avec `LEGAL_ANALYSIS_SYSTEM_PROMPT` en prompt système, seul
+    `format_contract_context` est à envoyer en message utilisateur.
 
     Args:
         contract_text: Texte complet du contrat
         sources: Liste des sources juridiques trouvées (alias pour search_results)
         search_results: Liste des résultats de recherche
         max_contract_length: Longueur max du contrat (troncature si nécessaire)
+        clause_index: Index de segmentation du contrat (troncature entre deux clauses)
 
     Returns:
         Prompt formaté prêt pour Claude
     """
+    context = format_contract_context(
+        contract_text,
+        sources=sources,
+        search_results=search_results,
+        max_contract_length=max_contract_length,
+        clause_index=clause_index,
+    )
+    return f"{LEGAL_ANALYSIS_INSTRUCTIONS}\n\n{context}"
+
+
+def format_contract_context(
+    contract_text: str,
+    sources: list[dict] | None = None,
+    search_results: list[dict] | None = None,
+    max_contract_length: int = 80000,
+    clause_index: "ClauseIndex | None" = None,
+) -> str:
+    """Formate la partie propre au contrat du prompt: le contrat et ses sources.
+
+    Args:
+        contract_text: Texte complet du contrat
+        sources: Liste des sources juridiques trouvées (alias pour search_results)
+        search_results: Liste des résultats de recherche
+        max_contract_length: Longueur max du contrat (troncature si nécessaire)
+        clause_index: Index de segmentation du contrat (troncature entre deux clauses)
+
+    Returns:
+        Message utilisateur à envoyer après les instructions
+    """
     # Utilise search_results si fourni, sinon sources
     effective_sources = search_results if search_results is not None else sources
 
-    # Tronque si nécessaire
+    # Tronque si nécessaire (en fin de clause si l'index est disponible)
     if len(contract_text) > max_contract_length:
-        contract_text = contract_text[:max_contract_length] + (
+        cut = (
+            clause_index.boundary_before(max_contract_length)
+            if clause_index is not None
+            else max_contract_length
+        )
+        contract_text = contract_text[:cut] + (
             "\n\n[... CONTRAT TRONQUÉ POUR L'ANALYSE - "
-            f"{len(contract_text) - max_contract_length} caractères omis ...]"
+            f"{len(contract_text) - cut} caractères omis ...]"
         )
 
     # Formate les sources en JSON
@@ -299,7 +353,9 @@ def format_legal_analysis_prompt(
         sources_json = json.dumps(effective_sources, ensure_ascii=False, indent=2)
 
     # Utilise replace au lieu de format pour éviter les problèmes avec les accolades JSON
-    return LEGAL_ANALYSIS_PROMPT.replace("{contract_text}", contract_text).replace("{sources_json}", sources_json)
+    return LEGAL_ANALYSIS_CONTRACT_TEMPLATE.replace("{contract_text}", contract_text).replace(
+        "{sources_json}", sources_json
+    )
 
 
 def format_verification_prompt(claim: str, citation: str, sources: list[dict]) -> str:
@@ -327,7 +383,8 @@ def get_disclaimer() -> str:
 
 # Alias pour compatibilité
 format_prompt_with_context = format_legal_analysis_prompt
-LEGAL_ANALYSIS_SYSTEM_PROMPT = LEGAL_ANALYSIS_PROMPT
+# Prompt système: les instructions seules, le contrat est dans le message utilisateur
+LEGAL_ANALYSIS_SYSTEM_PROMPT = LEGAL_ANALYSIS_INSTRUCTIONS
 
 
 # ============================================================================
@@ -343,11 +400,14 @@ PROMPTS = {
 
 __all__ = [
     "LEGAL_DISCLAIMER",
+    "LEGAL_ANALYSIS_INSTRUCTIONS",
+    "LEGAL_ANALYSIS_CONTRACT_TEMPLATE",
     "LEGAL_ANALYSIS_PROMPT",
     "VERIFICATION_PROMPT",
     "SYNTHESIS_PROMPT",
     "CLAUSE_EXTRACTION_PROMPT",
     "format_legal_analysis_prompt",
+    "format_contract_context",
     "format_verification_prompt",
     "get_disclaimer",
     "PROMPTS",
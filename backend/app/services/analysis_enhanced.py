@@ -9,9 +9,10 @@ Ce service intègre:
 
 import json
 import logging
+import time
+from collections.abc import Awaitable, Callable
 from typing import Any, cast
 
-from anthropic import AsyncAnthropic
 from anthropic.types import MessageParam
 
 from app.config import settings
@@ -23,22 +24,45 @@ from app.core.legal_search import (
     search_legal_sources,
 )
 from app.core.confidence import calculate_confidence, calculate_clause_confidence
+from app.services.clause_segmenter import ClauseIndex, segment_clauses
+from app.services.llm_client import get_anthropic_client
+from app.services.progress_events import STAGE_CALLING_MODEL, STAGE_SEARCHING_SOURCES
 from app.prompts.legal_analysis import (
-    format_prompt_with_context,
+    format_contract_context,
     get_disclaimer,
     LEGAL_ANALYSIS_SYSTEM_PROMPT,
 )
 
 logger = logging.getLogger(__name__)
 
-# Client Anthropic
-anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+# Instructions en prompt système, marquées pour le cache de prompts Anthropic:
+# un appel les écrit dans le cache (5 minutes, prolongées à chaque lecture), les
+# suivants les relisent au dixième du prix des tokens d'entrée. En dessous de la
+# taille minimale du modèle (1024 tokens pour Sonnet), l'API ne met rien en
+# cache: `cache_creation_input_tokens` reste alors à 0 dans `_llm_usage`.
+SYSTEM_BLOCKS: list[dict[str, Any]] = [
+    {
+        "type": "text",
+        "text": LEGAL_ANALYSIS_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+# Compteurs de tokens de `response.usage` enregistrés avec chaque analyse
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
 
 
 async def analyze_contract_enhanced(
     contract_text: str,
     contract_id: str | None = None,
     use_web_search: bool = True,
+    clause_index: ClauseIndex | None = None,
+    on_progress: Callable[[str], Awaitable[None]] | None = None,
 ) -> dict[str, Any]:
     """Analyse un contrat avec recherche juridique et score de confiance.
 
@@ -46,12 +70,18 @@ async def analyze_contract_enhanced(
         contract_text: Texte du contrat à analyser
         contract_id: ID du contrat (optionnel)
         use_web_search: Activer la recherche web de sources
+        clause_index: Index de segmentation précalculé (calculé ici sinon)
+        on_progress: Appelée avec le nom de chaque étape commencée
+            (`STAGE_SEARCHING_SOURCES`, `STAGE_CALLING_MODEL`)
 
     Returns:
         Analyse complète avec score de confiance et sources
     """
     logger.info(f"Début analyse contrat {'#' + contract_id if contract_id else 'nouveau'}")
 
+    if clause_index is None:
+        clause_index = segment_clauses(contract_text)
+
     # ==========================================================================
     # ÉTAPE 1: Recherche de sources juridiques
     # ==========================================================================
@@ -63,9 +93,11 @@ async def analyze_contract_enhanced(
     }
 
     if use_web_search:
+        if on_progress is not None:
+            await on_progress(STAGE_SEARCHING_SOURCES)
         try:
             # Détecte les types de clauses
-            detected_types = detect_clause_type(contract_text)
+            detected_types = detect_clause_type(contract_text, clause_index)
             logger.info(f"Types de clauses détectés: {detected_types}")
 
             # Recherche les sources pour le type principal
@@ -79,16 +111,20 @@ async def analyze_contract_enhanced(
             # Continue sans sources si erreur
 
     # ==========================================================================
-    # ÉTAPE 2: Préparation du prompt
+    # ÉTAPE 2: Préparation du prompt (contrat et sources, les instructions
+    # sont dans le prompt système)
     # ==========================================================================
-    prompt = format_prompt_with_context(
+    prompt = format_contract_context(
         contract_text=contract_text,
         search_results=[dict(source) for source in search_results["sources"]],
+        clause_index=clause_index,
     )
 
     # ==========================================================================
     # ÉTAPE 3: Appel au LLM avec tool web_search de Claude
     # ==========================================================================
+    if on_progress is not None:
+        await on_progress(STAGE_CALLING_MODEL)
     try:
         messages: list[MessageParam] = [
             {
@@ -98,14 +134,20 @@ async def analyze_contract_enhanced(
         ]
         tools_payload = [{"type": "web_search", "name": "web_search_tool"}]
 
-        response = await anthropic_client.messages.create(
+        # Client du processus (connexions gardées ouvertes, voir llm_client).
+        # Le SDK n'accepte qu'un prompt système texte: les blocs avec
+        # `cache_control` passent par `extra_body`, comme les outils.
+        started = time.perf_counter()
+        response = await get_anthropic_client().messages.create(
             model=settings.ANTHROPIC_MODEL or "claude-sonnet-4-5-20250929",
             max_tokens=4096,
-            system=LEGAL_ANALYSIS_SYSTEM_PROMPT,
             messages=messages,
             temperature=0.1,  # Faible pour plus de déterminisme
-            extra_body={"tools": tools_payload},
+            extra_body={"system": SYSTEM_BLOCKS, "tools": tools_payload},
         )
+        llm_usage = _usage_counts(getattr(response, "usage", None))
+        llm_usage["duration_ms"] = round((time.perf_counter() - started) * 1000)
+        logger.info(f"Appel LLM: {llm_usage}")
 
         # Extrait le contenu JSON de la réponse
         content = response.content[0].text if response.content else ""
@@ -194,12 +236,26 @@ async def analyze_contract_enhanced(
                 clause_analysis["score_confiance_clause"] = clause_confidence["score"]
                 clause_analysis["niveau_confiance_clause"] = clause_confidence["level"]
 
+                # Rattache la clause analysée à l'article du contrat qui la contient
+                segment = clause_index.locate(
+                    contract_text, str(clause_analysis.get("texte_clause") or "")
+                )
+                if segment is not None:
+                    clause_analysis["_article"] = {
+                        "numero": segment.number,
+                        "intitule": segment.heading,
+                        "debut": segment.start,
+                        "fin": segment.end,
+                    }
+
         # ==========================================================================
         # ÉTAPE 5: Ajout des sources et vérification langue
         # ==========================================================================
         # Ajoute les sources utilisées
         analysis_data["_sources_used"] = search_results["sources"]
         analysis_data["_search_queries"] = search_results["search_queries"]
+        # Tokens lus/écrits dans le cache de prompts et durée de l'appel
+        analysis_data["_llm_usage"] = llm_usage
 
         # Vérifie que tout est en français (anti-anglais)
         analysis_data = _verify_french_content(analysis_data)
@@ -227,6 +283,23 @@ async def analyze_contract_enhanced(
         }
 
 
+def _usage_counts(usage: Any) -> dict[str, int]:
+    """Compteurs de tokens d'une réponse Messages (0 si absents).
+
+    Args:
+        usage: `response.usage` (les champs de cache n'existent que si le
+            cache de prompts a été demandé)
+
+    Returns:
+        Un compteur par champ de `USAGE_FIELDS`
+    """
+    counts: dict[str, int] = {}
+    for field in USAGE_FIELDS:
+        value = getattr(usage, field, None)
+        counts[field] = value if isinstance(value, int) else 0
+    return counts
+
+
 def _verify_french_content(data: dict[str, Any]) -> dict[str, Any]:
     """Vérifie que le contenu est bien en français.
 
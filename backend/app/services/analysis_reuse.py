@@ -0,0 +1,79 @@
+"""Analysis reuse service.
+
+Ce module retrouve une analyse terminée d'un contenu identique (même SHA-256
+de fichier) produite avec le même modèle et la même version de prompt, et en
+recopie les résultats: un contrat déjà analysé pour un autre upload n'est pas
+renvoyé au LLM.
+"""
+
+import copy
+import logging
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models import Analysis, AnalysisStatus, Contract, ContractStatus
+from app.services.claude_service import ANALYSIS_PROMPT_VERSION, current_analysis_model
+
+logger = logging.getLogger(__name__)
+
+
+async def find_reusable_analysis(
+    db: AsyncSession,
+    content_hash: str | None,
+    exclude_contract_id: UUID | None = None,
+) -> Analysis | None:
+    """Cherche la dernière analyse réutilisable d'un contenu.
+
+    Args:
+        db: Session de base de données
+        content_hash: SHA-256 du fichier du contrat
+        exclude_contract_id: Contrat à ignorer (celui que l'on analyse)
+
+    Returns:
+        Une analyse terminée du même contenu, avec le modèle et la version de
+        prompt courants, ou None (aussi si `ANALYSIS_REUSE_ENABLED` est faux)
+    """
+    if not settings.ANALYSIS_REUSE_ENABLED or not content_hash:
+        return None
+
+    query = (
+        select(Analysis)
+        .join(Contract, col(Contract.id) == col(Analysis.contract_id))
+        .where(
+            col(Contract.content_hash) == content_hash,
+            col(Analysis.status) == AnalysisStatus.COMPLETED,
+            col(Analysis.model) == current_analysis_model(),
+            col(Analysis.prompt_version) == ANALYSIS_PROMPT_VERSION,
+        )
+        .order_by(col(Analysis.updated_at).desc())
+        .limit(1)
+    )
+    if exclude_contract_id is not None:
+        query = query.where(col(Analysis.contract_id) != exclude_contract_id)
+
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+def apply_reused_analysis(source: Analysis, analysis: Analysis, contract: Contract) -> None:
+    """Recopie une analyse terminée sur l'analyse d'un autre contrat et le marque terminé.
+
+    Args:
+        source: Analyse réutilisée
+        analysis: Analyse à compléter
+        contract: Contrat de `analysis`
+    """
+    analysis.status = AnalysisStatus.COMPLETED
+    analysis.results = copy.deepcopy(source.results)
+    analysis.score_equity = source.score_equity
+    analysis.score_clarity = source.score_clarity
+    analysis.error_message = None
+    analysis.model = source.model
+    analysis.prompt_version = source.prompt_version
+    analysis.llm_cache_key = source.llm_cache_key
+    contract.status = ContractStatus.COMPLETED
+    logger.info(f"Contrat {contract.id}: analyse {source.id} réutilisée (contenu identique)")
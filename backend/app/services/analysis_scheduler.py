@@ -0,0 +1,238 @@
+"""Analysis scheduler.
+
+Ce module ordonne les analyses avant de les confier à Celery. Une file FIFO
+unique laisse un utilisateur qui uploade 500 contrats retarder de plusieurs
+heures le contrat urgent d'un autre: les analyses attendent donc dans Redis et
+ne sont envoyées aux workers qu'à concurrence de `SCHEDULER_MAX_RUNNING`.
+
+L'ordre de sortie suit une file équitable pondérée (weighted fair queuing):
+chaque analyse reçoit à l'enregistrement une étiquette de fin virtuelle,
+`max(temps virtuel, dernière étiquette de l'utilisateur) + 1 / poids`, et la
+plus petite étiquette sort en premier. Deux utilisateurs actifs progressent
+ainsi au même rythme (pondéré), quelle que soit la longueur de leur file. Une
+voie prioritaire (uploads unitaires de petits fichiers) passe avant la file
+équitable.
+
+Structures Redis:
+    - `QUEUE_KEY`: ensemble trié des analyses en attente, par étiquette
+    - `PRIORITY_KEY`: ensemble trié de la voie prioritaire, par date d'arrivée
+    - `RUNNING_KEY`: analyses confiées à Celery, par date d'envoi
+    - `JOBS_KEY`: contrat → analyse (contrats de contenu identique regroupés)
+
+Le plafond d'analyses en cours est approximatif: deux envois simultanés
+peuvent le dépasser d'une unité chacun. Sans Redis (ou `SCHEDULER_ENABLED`
+faux), les analyses sont envoyées directement à Celery.
+"""
+
+import logging
+import time
+from collections.abc import Awaitable
+from typing import cast
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.db.session import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "analysis:queue"
+PRIORITY_KEY = "analysis:priority"
+RUNNING_KEY = "analysis:running"
+JOBS_KEY = "analysis:jobs"
+VIRTUAL_TIME_KEY = "analysis:vtime"
+USER_TAG_KEY = "analysis:user-tag:{user_id}"
+
+# Séparateur des contrats d'une même analyse (membres des ensembles triés)
+_JOB_SEPARATOR = ","
+# Dernière étiquette d'un utilisateur oubliée après un mois sans analyse
+_USER_TAG_TTL_SECONDS = 30 * 24 * 3600
+
+
+def user_weight(user_id: str) -> float:
+    """Poids d'un utilisateur dans la file équitable (`SCHEDULER_USER_WEIGHTS`, 1 sinon)."""
+    return settings.scheduler_user_weights.get(user_id, 1.0)
+
+
+def _dispatch_now(jobs: list[list[str]]) -> None:
+    """Envoie des analyses à Celery sans passer par la file (un seul envoi)."""
+    from celery import group
+
+    from app.tasks.analysis import analysis_pipeline
+
+    pipelines = [analysis_pipeline(*contract_ids) for contract_ids in jobs]
+    if len(pipelines) == 1:
+        pipelines[0].apply_async()
+    else:
+        group(pipelines).apply_async()
+
+
+async def schedule_analyses(
+    jobs: list[list[str]],
+    user_id: str,
+    priority: bool = False,
+    redis: Redis | None = None,
+) -> None:
+    """Met des analyses en file et envoie à Celery celles qui peuvent démarrer.
+
+    Args:
+        jobs: Analyses à lancer; chaque analyse regroupe des contrats de contenu
+            identique, analysés l'un après l'autre (seul le premier appelle le LLM)
+        user_id: Propriétaire des contrats (file équitable)
+        priority: Voie prioritaire (upload unitaire d'un petit fichier)
+        redis: Client Redis (créé au besoin)
+    """
+    if not jobs:
+        return
+    if not settings.SCHEDULER_ENABLED:
+        _dispatch_now(jobs)
+        return
+
+    members = [_JOB_SEPARATOR.join(contract_ids) for contract_ids in jobs]
+    try:
+        redis = redis or await get_redis_client()
+        if priority:
+            now = time.time()
+            await redis.zadd(PRIORITY_KEY, {member: now for member in members})
+        else:
+            await redis.zadd(QUEUE_KEY, await _tag_jobs(redis, user_id, members))
+        await cast(
+            Awaitable[int],
+            redis.hset(
+                JOBS_KEY,
+                mapping={
+                    contract_id: member
+                    for member, contract_ids in zip(members, jobs)
+                    for contract_id in contract_ids
+                },
+            ),
+        )
+    except (RedisError, OSError) as e:
+        logger.warning(f"File d'analyses indisponible, envoi direct à Celery: {e}")
+        _dispatch_now(jobs)
+        return
+
+    await dispatch_ready(redis)
+
+
+async def _tag_jobs(redis: Redis, user_id: str, members: list[str]) -> dict[str, float]:
+    """Calcule les étiquettes de fin virtuelles des analyses d'un utilisateur."""
+    step = 1.0 / user_weight(user_id)
+    user_key = USER_TAG_KEY.format(user_id=user_id)
+    virtual_time, last_tag = await redis.mget(VIRTUAL_TIME_KEY, user_key)
+    tag = max(float(virtual_time or 0), float(last_tag or 0))
+
+    tags: dict[str, float] = {}
+    for member in members:
+        tag += step
+        tags[member] = tag
+    await redis.set(user_key, tag, ex=_USER_TAG_TTL_SECONDS)
+    return tags
+
+
+async def dispatch_ready(redis: Redis | None = None) -> int:
+    """Envoie à Celery les analyses en tête de file, dans la limite des places libres.
+
+    Args:
+        redis: Client Redis (créé au besoin)
+
+    Returns:
+        Le nombre d'analyses envoyées
+    """
+    dispatched = 0
+    try:
+        redis = redis or await get_redis_client()
+        now = time.time()
+        # Analyses perdues (worker arrêté, échec définitif): leur place est libérée
+        await redis.zremrangebyscore(
+            RUNNING_KEY, "-inf", now - settings.SCHEDULER_SLOT_TIMEOUT_SECONDS
+        )
+        while await redis.zcard(RUNNING_KEY) < settings.SCHEDULER_MAX_RUNNING:
+            popped = await redis.zpopmin(PRIORITY_KEY)
+            popped_priority = bool(popped)
+            if not popped:
+                popped = await redis.zpopmin(QUEUE_KEY)
+                if not popped:
+                    break
+                await redis.set(VIRTUAL_TIME_KEY, popped[0][1])
+            member, score = popped[0]
+            await redis.zadd(RUNNING_KEY, {member: now})
+            try:
+                _dispatch_now([member.split(_JOB_SEPARATOR)])
+            except Exception as e:
+                # Broker injoignable: l'analyse reprend sa place dans la file
+                logger.warning(f"Envoi à Celery impossible, analyse remise en file: {e}")
+                await redis.zrem(RUNNING_KEY, member)
+                lane = PRIORITY_KEY if popped_priority else QUEUE_KEY
+                await redis.zadd(lane, {member: score})
+                break
+            dispatched += 1
+    except (RedisError, OSError) as e:
+        logger.warning(f"File d'analyses indisponible: {e}")
+    return dispatched
+
+
+async def finish_analysis(contract_id: str, redis: Redis | None = None) -> None:
+    """Libère la place d'une analyse terminée et envoie la suivante.
+
+    Sans effet pour un contrat qui n'est pas passé par la file, ou qui n'est
+    pas le dernier de son analyse (contrats de contenu identique).
+    """
+    try:
+        redis = redis or await get_redis_client()
+        member = await cast(Awaitable[str | None], redis.hget(JOBS_KEY, contract_id))
+        if member is None:
+            return
+        contract_ids = member.split(_JOB_SEPARATOR)
+        if contract_ids[-1] != contract_id:
+            return
+        await redis.zrem(RUNNING_KEY, member)
+        await cast(Awaitable[int], redis.hdel(JOBS_KEY, *contract_ids))
+    except (RedisError, OSError) as e:
+        logger.warning(f"File d'analyses indisponible: {e}")
+        return
+
+    await dispatch_ready(redis)
+
+
+async def keep_slot(contract_id: str, redis: Redis | None = None) -> None:
+    """Garde la place d'une analyse qui attend un nouvel essai.
+
+    La place est datée du moment présent: sans cela, une analyse retentée
+    plusieurs fois dépasserait `SCHEDULER_SLOT_TIMEOUT_SECONDS` et sa place
+    serait donnée à une autre analyse alors qu'elle tourne encore.
+    """
+    try:
+        redis = redis or await get_redis_client()
+        member = await cast(Awaitable[str | None], redis.hget(JOBS_KEY, contract_id))
+        if member is not None:
+            await redis.zadd(RUNNING_KEY, {member: time.time()}, xx=True)
+    except (RedisError, OSError) as e:
+        logger.warning(f"File d'analyses indisponible: {e}")
+
+
+async def queue_position(contract_id: str, redis: Redis | None = None) -> int | None:
+    """Position d'un contrat dans la file (1 = prochaine analyse envoyée).
+
+    La position dans la file équitable peut reculer si d'autres utilisateurs
+    ajoutent des analyses: elle reflète l'ordre courant.
+
+    Returns:
+        La position, ou None si le contrat n'est pas en attente (ou Redis indisponible)
+    """
+    try:
+        redis = redis or await get_redis_client()
+        member = await cast(Awaitable[str | None], redis.hget(JOBS_KEY, contract_id))
+        if member is None:
+            return None
+        rank = await redis.zrank(PRIORITY_KEY, member)
+        if rank is not None:
+            return int(rank) + 1
+        rank = await redis.zrank(QUEUE_KEY, member)
+        if rank is None:
+            return None
+        return int(await redis.zcard(PRIORITY_KEY)) + int(rank) + 1
+    except (RedisError, OSError) as e:
+        logger.warning(f"File d'analyses indisponible: {e}")
+        return None
@@ -0,0 +1,251 @@
+"""Content-addressed blob store.
+
+Ce module stocke les fichiers uploadés une seule fois par contenu: le fichier
+est rangé sous une clé dérivée de son SHA-256 (`blobs/ab/abcd...pdf`, dans le
+stockage configuré, voir `object_storage`) et la table `stored_blobs` compte
+les contrats qui le référencent. Un même modèle de CGV uploadé par plusieurs
+utilisateurs n'occupe qu'un fichier; il est supprimé (avec son texte extrait
+en cache) quand le dernier contrat disparaît.
+
+Les références sont prises et rendues dans la transaction de l'appelant:
+elles sont validées en même temps que le contrat créé ou supprimé.
+
+Un fichier n'est supprimé (`purge_blob`) que sous le verrou de son entrée,
+après avoir vérifié qu'aucun contrat ne le référence: un upload concurrent du
+même contenu attend la fin de la suppression, puis rétablit le fichier.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, cast
+from uuid import uuid4
+
+from fastapi import UploadFile
+from sqlalchemy import select, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models import StoredBlob
+from app.services.extraction_cache import delete_cached_extraction
+from app.services.file_storage import StoredFile, save_upload
+from app.services.object_storage import StorageError, get_storage
+
+logger = logging.getLogger(__name__)
+
+BLOB_KEY_PREFIX = "blobs/"
+# Réception locale des uploads avant envoi au stockage
+_INCOMING_DIR_NAME = ".incoming"
+# Fichiers envoyés au stockage dans la transaction en cours (`Session.info`)
+_PLACED_BLOBS_KEY = "placed_blobs"
+
+
+def blob_key(content_hash: str, extension: str) -> str:
+    """Clé de stockage d'un contenu."""
+    return f"{BLOB_KEY_PREFIX}{content_hash[:2]}/{content_hash}{extension}"
+
+
+def is_blob_key(file_path: str) -> bool:
+    """Indique si un `Contract.file_path` désigne un fichier du magasin."""
+    return file_path.startswith(BLOB_KEY_PREFIX)
+
+
+def _place(staged: Path, blob: StoredBlob) -> bool:
+    """Envoie un fichier reçu au stockage, sauf si le contenu y est déjà.
+
+    Un fichier supprimé entre-temps par un `purge_blob` concurrent est rétabli.
+
+    Returns:
+        True si le fichier a été envoyé au stockage
+    """
+    storage = get_storage()
+    if blob.ref_count > 1 and storage.exists(blob.file_path):
+        staged.unlink(missing_ok=True)
+        return False
+    storage.put_file(blob.file_path, staged)
+    return True
+
+
+async def _add_reference(db: AsyncSession, stored: StoredFile, extension: str) -> StoredBlob:
+    """Incrémente le compteur de références d'un contenu (crée l'entrée au besoin)."""
+    for _ in range(2):
+        result = cast(
+            CursorResult[Any],
+            await db.execute(
+                update(StoredBlob)
+                .where(col(StoredBlob.content_hash) == stored.content_hash)
+                .values(ref_count=col(StoredBlob.ref_count) + 1)
+            ),
+        )
+        if result.rowcount:
+            existing = await db.execute(
+                select(StoredBlob)
+                .where(col(StoredBlob.content_hash) == stored.content_hash)
+                .execution_options(populate_existing=True)
+            )
+            return cast(StoredBlob, existing.scalar_one())
+        try:
+            async with db.begin_nested():
+                blob = StoredBlob(
+                    content_hash=stored.content_hash,
+                    file_path=blob_key(stored.content_hash, extension),
+                    size=stored.size,
+                    ref_count=1,
+                )
+                db.add(blob)
+            return blob
+        except IntegrityError:
+            # Entrée créée en parallèle par un autre upload: on l'incrémente
+            continue
+    raise RuntimeError(f"Référence impossible sur le contenu {stored.content_hash}")
+
+
+async def store_upload(db: AsyncSession, file: UploadFile, extension: str) -> StoredBlob:
+    """Enregistre un fichier uploadé dans le magasin et prend une référence.
+
+    Le fichier est reçu par blocs dans `UPLOAD_DIR/.incoming/` (voir
+    `save_upload`), puis envoyé au stockage sous sa clé adressée par contenu
+    s'il n'y est pas déjà. Si la transaction est ensuite annulée, l'appelant
+    supprime les fichiers ainsi envoyés avec `discard_uploads`.
+
+    Args:
+        db: Session de base de données (la référence est validée avec la transaction)
+        file: Fichier uploadé
+        extension: Extension du fichier (".pdf", ".docx")
+
+    Returns:
+        L'entrée du magasin (clé de stockage, taille, empreinte)
+
+    Raises:
+        FileTooLargeError: Si le fichier dépasse `MAX_FILE_SIZE`
+        StorageError: Si l'envoi au stockage échoue
+    """
+    incoming = settings.upload_path / _INCOMING_DIR_NAME
+    incoming.mkdir(parents=True, exist_ok=True)
+    staged = await save_upload(file, incoming / f"{uuid4().hex}{extension}")
+
+    try:
+        blob = await _add_reference(db, staged, extension)
+        placed = await asyncio.to_thread(_place, staged.path, blob)
+    except BaseException:
+        staged.path.unlink(missing_ok=True)
+        raise
+
+    if placed:
+        db.info.setdefault(_PLACED_BLOBS_KEY, []).append((blob.file_path, blob.content_hash))
+    return blob
+
+
+async def discard_uploads(db: AsyncSession) -> None:
+    """Annule la transaction et supprime les fichiers qu'elle avait envoyés au stockage.
+
+    À appeler quand l'enregistrement des contrats uploadés échoue: sans
+    référence validée, ces fichiers ne seraient jamais supprimés. Un fichier
+    référencé entre-temps par un autre contrat est conservé (voir `purge_blob`).
+
+    Args:
+        db: Session de base de données des uploads
+    """
+    placed: list[tuple[str, str]] = db.info.pop(_PLACED_BLOBS_KEY, [])
+    await db.rollback()
+    for key, content_hash in placed:
+        try:
+            await purge_blob(db, key, content_hash)
+        except StorageError:
+            logger.exception(f"Fichier {content_hash[:12]} d'un upload annulé non supprimé")
+
+
+async def release_blob(db: AsyncSession, content_hash: str) -> str | None:
+    """Rend une référence sur un contenu.
+
+    Args:
+        db: Session de base de données
+        content_hash: Empreinte du contenu
+
+    Returns:
+        La clé à supprimer si plus aucun contrat ne la référence (voir
+        `purge_blob`, à appeler après validation de la transaction), sinon None
+    """
+    await db.execute(
+        update(StoredBlob)
+        .where(col(StoredBlob.content_hash) == content_hash)
+        .values(ref_count=col(StoredBlob.ref_count) - 1)
+    )
+    result = await db.execute(
+        select(col(StoredBlob.file_path)).where(
+            col(StoredBlob.content_hash) == content_hash,
+            col(StoredBlob.ref_count) <= 0,
+        )
+    )
+    # L'entrée reste (sans référence) jusqu'à `purge_blob`, qui la verrouille
+    key = result.scalar_one_or_none()
+    return None if key is None else str(key)
+
+
+async def purge_blob(db: AsyncSession, key: str, content_hash: str) -> bool:
+    """Supprime du stockage un fichier qui n'est plus référencé, et son texte en cache.
+
+    La suppression a lieu dans sa propre transaction, sous le verrou de l'entrée
+    du contenu (créée sans référence si besoin): un upload concurrent qui l'a
+    référencé entre-temps conserve le fichier, un upload qui le référence
+    pendant la suppression attend sa fin et le rétablit (voir `_place`).
+
+    Args:
+        db: Session de base de données (sans transaction en cours à valider)
+        key: Clé du fichier dans le stockage
+        content_hash: Empreinte du contenu
+
+    Returns:
+        True si le fichier a été supprimé, False s'il est de nouveau référencé
+
+    Raises:
+        StorageError: Si la suppression échoue
+    """
+    blob = await _lock_blob(db, key, content_hash)
+    if blob.ref_count > 0:
+        await db.rollback()
+        return False
+    try:
+        await asyncio.to_thread(_delete_blob, key, content_hash)
+    except BaseException:
+        await db.rollback()
+        raise
+    await db.delete(blob)
+    await db.commit()
+    logger.info(f"Fichier {content_hash[:12]} supprimé du magasin (plus aucune référence)")
+    return True
+
+
+async def _lock_blob(db: AsyncSession, key: str, content_hash: str) -> StoredBlob:
+    """Verrouille l'entrée d'un contenu, créée sans référence si elle n'existe pas.
+
+    Créer l'entrée met aussi en attente un upload concurrent qui la créerait.
+    """
+    for _ in range(2):
+        result = await db.execute(
+            select(StoredBlob)
+            .where(col(StoredBlob.content_hash) == content_hash)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        blob = result.scalar_one_or_none()
+        if blob is not None:
+            return cast(StoredBlob, blob)
+        try:
+            async with db.begin_nested():
+                blob = StoredBlob(content_hash=content_hash, file_path=key, size=0, ref_count=0)
+                db.add(blob)
+            return blob
+        except IntegrityError:
+            # Entrée créée en parallèle par un upload: on la verrouille
+            continue
+    raise RuntimeError(f"Verrou impossible sur le contenu {content_hash}")
+
+
+def _delete_blob(key: str, content_hash: str) -> None:
+    """Supprime un fichier du stockage et son texte extrait en cache."""
+    delete_cached_extraction(content_hash)
+    get_storage().delete(key)
@@ -5,11 +5,51 @@ Ce module fournit des fonctions pour analyser des contrats avec l'API Anthropic
 
 import json
 import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
 
 from app.config import settings
+from app.services.clause_segmenter import ClauseIndex
+from app.services.llm_client import get_llm_client
+
+# À incrémenter lorsque ANALYSIS_PROMPT change (les analyses existantes ne sont plus réutilisées)
+ANALYSIS_PROMPT_VERSION = "1"
+
+# Valeur de `Analysis.model` pour l'analyse simulée (appels externes désactivés)
+MOCK_ANALYSIS_MODEL = "mock"
+
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+
+# Réponses HTTP d'une surcharge ou d'une panne passagère (529: API Anthropic surchargée)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+
+class LLMServiceError(ValueError):
+    """Échec d'un appel à l'API Anthropic.
+
+    Attributes:
+        retryable: Erreur passagère (réseau, délai dépassé, surcharge), un nouvel
+            essai peut réussir; sinon la requête ou la réponse est en cause
+            (requête refusée, JSON invalide) et un nouvel essai échouerait pareil
+        status_code: Code HTTP de la réponse, None sans réponse
+        retry_after: Délai minimal avant un nouvel essai demandé par l'API (secondes)
+    """
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+        self.retry_after = retry_after
+
 
 ANALYSIS_PROMPT = """Tu es un expert juridique spécialisé dans l'analyse de contrats pour les TPE/PME.
 Analyse le contrat suivant et fournis une évaluation structurée.
@@ -60,85 +100,188 @@ IMPORTANT:
 - Propose au moins 2 recommandations concrètes"""
 
 
-async def analyze_contract_with_claude(contract_text: str) -> dict[str, Any]:
+def current_analysis_model() -> str:
+    """Modèle qui produirait une nouvelle analyse avec la configuration courante.
+
+    Returns:
+        `ANTHROPIC_MODEL` si les appels réels sont possibles, sinon `MOCK_ANALYSIS_MODEL`
+    """
+    api_key = settings.ANTHROPIC_API_KEY or os.getenv("ANTHROPIC_API_KEY")
+    if settings.LLM_REAL_CALLS_ENABLED and api_key:
+        return settings.ANTHROPIC_MODEL
+    return MOCK_ANALYSIS_MODEL
+
+
+async def analyze_contract_with_claude(
+    contract_text: str,
+    clause_index: ClauseIndex | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, Any]:
     """Analyse un contrat avec l'API Anthropic Claude.
 
     Args:
         contract_text: Texte du contrat à analyser
+        clause_index: Index de segmentation du contrat (troncature entre deux clauses)
+        client: Client httpx réutilisé (celui du worker); le client du processus
+            sinon (voir `llm_client`)
 
     Returns:
         Les résultats de l'analyse sous forme de dictionnaire
 
     Raises:
-        ValueError: Si l'analyse échoue ou si la clé API n'est pas configurée
+        LLMServiceError: Si l'appel à l'API ou la lecture de sa réponse échoue
+        ValueError: Si la clé API n'est pas configurée
     """
     # Cost guard: disable real external LLM calls by default.
     # Enable explicitly with `LLM_REAL_CALLS_ENABLED=true`.
     if not settings.LLM_REAL_CALLS_ENABLED:
         raise ValueError("Clé API Anthropic non configurée")
 
+    headers = anthropic_headers()
+    payload = build_analysis_payload(contract_text, clause_index)
+
+    return await _request_analysis(client or get_llm_client(), headers, payload)
+
+
+def anthropic_headers() -> dict[str, str]:
+    """En-têtes des requêtes à l'API Anthropic.
+
+    Raises:
+        ValueError: Si la clé API n'est pas configurée
+    """
     api_key = settings.ANTHROPIC_API_KEY or os.getenv("ANTHROPIC_API_KEY")
 
     if not api_key:
         raise ValueError("Clé API Anthropic non configurée")
 
+    return {
+        "x-api-key": api_key,
+        "Content-Type": "application/json",
+        "anthropic-version": "2023-06-01",
+    }
+
+
+def build_analysis_payload(
+    contract_text: str, clause_index: ClauseIndex | None = None
+) -> dict[str, Any]:
+    """Corps de la requête Messages d'analyse d'un contrat.
+
+    Args:
+        contract_text: Texte du contrat à analyser
+        clause_index: Index de segmentation du contrat (troncature entre deux clauses)
+
+    Returns:
+        Les paramètres de `POST /v1/messages` (aussi ceux d'une requête de Message Batch)
+    """
     # Limite la taille du texte ( Claude a des limites de contexte)
     max_chars = 100000
     if len(contract_text) > max_chars:
-        contract_text = contract_text[:max_chars] + "\n\n[... Contrat tronqué pour l'analyse ...]"
+        cut = clause_index.boundary_before(max_chars) if clause_index is not None else max_chars
+        contract_text = contract_text[:cut] + "\n\n[... Contrat tronqué pour l'analyse ...]"
 
     prompt = ANALYSIS_PROMPT.format(contract_text=contract_text)
 
-    headers = {
-        "x-api-key": api_key,
-        "Content-Type": "application/json",
-        "anthropic-version": "2023-06-01",
-    }
-
-    payload = {
+    return {
         "model": settings.ANTHROPIC_MODEL,
         "max_tokens": 4000,
         "messages": [{"role": "user", "content": prompt}],
     }
 
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        try:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=payload,
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            content = data["content"][0]["text"]
-
-            # Extrait le JSON de la réponse
-            # Cherche un bloc JSON entre accolades
-            start_idx = content.find("{")
-            end_idx = content.rfind("}")
-
-            if start_idx == -1 or end_idx == -1:
-                raise ValueError("Format de réponse invalide: JSON non trouvé")
-
-            json_str = content[start_idx : end_idx + 1]
-            result = json.loads(json_str)
-
-            # Normalise les résultats
-            return {
-                "summary": result.get("summary", ""),
-                "risks": result.get("risks", []),
-                "recommendations": result.get("recommendations", []),
-                "key_clauses": result.get("key_clauses", []),
-                "unfair_terms": result.get("unfair_terms", []),
-                "score_equity": result.get("score_equity", 50),
-                "score_clarity": result.get("score_clarity", 50),
-                "missing_clauses": result.get("missing_clauses", []),
-            }
-
-        except httpx.HTTPStatusError as e:
-            raise ValueError(f"Erreur API Anthropic: {e.response.status_code} - {e.response.text}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Erreur de parsing JSON: {e}")
-        except Exception as e:
-            raise ValueError(f"Erreur lors de l'analyse: {e}")
+
+async def _request_analysis(
+    client: httpx.AsyncClient, headers: dict[str, str], payload: dict[str, Any]
+) -> dict[str, Any]:
+    """Envoie la requête d'analyse et normalise la réponse JSON du modèle."""
+    try:
+        response = await client.post(ANTHROPIC_MESSAGES_URL, headers=headers, json=payload)
+    except (httpx.TimeoutException, httpx.TransportError) as e:
+        raise LLMServiceError(f"API Anthropic injoignable: {e!r}", retryable=True) from e
+
+    raise_for_api_error(response)
+
+    try:
+        data = response.json()
+    except json.JSONDecodeError as e:
+        raise LLMServiceError(f"Erreur de parsing JSON: {e}") from e
+    return parse_analysis_message(data)
+
+
+def parse_analysis_message(data: dict[str, Any]) -> dict[str, Any]:
+    """Normalise les résultats d'analyse d'une réponse Messages.
+
+    Args:
+        data: Message renvoyé par l'API (réponse directe ou résultat de Message Batch)
+
+    Returns:
+        Les résultats de l'analyse
+
+    Raises:
+        LLMServiceError: Si la réponse ne contient pas un JSON d'analyse valide
+    """
+    try:
+        content = data["content"][0]["text"]
+
+        # Extrait le JSON de la réponse
+        # Cherche un bloc JSON entre accolades
+        start_idx = content.find("{")
+        end_idx = content.rfind("}")
+
+        if start_idx == -1 or end_idx == -1:
+            raise LLMServiceError("Format de réponse invalide: JSON non trouvé")
+
+        json_str = content[start_idx : end_idx + 1]
+        result = json.loads(json_str)
+
+        # Normalise les résultats
+        return {
+            "summary": result.get("summary", ""),
+            "risks": result.get("risks", []),
+            "recommendations": result.get("recommendations", []),
+            "key_clauses": result.get("key_clauses", []),
+            "unfair_terms": result.get("unfair_terms", []),
+            "score_equity": result.get("score_equity", 50),
+            "score_clarity": result.get("score_clarity", 50),
+            "missing_clauses": result.get("missing_clauses", []),
+        }
+
+    except LLMServiceError:
+        raise
+    except json.JSONDecodeError as e:
+        raise LLMServiceError(f"Erreur de parsing JSON: {e}") from e
+    except Exception as e:
+        raise LLMServiceError(f"Erreur lors de l'analyse: {e}") from e
+
+
+def raise_for_api_error(response: httpx.Response) -> None:
+    """Lève l'erreur correspondant à une réponse en erreur de l'API Anthropic.
+
+    Raises:
+        LLMServiceError: Si la réponse est une erreur HTTP (retentable pour
+            `RETRYABLE_STATUS_CODES`)
+    """
+    if response.is_error:
+        raise LLMServiceError(
+            f"Erreur API Anthropic: {response.status_code} - {response.text}",
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            status_code=response.status_code,
+            retry_after=_retry_after(response),
+        )
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Lit l'en-tête `retry-after` (secondes ou date HTTP), None s'il est absent ou invalide."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    delay: float = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return max(0.0, delay)
@@ -0,0 +1,247 @@
+"""Clause segmentation service.
+
+Ce module découpe le texte normalisé d'un contrat en articles/clauses
+numérotés (numéro, intitulé, positions de début et de fin) et associe à
+chaque segment les types de clauses qu'il contient.
+
+L'index est calculé une seule fois par contrat puis persisté sur
+`Contract.clause_index`: la détection des types de clauses, la recherche
+juridique ciblée, la troncature des prompts et l'analyse simulée s'appuient
+dessus au lieu de reparcourir le texte complet à chaque étape.
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.core.legal_search import CLAUSE_TYPE_KEYWORDS, match_clause_types
+
+# À incrémenter lorsque le découpage change (invalide les index persistés)
+CLAUSE_INDEX_VERSION = 1
+
+PREAMBLE_HEADING = "Préambule"
+
+# "Article 5 - Garanties", "ARTICLE 5.1 : ...", "Art. IV.", "Article premier", "Clause 3"
+# Sans séparateur, l'intitulé doit commencer par une majuscule: une phrase comme
+# "Article 1641 du Code civil ..." en début de ligne n'est pas un intitulé.
+_ARTICLE_HEADING_RE = re.compile(
+    r"^[ \t]*(?:article|art\.|clause)[ \t]+"
+    r"(?P<number>premier|1er|\d{1,3}(?:\.\d{1,3})*|[ivx]{1,6})\b\.?[ \t]*"
+    r"(?:[-–—:)][^\n]*|(?-i:[A-ZÀ-Ý])[^\n]*)?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# "1. OBJET", "2.1 Durée du contrat": utilisé seulement sans aucun intitulé "Article"
+_NUMBERED_HEADING_RE = re.compile(
+    r"^[ \t]*(?P<number>\d{1,2}(?:\.\d{1,2})*)[.)]?[ \t]+" r"[A-ZÀ-Ý][^\n]{0,78}[^\n.;:,][ \t]*$",
+    re.MULTILINE,
+)
+_FIRST_ARTICLE_NUMBERS = {"premier", "1er"}
+# Début d'extrait recherché pour rattacher une citation du LLM à un segment
+_LOCATE_PROBE_CHARS = 60
+
+
+@dataclass
+class ClauseSegment:
+    """Article ou clause du contrat, repéré par ses positions dans le texte.
+
+    Attributes:
+        number: Numéro normalisé ("5", "5.1", "IV"), None pour le préambule
+        heading: Ligne d'intitulé telle qu'écrite dans le contrat
+        start: Position du premier caractère (intitulé inclus)
+        end: Position suivant le dernier caractère
+        level: Profondeur (1 pour "5", 2 pour "5.1", 0 pour le préambule)
+        clause_types: Types de clauses détectés dans le segment
+    """
+
+    number: str | None
+    heading: str
+    start: int
+    end: int
+    level: int
+    clause_types: list[str] = field(default_factory=list)
+
+    @property
+    def parent(self) -> str | None:
+        """Numéro de l'article parent ("5" pour "5.1")."""
+        if self.number and "." in self.number:
+            return self.number.rsplit(".", 1)[0]
+        return None
+
+
+@dataclass
+class ClauseIndex:
+    """Index de segmentation d'un texte de contrat.
+
+    Attributes:
+        segments: Segments dans l'ordre du texte, couvrant le texte entier
+        text_length: Longueur du texte segmenté
+        text_hash: SHA-256 du texte segmenté (détecte un index périmé)
+    """
+
+    segments: list[ClauseSegment]
+    text_length: int
+    text_hash: str
+
+    @property
+    def clause_types(self) -> list[str]:
+        """Types de clauses du contrat, dans l'ordre de priorité de la recherche."""
+        present = {clause_type for segment in self.segments for clause_type in segment.clause_types}
+        ordered = [clause_type for clause_type in CLAUSE_TYPE_KEYWORDS if clause_type in present]
+        return ordered if ordered else ["general"]
+
+    def segments_of_type(self, clause_type: str) -> list[ClauseSegment]:
+        """Segments contenant un type de clause donné."""
+        return [segment for segment in self.segments if clause_type in segment.clause_types]
+
+    def segment_at(self, offset: int) -> ClauseSegment | None:
+        """Segment contenant une position du texte."""
+        starts = [segment.start for segment in self.segments]
+        position = bisect_right(starts, offset) - 1
+        if position < 0 or offset >= self.text_length:
+            return None
+        return self.segments[position]
+
+    def locate(self, text: str, excerpt: str) -> ClauseSegment | None:
+        """Segment contenant un extrait verbatim du texte (ex: `texte_clause` du LLM).
+
+        Args:
+            text: Texte segmenté
+            excerpt: Extrait cité
+
+        Returns:
+            Le segment contenant le début de l'extrait, ou None s'il est introuvable
+        """
+        probe = " ".join(excerpt.split())[:_LOCATE_PROBE_CHARS]
+        if not probe:
+            return None
+        offset = text.find(probe)
+        return self.segment_at(offset) if offset >= 0 else None
+
+    def boundary_before(self, limit: int) -> int:
+        """Dernière fin de segment avant `limit`, pour tronquer sans couper une clause.
+
+        Returns:
+            La position de coupure, ou `limit` si le premier segment dépasse déjà la limite
+        """
+        best = 0
+        for segment in self.segments:
+            if segment.end > limit:
+                break
+            best = segment.end
+        return best or limit
+
+    def as_dict(self) -> dict[str, Any]:
+        """Sérialisation pour `Contract.clause_index`."""
+        return {
+            "version": CLAUSE_INDEX_VERSION,
+            "text_length": self.text_length,
+            "text_hash": self.text_hash,
+            "segments": [asdict(segment) for segment in self.segments],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any] | None, text: str) -> "ClauseIndex | None":
+        """Recharge un index persisté s'il correspond toujours au texte.
+
+        Args:
+            payload: Contenu de `Contract.clause_index`
+            text: Texte normalisé courant du contrat
+
+        Returns:
+            L'index, ou None s'il est absent, d'une autre version ou calculé sur un autre texte
+        """
+        if not isinstance(payload, dict) or payload.get("version") != CLAUSE_INDEX_VERSION:
+            return None
+        if payload.get("text_length") != len(text) or payload.get("text_hash") != _text_hash(text):
+            return None
+        try:
+            segments = [ClauseSegment(**segment) for segment in payload["segments"]]
+        except (KeyError, TypeError):
+            return None
+        return cls(segments=segments, text_length=len(text), text_hash=payload["text_hash"])
+
+
+def _text_hash(text: str) -> str:
+    """Empreinte du texte segmenté."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_number(raw: str) -> str:
+    """Numéro d'article canonique ("premier" -> "1", "iv" -> "IV")."""
+    lowered = raw.lower()
+    if lowered in _FIRST_ARTICLE_NUMBERS:
+        return "1"
+    if lowered.isalpha():
+        return raw.upper()
+    return raw
+
+
+def _find_headings(text: str) -> list[re.Match[str]]:
+    """Intitulés d'articles, ou à défaut de sections numérotées."""
+    headings = list(_ARTICLE_HEADING_RE.finditer(text))
+    if headings:
+        return headings
+    return list(_NUMBERED_HEADING_RE.finditer(text))
+
+
+def segment_clauses(text: str) -> ClauseIndex:
+    """Découpe un texte de contrat en articles/clauses.
+
+    Le texte avant le premier intitulé forme un segment "Préambule"; un texte
+    sans aucun intitulé forme un segment unique. Les segments couvrent donc
+    le texte entier, et le texte n'est mis en minuscules qu'une seule fois.
+
+    Args:
+        text: Texte normalisé du contrat
+
+    Returns:
+        L'index de segmentation
+    """
+    headings = _find_headings(text)
+    text_lower = text.lower()
+    segments: list[ClauseSegment] = []
+
+    first_start = headings[0].start() if headings else len(text)
+    if text[:first_start].strip() or not headings:
+        segments.append(
+            ClauseSegment(
+                number=None,
+                heading=PREAMBLE_HEADING if headings else "",
+                start=0,
+                end=first_start,
+                level=0,
+            )
+        )
+
+    for position, match in enumerate(headings):
+        end = headings[position + 1].start() if position + 1 < len(headings) else len(text)
+        number = _normalize_number(match.group("number"))
+        segments.append(
+            ClauseSegment(
+                number=number,
+                heading=match.group(0).strip(),
+                start=match.start(),
+                end=end,
+                level=number.count(".") + 1,
+            )
+        )
+
+    for segment in segments:
+        segment.clause_types = match_clause_types(text_lower[segment.start : segment.end])
+
+    return ClauseIndex(segments=segments, text_length=len(text), text_hash=_text_hash(text))
+
+
+def load_or_segment(stored: dict[str, Any] | None, text: str) -> ClauseIndex:
+    """Réutilise l'index persisté d'un contrat, ou le recalcule s'il est périmé.
+
+    Args:
+        stored: Contenu de `Contract.clause_index`
+        text: Texte normalisé courant du contrat
+
+    Returns:
+        L'index correspondant au texte
+    """
+    return ClauseIndex.from_dict(stored, text) or segment_clauses(text)
@@ -0,0 +1,110 @@
+"""Extracted-text cache.
+
+Ce module met en cache sur disque le résultat d'extraction des documents
+(texte par page et nombre de pages), indexé par le SHA-256 du fichier source.
+Les retries Celery, les ré-analyses et les ré-uploads d'un fichier identique
+évitent ainsi le parsing PDF/DOCX.
+
+Les entrées sont compressées (gzip) et écrites de manière atomique, ce qui
+permet de partager le dossier entre l'API et les workers.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter lorsque la sortie des extracteurs change (invalide les entrées existantes)
+EXTRACTION_CACHE_VERSION = 3
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: str | Path) -> str:
+    """Calcule le SHA-256 d'un fichier en le lisant par blocs.
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_file(content_hash: str) -> Path:
+    """Chemin de l'entrée de cache pour une empreinte donnée."""
+    name = f"{content_hash}.v{EXTRACTION_CACHE_VERSION}.json.gz"
+    return settings.extraction_cache_path / content_hash[:2] / name
+
+
+def get_cached_extraction(content_hash: str) -> dict[str, Any] | None:
+    """Retourne l'extraction en cache pour une empreinte, ou None.
+
+    Une entrée illisible ou corrompue est traitée comme absente.
+
+    Returns:
+        Dictionnaire {"pages": list[str], "page_count": int | None} ou None
+    """
+    path = _cache_file(content_hash)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if not isinstance(payload, dict) or not isinstance(payload.get("pages"), list):
+            raise ValueError("format inattendu")
+        return payload
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError):
+        logger.warning(f"Entrée de cache d'extraction illisible: {path.name}")
+        return None
+
+
+def store_cached_extraction(content_hash: str, payload: dict[str, Any]) -> None:
+    """Enregistre une extraction complète pour une empreinte.
+
+    L'écriture passe par un fichier temporaire renommé atomiquement: un lecteur
+    concurrent ne voit jamais une entrée partielle. Les erreurs sont journalisées
+    mais jamais propagées (le cache est une optimisation).
+    """
+    path = _cache_file(content_hash)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                gz.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except OSError as e:
+        logger.warning(f"Écriture du cache d'extraction impossible: {e}")
+
+
+def delete_cached_extraction(content_hash: str) -> bool:
+    """Supprime l'entrée de cache d'une empreinte (suppression RGPD).
+
+    Returns:
+        True si une entrée a été supprimée
+    """
+    try:
+        _cache_file(content_hash).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Suppression du cache d'extraction impossible: {e}")
+        return False
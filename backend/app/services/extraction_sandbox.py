@@ -0,0 +1,67 @@
+"""Extraction sandbox process.
+
+Point d'entrée du processus d'extraction isolé (voir `_extract_in_sandbox`
+dans `text_extractor`), lancé avec `subprocess` dans sa propre session:
+    python -m app.services.extraction_sandbox
+
+Protocole (pickle sur stdin/stdout):
+    - entrée: `(extracteur, chemin, budget, limite mémoire)`, l'extracteur étant
+      importable depuis le `PYTHONPATH` transmis par le parent
+    - sortie: `(statut, résultat)` avec statut "ok", "memory" ou "error"
+
+Le processus surveille son parent: si celui-ci disparaît (processus du pool
+Celery tué ou recyclé en pleine extraction), il arrête tout son groupe, workers
+du pool PDF compris, au lieu de continuer à parser pour personne.
+"""
+
+import os
+import pickle
+import resource
+import signal
+import sys
+import threading
+import time
+from typing import Any
+
+# Intervalle de vérification du processus parent (secondes)
+PARENT_CHECK_INTERVAL = 0.5
+
+
+def _watch_parent(parent_pid: int) -> None:
+    """Arrête le groupe du processus dès que son parent a disparu."""
+    while True:
+        if os.getppid() != parent_pid:
+            os.killpg(0, signal.SIGKILL)
+        time.sleep(PARENT_CHECK_INTERVAL)
+
+
+def main() -> None:
+    """Lit la demande d'extraction, l'exécute et écrit son résultat."""
+    parent_pid = os.getppid()
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+
+    # Le résultat passe par une copie de stdout: ce que les extracteurs
+    # écriraient sur la sortie standard part sur stderr
+    output = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    # Désérialiser l'extracteur importe les modules d'extraction: avant la limite mémoire
+    extractor, file_path, max_chars, memory_limit = pickle.load(sys.stdin.buffer)
+    if memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    response: tuple[str, Any]
+    try:
+        response = ("ok", extractor(file_path, max_chars))
+    except MemoryError:
+        response = ("memory", None)
+    except Exception as e:
+        # Les extracteurs enveloppent leurs erreurs dans ValueError
+        response = ("memory" if isinstance(e.__context__, MemoryError) else "error", str(e))
+
+    pickle.dump(response, output)
+    output.close()
+
+
+if __name__ == "__main__":
+    main()
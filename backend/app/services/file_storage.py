@@ -0,0 +1,113 @@
+"""Uploaded file storage.
+
+Ce module enregistre les fichiers uploadés sans jamais les charger entiers en
+mémoire: le corps est lu par blocs, écrit dans un fichier temporaire du
+dossier de destination, la taille maximale est vérifiée au fil de l'eau et le
+SHA-256 calculé pendant l'écriture. Le fichier n'apparaît sous son nom final
+qu'une fois complet (renommage atomique).
+
+Les écritures disque s'exécutent hors de la boucle d'événements.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from fastapi import UploadFile
+
+from app.config import settings
+
+
+class FileTooLargeError(ValueError):
+    """Le fichier uploadé dépasse la taille maximale autorisée."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        super().__init__(
+            f"Fichier trop volumineux. Taille maximale: {max_size / (1024 * 1024):.0f}MB"
+        )
+
+
+@dataclass
+class StoredFile:
+    """Fichier enregistré sur disque.
+
+    Attributes:
+        path: Chemin final du fichier
+        size: Taille en octets
+        content_hash: SHA-256 hexadécimal du contenu
+    """
+
+    path: Path
+    size: int
+    content_hash: str
+
+
+def _discard(file: IO[bytes]) -> None:
+    """Ferme et supprime un fichier temporaire incomplet."""
+    file.close()
+    try:
+        os.unlink(file.name)
+    except FileNotFoundError:
+        pass
+
+
+def _finalize(file: IO[bytes], destination: Path) -> None:
+    """Synchronise le fichier temporaire puis le renomme à son emplacement final."""
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+    os.replace(file.name, destination)
+
+
+async def save_upload(
+    file: UploadFile,
+    destination: Path,
+    max_size: int | None = None,
+    chunk_size: int | None = None,
+) -> StoredFile:
+    """Enregistre un fichier uploadé par blocs.
+
+    Args:
+        file: Fichier uploadé
+        destination: Chemin final (son dossier doit exister)
+        max_size: Taille maximale en octets (défaut: `MAX_FILE_SIZE`)
+        chunk_size: Taille des blocs lus (défaut: `UPLOAD_CHUNK_SIZE`)
+
+    Returns:
+        Le fichier enregistré (chemin, taille, empreinte)
+
+    Raises:
+        FileTooLargeError: Dès que le contenu lu dépasse `max_size` (rien n'est conservé)
+    """
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    # Même dossier que la destination: le renommage final reste atomique
+    temp = await asyncio.to_thread(
+        tempfile.NamedTemporaryFile,
+        mode="wb",
+        dir=destination.parent,
+        prefix=".upload-",
+        suffix=".part",
+        delete=False,
+    )
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(max_size)
+            digest.update(chunk)
+            await asyncio.to_thread(temp.write, chunk)
+        await asyncio.to_thread(_finalize, temp, destination)
+    except BaseException:
+        await asyncio.to_thread(_discard, temp)
+        raise
+
+    return StoredFile(path=destination, size=size, content_hash=digest.hexdigest())
@@ -0,0 +1,248 @@
+"""Anthropic Message Batches.
+
+Ce module fournit le mode batch des analyses non interactives (uploads groupés):
+au lieu d'un appel `POST /v1/messages` par contrat, les contrats extraits
+attendent dans Redis et sont soumis ensemble à l'API Message Batches, qui les
+traite de façon asynchrone (en moins de 24 heures) avec un débit bien supérieur
+pour le même budget de rate limit, à moitié prix.
+
+Déroulement (voir `batch_analysis_pipeline` dans `app/tasks/analysis.py`):
+    1. l'extraction du texte est faite comme pour une analyse interactive, puis
+       le résultat d'étape est déposé dans `PENDING_KEY`;
+    2. la tâche périodique `poll_llm_batches` soumet les contrats en attente en
+       une Message Batch, dont les résultats d'étape sont gardés dans `BATCH_KEY`;
+    3. à la fin de la batch, la même tâche relit ses résultats et enregistre
+       chaque analyse (ou la remet en attente après une erreur passagère).
+
+Structures Redis:
+    - `PENDING_KEY`: contrat → résultat d'étape, en attente de soumission
+    - `BATCHES_KEY`: ensemble des batches soumises non terminées
+    - `BATCH_KEY`: contrat → résultat d'étape, par batch soumise
+    - `SUBMITTED_KEY`: contrat → batch (une analyse redélivrée n'est pas soumise deux fois)
+
+Le mode batch n'est utilisé que si `LLM_BATCH_ENABLED` est vrai et que les
+appels réels au LLM sont possibles; sinon les analyses suivent la file
+d'analyses habituelle.
+"""
+
+import json
+from collections.abc import Awaitable
+from typing import Any, cast
+
+import httpx
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.services.claude_service import (
+    MOCK_ANALYSIS_MODEL,
+    LLMServiceError,
+    anthropic_headers,
+    current_analysis_model,
+    raise_for_api_error,
+)
+
+ANTHROPIC_BATCHES_URL = "https://api.anthropic.com/v1/messages/batches"
+
+PENDING_KEY = "llm-batch:pending"
+BATCHES_KEY = "llm-batch:batches"
+BATCH_KEY = "llm-batch:batch:{batch_id}"
+SUBMITTED_KEY = "llm-batch:submitted"
+# Verrou de la tâche périodique (deux passages ne soumettent pas les mêmes contrats)
+POLL_LOCK_KEY = "llm-batch:poll"
+
+# Batch dont tous les résultats sont disponibles (`processing_status`)
+BATCH_ENDED = "ended"
+
+# Types de résultat d'une requête de batch
+RESULT_SUCCEEDED = "succeeded"
+RESULT_ERRORED = "errored"
+
+# Erreurs passagères d'une requête de batch: la requête est soumise à nouveau
+RETRYABLE_BATCH_ERRORS = frozenset({"api_error", "overloaded_error", "rate_limit_error"})
+
+
+def batch_mode_enabled() -> bool:
+    """Indique si les analyses groupées passent par l'API Message Batches."""
+    return settings.LLM_BATCH_ENABLED and current_analysis_model() != MOCK_ANALYSIS_MODEL
+
+
+def dispatch_batch_analyses(jobs: list[list[str]]) -> None:
+    """Envoie des analyses à Celery en mode batch (hors file d'analyses).
+
+    Les analyses en batch n'occupent pas de place de la file d'analyses: elles
+    ne consomment pas le budget de rate limit des appels interactifs.
+
+    Args:
+        jobs: Analyses à lancer; chaque analyse regroupe des contrats de contenu
+            identique (seul le premier est soumis, les suivants reprennent son analyse)
+    """
+    from celery import group
+
+    from app.tasks.analysis import batch_analysis_pipeline
+
+    pipelines = [batch_analysis_pipeline(*contract_ids) for contract_ids in jobs]
+    if len(pipelines) == 1:
+        pipelines[0].apply_async()
+    elif pipelines:
+        group(pipelines).apply_async()
+
+
+async def enqueue_request(
+    redis: Redis, contract_id: str, stage: dict[str, Any], resubmit: bool = False
+) -> bool:
+    """Met en attente de soumission le texte extrait d'un contrat.
+
+    Args:
+        redis: Client Redis
+        contract_id: ID du contrat (UUID string)
+        stage: Résultat de l'étape d'extraction
+        resubmit: Requête d'une batch à soumettre à nouveau (erreur passagère)
+
+    Returns:
+        False si le contrat est déjà dans une batch soumise (tâche redélivrée)
+    """
+    if not resubmit:
+        submitted = await cast(Awaitable[str | None], redis.hget(SUBMITTED_KEY, contract_id))
+        if submitted is not None:
+            return False
+    await cast(Awaitable[int], redis.hset(PENDING_KEY, contract_id, json.dumps(stage)))
+    return True
+
+
+async def take_pending(redis: Redis, limit: int) -> dict[str, dict[str, Any]]:
+    """Retire de l'attente au plus `limit` contrats à soumettre.
+
+    Returns:
+        Contrat → résultat d'étape
+    """
+    pending = await cast(Awaitable[dict[str, str]], redis.hgetall(PENDING_KEY))
+    taken = dict(list(pending.items())[:limit])
+    if taken:
+        await cast(Awaitable[int], redis.hdel(PENDING_KEY, *taken))
+    return {contract_id: json.loads(stage) for contract_id, stage in taken.items()}
+
+
+async def track_batch(redis: Redis, batch_id: str, stages: dict[str, dict[str, Any]]) -> None:
+    """Enregistre une batch soumise et les résultats d'étape de ses contrats."""
+    await cast(
+        Awaitable[int],
+        redis.hset(
+            BATCH_KEY.format(batch_id=batch_id),
+            mapping={contract_id: json.dumps(stage) for contract_id, stage in stages.items()},
+        ),
+    )
+    await cast(
+        Awaitable[int],
+        redis.hset(SUBMITTED_KEY, mapping={contract_id: batch_id for contract_id in stages}),
+    )
+    await cast(Awaitable[int], redis.sadd(BATCHES_KEY, batch_id))
+
+
+async def submitted_batches(redis: Redis) -> list[str]:
+    """Batches soumises dont les résultats n'ont pas encore été enregistrés."""
+    return sorted(await cast(Awaitable[set[str]], redis.smembers(BATCHES_KEY)))
+
+
+async def batch_stages(redis: Redis, batch_id: str) -> dict[str, dict[str, Any]]:
+    """Résultats d'étape des contrats d'une batch qui n'ont pas encore été traités."""
+    stages = await cast(
+        Awaitable[dict[str, str]], redis.hgetall(BATCH_KEY.format(batch_id=batch_id))
+    )
+    return {contract_id: json.loads(stage) for contract_id, stage in stages.items()}
+
+
+async def forget_request(redis: Redis, batch_id: str, contract_id: str) -> None:
+    """Retire d'une batch un contrat dont le résultat a été traité."""
+    await cast(Awaitable[int], redis.hdel(BATCH_KEY.format(batch_id=batch_id), contract_id))
+    await cast(Awaitable[int], redis.hdel(SUBMITTED_KEY, contract_id))
+
+
+async def forget_batch(redis: Redis, batch_id: str) -> None:
+    """Oublie une batch dont tous les résultats ont été traités."""
+    await cast(Awaitable[int], redis.srem(BATCHES_KEY, batch_id))
+    await redis.delete(BATCH_KEY.format(batch_id=batch_id))
+
+
+async def create_batch(client: httpx.AsyncClient, requests: list[dict[str, Any]]) -> dict[str, Any]:
+    """Soumet une Message Batch.
+
+    Args:
+        client: Client httpx (celui du worker)
+        requests: Requêtes `{"custom_id": ..., "params": ...}` (paramètres Messages)
+
+    Returns:
+        La batch créée (`id`, `processing_status`, ...)
+
+    Raises:
+        LLMServiceError: Si l'API refuse la batch ou est injoignable
+    """
+    return await _call_batches_api(
+        client, "POST", ANTHROPIC_BATCHES_URL, json={"requests": requests}
+    )
+
+
+async def retrieve_batch(client: httpx.AsyncClient, batch_id: str) -> dict[str, Any]:
+    """Relit l'état d'une Message Batch.
+
+    Raises:
+        LLMServiceError: Si l'API est injoignable ou renvoie une erreur
+    """
+    return await _call_batches_api(client, "GET", f"{ANTHROPIC_BATCHES_URL}/{batch_id}")
+
+
+async def batch_results(client: httpx.AsyncClient, batch: dict[str, Any]) -> list[dict[str, Any]]:
+    """Télécharge les résultats d'une batch terminée.
+
+    Args:
+        client: Client httpx (celui du worker)
+        batch: Batch terminée (`processing_status` == `BATCH_ENDED`)
+
+    Returns:
+        Un résultat par requête: `{"custom_id": ..., "result": {"type": ..., ...}}`
+
+    Raises:
+        LLMServiceError: Si l'API est injoignable ou renvoie une erreur
+    """
+    url = batch.get("results_url") or f"{ANTHROPIC_BATCHES_URL}/{batch['id']}/results"
+    response = await _send(client, "GET", url)
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def result_error(result: dict[str, Any]) -> LLMServiceError:
+    """Erreur correspondant au résultat non abouti d'une requête de batch.
+
+    Les requêtes expirées ou annulées, et les erreurs passagères de l'API, sont
+    retentables (soumises dans une prochaine batch); une requête refusée ne l'est pas.
+    """
+    if result["type"] != RESULT_ERRORED:
+        return LLMServiceError(f"Requête de batch non traitée: {result['type']}", retryable=True)
+    error = result.get("error") or {}
+    # Format de l'API: {"type": "error", "error": {"type": ..., "message": ...}}
+    error = error.get("error", error)
+    error_type = error.get("type", "api_error")
+    return LLMServiceError(
+        f"Erreur API Anthropic (batch): {error_type} - {error.get('message', '')}",
+        retryable=error_type in RETRYABLE_BATCH_ERRORS,
+    )
+
+
+async def _call_batches_api(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+) -> dict[str, Any]:
+    """Appelle l'API Message Batches et retourne sa réponse JSON."""
+    response = await _send(client, method, url, **kwargs)
+    try:
+        return cast(dict[str, Any], response.json())
+    except json.JSONDecodeError as e:
+        raise LLMServiceError(f"Erreur de parsing JSON: {e}") from e
+
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Appelle l'API Message Batches avec la classification d'erreurs des appels Messages."""
+    try:
+        response = await client.request(method, url, headers=anthropic_headers(), **kwargs)
+    except (httpx.TimeoutException, httpx.TransportError) as e:
+        raise LLMServiceError(f"API Anthropic injoignable: {e!r}", retryable=True) from e
+
+    raise_for_api_error(response)
+    return response
@@ -0,0 +1,315 @@
+"""LLM result cache.
+
+Ce module met en cache les résultats d'analyse du LLM, indexés par modèle,
+empreinte des prompts et empreinte du texte normalisé du contrat: une
+ré-analyse d'un texte identique (nouvel essai après un échec d'enregistrement,
+analyse relancée, même contrat uploadé sous un autre fichier) ne repasse pas
+par l'API Anthropic.
+
+Deux niveaux:
+    - Redis, partagé par l'API et les workers (`LLM_CACHE_TTL_SECONDS`);
+    - Postgres (table `llm_cache_entries`, `LLM_CACHE_DB_TTL_DAYS`): un
+      résultat absent de Redis (expiré, Redis vidé) y est relu, puis remis
+      dans Redis.
+
+L'empreinte des prompts est calculée sur les gabarits eux-mêmes (et
+`ANALYSIS_PROMPT_VERSION`): toute modification d'un prompt change les clés, les
+anciennes entrées ne sont plus lues. La tâche périodique `purge_llm_cache`
+(`invalidate_stale_entries`) les supprime des deux niveaux, avec les entrées
+Postgres expirées.
+
+Les résultats citent les clauses des contrats (données personnelles): chaque
+analyse garde la clé de son entrée (`Analysis.llm_cache_key`), supprimée avec
+le compte de l'utilisateur (`delete_cached_results`).
+
+Un échec de Redis ou de la base n'empêche jamais une analyse: le niveau en
+échec est ignoré.
+"""
+
+import hashlib
+import json
+import logging
+import unicodedata
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.metrics import increment_daily
+from app.models import LLMCacheEntry
+from app.models.base import utc_now
+from app.prompts.legal_analysis import LEGAL_ANALYSIS_CONTRACT_TEMPLATE, LEGAL_ANALYSIS_INSTRUCTIONS
+from app.services.claude_service import (
+    ANALYSIS_PROMPT,
+    ANALYSIS_PROMPT_VERSION,
+    MOCK_ANALYSIS_MODEL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Types d'analyse mis en cache
+KIND_ANALYSIS = "analysis"  # analyze_contract_with_claude (workers)
+KIND_LEGAL_ANALYSIS = "legal"  # analyze_contract_enhanced (analyse v2)
+
+CACHE_KEY = "llm-cache:{kind}:{model}:{prompt_hash}:{text_hash}"
+# Type d'analyse → empreinte des prompts des entrées Redis (invalidation)
+PROMPT_HASHES_KEY = "llm-cache:prompts"
+
+LLM_CACHE_HIT_METRIC = "llm_cache.hit"
+
+# Métadonnées propres à l'appel qui a produit un résultat, retirées des résultats relus
+CALL_METADATA_KEYS = ("_llm_usage", "_llm_cache")
+
+# Gabarits dont dépend le résultat de chaque type d'analyse
+_PROMPT_TEMPLATES: dict[str, tuple[str, ...]] = {
+    KIND_ANALYSIS: (ANALYSIS_PROMPT_VERSION, ANALYSIS_PROMPT),
+    KIND_LEGAL_ANALYSIS: (LEGAL_ANALYSIS_INSTRUCTIONS, LEGAL_ANALYSIS_CONTRACT_TEMPLATE),
+}
+
+
+@dataclass(frozen=True)
+class LLMCacheKey:
+    """Clé de cache d'un résultat du LLM.
+
+    Attributes:
+        kind: Type d'analyse (`KIND_ANALYSIS`, `KIND_LEGAL_ANALYSIS`)
+        model: Modèle qui produit le résultat
+        prompt_hash: Empreinte des prompts (`prompt_hash`)
+        text_hash: Empreinte du texte normalisé (`text_hash`)
+    """
+
+    kind: str
+    model: str
+    prompt_hash: str
+    text_hash: str
+
+    def __str__(self) -> str:
+        return CACHE_KEY.format(
+            kind=self.kind,
+            model=self.model,
+            prompt_hash=self.prompt_hash,
+            text_hash=self.text_hash,
+        )
+
+
+def prompt_hash(kind: str) -> str:
+    """Empreinte des prompts d'un type d'analyse (16 caractères hexadécimaux)."""
+    digest = hashlib.sha256("\0".join(_PROMPT_TEMPLATES[kind]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def text_hash(contract_text: str) -> str:
+    """SHA-256 du texte normalisé (forme NFC, blancs consécutifs réduits à une espace).
+
+    Deux extractions d'un même contrat qui ne diffèrent que par la mise en page
+    (sauts de ligne, espaces) partagent ainsi la même entrée.
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", contract_text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(kind: str, model: str, contract_text: str) -> LLMCacheKey | None:
+    """Clé de cache d'une analyse.
+
+    Args:
+        kind: Type d'analyse
+        model: Modèle qui produirait l'analyse
+        contract_text: Texte du contrat analysé
+
+    Returns:
+        La clé, ou None si le cache est désactivé (`LLM_CACHE_ENABLED`) ou si
+        l'analyse est simulée
+    """
+    if not settings.LLM_CACHE_ENABLED or model == MOCK_ANALYSIS_MODEL:
+        return None
+    return LLMCacheKey(kind, model, prompt_hash(kind), text_hash(contract_text))
+
+
+async def get_cached_result(
+    key: LLMCacheKey | None,
+    redis: Redis,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> dict[str, Any] | None:
+    """Retourne le résultat en cache d'une analyse (Redis, puis Postgres).
+
+    Args:
+        key: Clé de cache (None: cache désactivé)
+        redis: Client Redis
+        session_factory: Fabrique de sessions de base de données
+
+    Returns:
+        Le résultat (sans les métadonnées de l'appel d'origine), ou None
+    """
+    if key is None:
+        return None
+
+    tier = "redis"
+    result: dict[str, Any] | None = None
+    try:
+        cached = await redis.get(str(key))
+        if cached is not None:
+            result = json.loads(cached)
+    except (RedisError, json.JSONDecodeError) as e:
+        logger.warning(f"Cache LLM (Redis) illisible, ignoré: {e!r}")
+
+    if result is None:
+        tier = "postgres"
+        try:
+            async with session_factory() as db:
+                found = await db.execute(
+                    select(LLMCacheEntry).where(
+                        col(LLMCacheEntry.cache_key) == str(key),
+                        col(LLMCacheEntry.created_at) >= _db_expiry_cutoff(),
+                    )
+                )
+                entry = found.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            logger.warning(f"Cache LLM (base) illisible, ignoré: {e!r}")
+            return None
+        if entry is None:
+            return None
+        result = dict(entry.result)
+        await _set_redis(redis, key, result)
+
+    logger.info(f"Résultat LLM relu depuis le cache ({tier}): {key}")
+    await increment_daily(LLM_CACHE_HIT_METRIC, redis=redis)
+    return {name: value for name, value in result.items() if name not in CALL_METADATA_KEYS}
+
+
+async def store_cached_result(
+    key: LLMCacheKey | None,
+    result: dict[str, Any],
+    redis: Redis,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Met en cache le résultat d'une analyse (Redis et Postgres).
+
+    Les résultats d'échec (`erreur`, `erreur_parsing` de l'analyse v2) ne sont
+    pas mis en cache.
+
+    Args:
+        key: Clé de cache (None: cache désactivé)
+        result: Résultat de l'analyse
+        redis: Client Redis
+        session_factory: Fabrique de sessions de base de données
+    """
+    if key is None or "erreur" in result or result.get("erreur_parsing"):
+        return
+
+    await _set_redis(redis, key, result)
+    try:
+        async with session_factory() as db:
+            await db.merge(
+                LLMCacheEntry(
+                    cache_key=str(key),
+                    kind=key.kind,
+                    model=key.model,
+                    prompt_hash=key.prompt_hash,
+                    result=result,
+                )
+            )
+            await db.commit()
+    except SQLAlchemyError as e:
+        # Entrée écrite en parallèle par une autre analyse du même texte, base indisponible
+        logger.warning(f"Résultat LLM non enregistré en base: {e!r}")
+
+
+async def invalidate_stale_entries(
+    redis: Redis, session_factory: async_sessionmaker[AsyncSession]
+) -> int:
+    """Supprime les entrées expirées ou produites avec d'autres prompts que ceux du code courant.
+
+    Appelée par la tâche périodique `purge_llm_cache`. Redis n'est parcouru que
+    pour les types d'analyse dont l'empreinte des prompts a changé depuis le
+    dernier passage (`PROMPT_HASHES_KEY`); ses entrées expirent d'elles-mêmes.
+
+    Returns:
+        Nombre d'entrées supprimées (Redis et base)
+    """
+    current = {kind: prompt_hash(kind) for kind in _PROMPT_TEMPLATES}
+    removed = 0
+
+    try:
+        async with session_factory() as db:
+            result = await db.execute(
+                delete(LLMCacheEntry).where(col(LLMCacheEntry.created_at) < _db_expiry_cutoff())
+            )
+            removed += _rowcount(result)
+            for kind, digest in current.items():
+                result = await db.execute(
+                    delete(LLMCacheEntry).where(
+                        col(LLMCacheEntry.kind) == kind,
+                        col(LLMCacheEntry.prompt_hash) != digest,
+                    )
+                )
+                removed += _rowcount(result)
+            await db.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Invalidation du cache LLM (base) impossible: {e!r}")
+
+    try:
+        known = await cast(Awaitable[dict[str, str]], redis.hgetall(PROMPT_HASHES_KEY))
+        for kind, digest in current.items():
+            if known.get(kind) == digest:
+                continue
+            async for name in redis.scan_iter(match=f"llm-cache:{kind}:*", count=500):
+                # llm-cache:{kind}:{model}:{prompt_hash}:{text_hash}
+                if name.rsplit(":", 2)[1] != digest:
+                    await redis.delete(name)
+                    removed += 1
+            await cast(Awaitable[int], redis.hset(PROMPT_HASHES_KEY, kind, digest))
+    except RedisError as e:
+        logger.warning(f"Invalidation du cache LLM (Redis) impossible: {e!r}")
+
+    if removed:
+        logger.info(f"Cache LLM: {removed} entrées expirées ou d'anciens prompts supprimées")
+    return removed
+
+
+async def delete_cached_results(db: AsyncSession, redis: Redis, keys: list[str]) -> None:
+    """Supprime des entrées de cache (suppression du compte d'un utilisateur).
+
+    Les lignes sont supprimées dans la transaction de `db` (validée par l'appelant).
+
+    Args:
+        db: Session de base de données
+        redis: Client Redis
+        keys: Clés de cache (`Analysis.llm_cache_key`)
+    """
+    if not keys:
+        return
+    await db.execute(delete(LLMCacheEntry).where(col(LLMCacheEntry.cache_key).in_(keys)))
+    try:
+        await redis.delete(*keys)
+    except RedisError as e:
+        # Entrées Redis expirées d'elles-mêmes après LLM_CACHE_TTL_SECONDS
+        logger.warning(f"Entrées du cache LLM (Redis) non supprimées: {e!r}")
+
+
+def _db_expiry_cutoff() -> datetime:
+    """Date avant laquelle une entrée Postgres est expirée."""
+    return utc_now() - timedelta(days=settings.LLM_CACHE_DB_TTL_DAYS)
+
+
+def _rowcount(result: Any) -> int:
+    """Nombre de lignes supprimées par un DELETE."""
+    return int(getattr(result, "rowcount", 0) or 0)
+
+
+async def _set_redis(redis: Redis, key: LLMCacheKey, result: dict[str, Any]) -> None:
+    """Écrit un résultat dans Redis (`LLM_CACHE_TTL_SECONDS`)."""
+    try:
+        await redis.set(
+            str(key), json.dumps(result, ensure_ascii=False), ex=settings.LLM_CACHE_TTL_SECONDS
+        )
+    except RedisError as e:
+        logger.warning(f"Cache LLM (Redis) non écrit: {e!r}")
@@ -0,0 +1,173 @@
+"""LLM HTTP client.
+
+Ce module fournit le client HTTP vers l'API Anthropic, un par processus: créé
+au démarrage (lifespan FastAPI, runtime du worker Celery) et fermé à l'arrêt,
+il garde ses connexions ouvertes (keep-alive, HTTP/2 si le paquet `h2` est
+installé) au lieu d'une poignée de main TCP + TLS par contrat analysé.
+
+Les connexions httpx restent attachées à la boucle d'événements qui les a
+ouvertes: `get_llm_client` retourne le client de la boucle courante et en crée
+un autre si la boucle a changé, au lieu de partager un client entre boucles.
+Le client remplacé est fermé sur sa propre boucle.
+
+Chaque client compte ses requêtes et les connexions qu'il a ouvertes
+(`LLMHTTPClient.stats`), journalisées à sa fermeture: une part de connexions
+réutilisées faible signale un pool trop petit ou un keep-alive trop court.
+"""
+
+import asyncio
+import importlib.util
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from anthropic import AsyncAnthropic
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Événement de trace httpcore: une nouvelle connexion TCP a été ouverte
+_CONNECTION_OPENED = "connection.connect_tcp.complete"
+
+
+@dataclass
+class LLMConnectionStats:
+    """Compteurs de réutilisation des connexions d'un client.
+
+    Attributes:
+        requests: Requêtes envoyées
+        connections: Connexions TCP ouvertes
+    """
+
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requêtes envoyées sur une connexion déjà ouverte."""
+        return max(0, self.requests - self.connections)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Part des requêtes envoyées sur une connexion déjà ouverte."""
+        return self.reused / self.requests if self.requests else 0.0
+
+
+class LLMHTTPClient(httpx.AsyncClient):
+    """Client httpx qui compte ses requêtes et ses connexions (`stats`)."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.stats = LLMConnectionStats()
+        hooks = kwargs.pop("event_hooks", {})
+        hooks.setdefault("request", []).append(self._trace_request)
+        super().__init__(event_hooks=hooks, **kwargs)
+
+    async def _trace_request(self, request: httpx.Request) -> None:
+        self.stats.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == _CONNECTION_OPENED:
+            self.stats.connections += 1
+
+
+def http2_available() -> bool:
+    """Indique si HTTP/2 est demandé et possible (paquet `h2`, extra `httpx[http2]`)."""
+    return settings.LLM_HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def create_llm_client(max_connections: int | None = None) -> LLMHTTPClient:
+    """Crée un client HTTP vers l'API Anthropic (limites et délais `LLM_HTTP_*`).
+
+    Args:
+        max_connections: Connexions simultanées (`LLM_HTTP_MAX_CONNECTIONS` par défaut)
+
+    Returns:
+        Le client, à fermer avec `close_llm_client`
+    """
+    connections = max_connections or settings.LLM_HTTP_MAX_CONNECTIONS
+    return LLMHTTPClient(
+        http2=http2_available(),
+        timeout=httpx.Timeout(
+            settings.LLM_HTTP_READ_TIMEOUT_SECONDS,
+            connect=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+        limits=httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+async def close_llm_client(client: httpx.AsyncClient | None = None) -> None:
+    """Ferme un client (celui du processus par défaut) et journalise ses compteurs."""
+    global _current
+
+    if client is None:
+        if _current is None:
+            return
+        client = _current.client
+    if _current is not None and _current.client is client:
+        _current = None
+
+    stats = getattr(client, "stats", None)
+    if isinstance(stats, LLMConnectionStats) and stats.requests:
+        logger.info(
+            f"Client LLM fermé: {stats.requests} requêtes, {stats.connections} connexions "
+            f"({stats.reuse_ratio:.0%} des requêtes sur une connexion réutilisée)"
+        )
+    await client.aclose()
+
+
+@dataclass
+class _ProcessClient:
+    loop: asyncio.AbstractEventLoop
+    client: LLMHTTPClient
+    anthropic: AsyncAnthropic | None = None
+
+
+_current: _ProcessClient | None = None
+
+
+def _process_client() -> _ProcessClient:
+    global _current
+
+    loop = asyncio.get_running_loop()
+    if _current is None or _current.loop is not loop:
+        previous = _current
+        _current = _ProcessClient(loop, create_llm_client())
+        if previous is not None:
+            logger.warning("Client LLM créé pour une autre boucle d'événements, remplacé")
+            _close_on_own_loop(previous)
+    return _current
+
+
+def _close_on_own_loop(previous: _ProcessClient) -> None:
+    """Ferme un client remplacé sur la boucle qui a ouvert ses connexions.
+
+    Sur une boucle arrêtée, la fermeture a lieu dès qu'elle tourne de nouveau;
+    une boucle fermée n'a plus de connexions à fermer.
+    """
+    if previous.loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(close_llm_client(previous.client), previous.loop)
+
+
+def get_llm_client() -> LLMHTTPClient:
+    """Retourne le client du processus (créé au besoin pour la boucle courante)."""
+    return _process_client().client
+
+
+def get_anthropic_client() -> AsyncAnthropic:
+    """Retourne le client SDK Anthropic du processus, sur le pool de connexions partagé."""
+    current = _process_client()
+    if current.anthropic is None:
+        current.anthropic = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            http_client=current.client,
+            timeout=current.client.timeout,
+        )
+    return current.anthropic
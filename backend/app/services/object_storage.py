@@ -0,0 +1,408 @@
+"""Object storage backends.
+
+Ce module abstrait le stockage des fichiers de contrats derrière une interface
+par clé (`blobs/ab/abcd...pdf`), pour que l'API et les workers Celery n'aient
+plus besoin de partager un volume:
+
+- `LocalStorage`: fichiers sous `UPLOAD_DIR` (développement, nœud unique);
+- `S3Storage`: service compatible S3 (AWS, MinIO, Supabase Storage) via
+  httpx et une signature AWS SigV4, avec upload multipart en flux et
+  lectures par plages (`Range`).
+
+L'interface est synchrone: les appelants asynchrones passent par
+`asyncio.to_thread`, comme pour les autres accès disque.
+"""
+
+import hashlib
+import hmac
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from app.config import settings
+
+_EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+
+
+class StorageError(OSError):
+    """Échec d'une opération sur le stockage de fichiers."""
+
+
+class ObjectStorage(ABC):
+    """Stockage de fichiers adressés par clé."""
+
+    @abstractmethod
+    def put_file(self, key: str, source: Path) -> None:
+        """Enregistre un fichier local sous une clé.
+
+        Le fichier source est consommé (déplacé ou supprimé après envoi).
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Indique si une clé existe."""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Taille en octets du fichier d'une clé."""
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        """Lit `length` octets à partir de `start` (moins en fin de fichier)."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Supprime une clé (sans erreur si elle n'existe pas)."""
+
+    def local_path(self, key: str) -> Path | None:
+        """Chemin local direct du fichier, si le stockage en fournit un."""
+        return None
+
+    def download(self, key: str, destination: Path) -> None:
+        """Copie le fichier d'une clé vers un fichier local, par plages successives."""
+        total = self.size(key)
+        chunk_size = settings.STORAGE_READ_CHUNK_SIZE
+        with open(destination, "wb") as f:
+            for start in range(0, total, chunk_size):
+                f.write(self.read_range(key, start, chunk_size))
+
+    @contextmanager
+    def open_local(self, key: str) -> Iterator[Path]:
+        """Fichier local lisible pour une clé (téléchargé dans un fichier temporaire au besoin).
+
+        Le fichier temporaire garde l'extension de la clé et est supprimé à la sortie.
+        """
+        path = self.local_path(key)
+        if path is not None:
+            yield path
+            return
+        fd, name = tempfile.mkstemp(prefix="contract-", suffix=Path(key).suffix)
+        os.close(fd)
+        try:
+            self.download(key, Path(name))
+            yield Path(name)
+        finally:
+            Path(name).unlink(missing_ok=True)
+
+
+class LocalStorage(ObjectStorage):
+    """Stockage sur le système de fichiers local.
+
+    Les clés sont relatives à `root` (par défaut `UPLOAD_DIR`, relu à chaque
+    accès). Un chemin absolu est accepté tel quel: c'est la forme de
+    `Contract.file_path` pour les contrats antérieurs au magasin de fichiers.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else settings.upload_path
+
+    def _path(self, key: str) -> Path:
+        path = Path(key)
+        if path.is_absolute():
+            return path
+        root = self.root.resolve()
+        resolved = (root / path).resolve()
+        if not resolved.is_relative_to(root):
+            raise StorageError(f"Clé de stockage invalide: {key}")
+        return resolved
+
+    def put_file(self, key: str, source: Path) -> None:
+        destination = self._path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, destination)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path(key).stat().st_size
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sigv4_headers(
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime | None = None,
+    service: str = "s3",
+) -> dict[str, str]:
+    """Signe une requête S3 (AWS Signature Version 4, en-tête `Authorization`).
+
+    Args:
+        method: Méthode HTTP
+        url: URL complète, chemin et paramètres déjà encodés
+        headers: En-têtes à signer (hors `host`, `x-amz-date`, `x-amz-content-sha256`)
+        payload_hash: SHA-256 hexadécimal du corps
+        access_key: Identifiant de clé d'accès
+        secret_key: Clé secrète
+        region: Région de signature
+        now: Horodatage de la signature (défaut: maintenant)
+        service: Service signé
+
+    Returns:
+        Les en-têtes à envoyer, `Authorization` compris
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+    parts = urlsplit(url)
+
+    signed = {key.lower(): " ".join(value.split()) for key, value in headers.items()}
+    signed.update(
+        {"host": parts.netloc, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+    )
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{key}:{signed[key]}\n" for key in sorted(signed))
+
+    query = sorted(
+        (name, value)
+        for name, _, value in (pair.partition("=") for pair in parts.query.split("&") if pair)
+    )
+    canonical_query = "&".join(f"{name}={value}" for name, value in query)
+
+    canonical_request = "\n".join(
+        [
+            method,
+            parts.path or "/",
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    scope = f"{date}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ]
+    )
+    signing_key = _hmac(
+        _hmac(_hmac(_hmac(f"AWS4{secret_key}".encode("utf-8"), date), region), service),
+        "aws4_request",
+    )
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    result = {key: value for key, value in signed.items() if key != "host"}
+    result["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return result
+
+
+def _xml_text(payload: bytes, name: str) -> str | None:
+    """Texte du premier élément XML de nom local `name` (espaces de noms ignorés)."""
+    for element in ET.fromstring(payload).iter():
+        if element.tag.rsplit("}", 1)[-1] == name:
+            return element.text
+    return None
+
+
+class S3Storage(ObjectStorage):
+    """Stockage compatible S3 (adressage par chemin: `{endpoint}/{bucket}/{clé}`).
+
+    Les fichiers de plus de `part_size` octets sont envoyés en upload
+    multipart, une partie à la fois: la mémoire utilisée ne dépend pas de la
+    taille du fichier.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        part_size: int | None = None,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.part_size = part_size or settings.S3_PART_SIZE
+        self._client = httpx.Client(transport=transport, timeout=settings.S3_TIMEOUT_SECONDS)
+
+    def _url(self, key: str, query: str = "") -> str:
+        url = f"{self.endpoint_url}/{quote(self.bucket)}/{quote(key, safe='/-_.~')}"
+        return f"{url}?{query}" if query else url
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        query: str = "",
+        content: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        url = self._url(key, query)
+        payload_hash = hashlib.sha256(content).hexdigest() if content else _EMPTY_PAYLOAD_HASH
+        signed = sigv4_headers(
+            method,
+            url,
+            headers or {},
+            payload_hash,
+            self.access_key,
+            self.secret_key,
+            self.region,
+        )
+        try:
+            return self._client.request(method, url, content=content, headers=signed)
+        except httpx.HTTPError as e:
+            raise StorageError(f"Stockage S3 injoignable ({method} {key}): {e}") from e
+
+    @staticmethod
+    def _check(response: httpx.Response, key: str, *expected: int) -> httpx.Response:
+        if response.status_code not in expected:
+            raise StorageError(
+                f"Stockage S3: {response.request.method} {key} -> {response.status_code}"
+            )
+        return response
+
+    def put_file(self, key: str, source: Path) -> None:
+        try:
+            if source.stat().st_size <= self.part_size:
+                self._check(self._request("PUT", key, content=source.read_bytes()), key, 200)
+            else:
+                self._put_multipart(key, source)
+        finally:
+            source.unlink(missing_ok=True)
+
+    def _put_multipart(self, key: str, source: Path) -> None:
+        """Upload multipart: création, envoi des parties une à une, assemblage."""
+        response = self._check(self._request("POST", key, query="uploads="), key, 200)
+        upload_id = _xml_text(response.content, "UploadId")
+        if not upload_id:
+            raise StorageError(f"Stockage S3: UploadId absent pour {key}")
+        upload_query = f"uploadId={quote(upload_id, safe='-_.~')}"
+
+        try:
+            etags = []
+            with open(source, "rb") as f:
+                for number in range(1, 10_001):
+                    part = f.read(self.part_size)
+                    if not part:
+                        break
+                    response = self._check(
+                        self._request(
+                            "PUT", key, query=f"partNumber={number}&{upload_query}", content=part
+                        ),
+                        key,
+                        200,
+                    )
+                    etags.append(response.headers.get("etag", ""))
+
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            )
+            completion = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(
+                "utf-8"
+            )
+            response = self._check(
+                self._request("POST", key, query=upload_query, content=completion), key, 200
+            )
+            # S3 peut signaler une erreur d'assemblage dans une réponse 200
+            if _xml_text(response.content, "Code") is not None:
+                raise StorageError(f"Stockage S3: assemblage multipart refusé pour {key}")
+        except BaseException:
+            try:
+                self._request("DELETE", key, query=upload_query)
+            except StorageError:
+                pass
+            raise
+
+    def exists(self, key: str) -> bool:
+        response = self._check(self._request("HEAD", key), key, 200, 404)
+        return response.status_code == 200
+
+    def size(self, key: str) -> int:
+        response = self._check(self._request("HEAD", key), key, 200)
+        return int(response.headers["content-length"])
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        response = self._check(
+            self._request("GET", key, headers={"Range": f"bytes={start}-{start + length - 1}"}),
+            key,
+            200,
+            206,
+        )
+        if response.status_code == 200:
+            # Serveur sans support des plages: renvoie le fichier entier
+            return response.content[start : start + length]
+        return response.content
+
+    def delete(self, key: str) -> None:
+        self._check(self._request("DELETE", key), key, 200, 204, 404)
+
+
+_storage: ObjectStorage | None = None
+
+
+def get_storage() -> ObjectStorage:
+    """Retourne le stockage configuré (`STORAGE_BACKEND`), créé à la demande.
+
+    Raises:
+        ValueError: Si le backend est inconnu ou si la configuration S3 est incomplète
+    """
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage()
+        elif settings.STORAGE_BACKEND == "s3":
+            endpoint_url = settings.s3_endpoint_url
+            bucket = settings.s3_bucket
+            if not (
+                endpoint_url
+                and bucket
+                and settings.AWS_ACCESS_KEY_ID
+                and settings.AWS_SECRET_ACCESS_KEY
+            ):
+                raise ValueError(
+                    "Stockage S3 incomplet: S3_ENDPOINT_URL (ou SUPABASE_URL), S3_BUCKET, "
+                    "AWS_ACCESS_KEY_ID et AWS_SECRET_ACCESS_KEY sont requis"
+                )
+            _storage = S3Storage(
+                endpoint_url=endpoint_url,
+                bucket=bucket,
+                access_key=settings.AWS_ACCESS_KEY_ID,
+                secret_key=settings.AWS_SECRET_ACCESS_KEY,
+                region=settings.AWS_REGION,
+            )
+        else:
+            raise ValueError(f"STORAGE_BACKEND inconnu: {settings.STORAGE_BACKEND}")
+    return _storage
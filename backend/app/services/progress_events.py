@@ -0,0 +1,143 @@
+"""Analysis progress events.
+
+Ce module diffuse l'avancement des analyses via Redis pub/sub: le worker
+publie chaque changement d'étape sur le canal du contrat, et l'endpoint SSE
+`GET /contracts/{id}/events` relaie ces événements au navigateur, au lieu
+d'un sondage de `GET /contracts/{id}/status` (deux requêtes SQL par appel).
+
+Le dernier événement de chaque contrat est aussi conservé dans une clé: un
+client qui se connecte en cours d'analyse (ou juste après la fin) reçoit
+l'étape courante sans attendre la suivante.
+
+La diffusion ne doit jamais faire échouer une analyse: sans Redis, les
+événements sont perdus et les clients reviennent au sondage du statut.
+"""
+
+import json
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "analysis:events:{contract_id}"
+LAST_EVENT_KEY = "analysis:last-event:{contract_id}"
+# Dernier événement conservé une heure (clients reconnectés après la fin)
+LAST_EVENT_TTL_SECONDS = 3600
+
+# Étapes d'une analyse, dans l'ordre
+STAGE_QUEUED = "queued"
+STAGE_EXTRACTING = "extracting"
+STAGE_SEARCHING_SOURCES = "searching_sources"
+STAGE_CALLING_MODEL = "calling_model"
+STAGE_SCORING = "scoring"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+
+TERMINAL_STAGES = frozenset({STAGE_COMPLETED, STAGE_FAILED})
+
+
+def progress_event(contract_id: str, stage: str, **data: Any) -> dict[str, Any]:
+    """Construit un événement d'avancement.
+
+    Args:
+        contract_id: ID du contrat (UUID string)
+        stage: Étape atteinte (`STAGE_*`)
+        data: Champs complémentaires (scores, message d'erreur, position en file)
+
+    Returns:
+        L'événement, sérialisable en JSON
+    """
+    return {
+        "contract_id": contract_id,
+        "stage": stage,
+        "at": datetime.now(timezone.utc).isoformat(),
+        **data,
+    }
+
+
+async def publish_progress(redis: Redis, contract_id: str, stage: str, **data: Any) -> None:
+    """Publie une étape d'analyse (sans effet si Redis est indisponible).
+
+    Args:
+        redis: Client Redis
+        contract_id: ID du contrat (UUID string)
+        stage: Étape atteinte (`STAGE_*`)
+        data: Champs complémentaires de l'événement
+    """
+    payload = json.dumps(progress_event(contract_id, stage, **data))
+    try:
+        await redis.set(
+            LAST_EVENT_KEY.format(contract_id=contract_id), payload, ex=LAST_EVENT_TTL_SECONDS
+        )
+        await redis.publish(EVENTS_CHANNEL.format(contract_id=contract_id), payload)
+    except (RedisError, OSError) as e:
+        logger.debug(f"Événement d'analyse non publié ({contract_id}, {stage}): {e}")
+
+
+async def clear_progress(redis: Redis, contract_id: str) -> None:
+    """Oublie le dernier événement d'un contrat au début d'une nouvelle analyse.
+
+    Sans cela, un client qui se connecte avant la première étape recevrait la
+    fin (résultat ou échec) de l'analyse précédente.
+
+    Args:
+        redis: Client Redis
+        contract_id: ID du contrat (UUID string)
+    """
+    try:
+        await redis.delete(LAST_EVENT_KEY.format(contract_id=contract_id))
+    except (RedisError, OSError) as e:
+        logger.debug(f"Dernier événement d'analyse non effacé ({contract_id}): {e}")
+
+
+async def stream_progress(
+    redis: Redis,
+    contract_id: str,
+    keepalive_seconds: float,
+) -> AsyncIterator[dict[str, Any] | None]:
+    """Itère sur les événements d'un contrat jusqu'à une étape finale.
+
+    L'abonnement est pris avant la lecture du dernier événement: aucune étape
+    publiée entre les deux n'est perdue.
+
+    Args:
+        redis: Client Redis
+        contract_id: ID du contrat (UUID string)
+        keepalive_seconds: Délai sans événement après lequel None est produit
+            (commentaire SSE qui garde la connexion ouverte à travers les proxies)
+
+    Yields:
+        Les événements (le dernier connu d'abord), ou None sans événement depuis
+        `keepalive_seconds`
+
+    Raises:
+        RedisError: Si Redis est injoignable à l'abonnement
+    """
+    pubsub = redis.pubsub()
+    try:
+        await pubsub.subscribe(EVENTS_CHANNEL.format(contract_id=contract_id))
+        last = await redis.get(LAST_EVENT_KEY.format(contract_id=contract_id))
+        if last is not None:
+            event = json.loads(last)
+            yield event
+            if event["stage"] in TERMINAL_STAGES:
+                return
+
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=keepalive_seconds
+            )
+            if message is None:
+                yield None
+                continue
+            event = json.loads(message["data"])
+            yield event
+            if event["stage"] in TERMINAL_STAGES:
+                return
+    finally:
+        await pubsub.aclose()
@@ -1,12 +1,264 @@
 """Text extraction service.
 
 Ce module fournit des fonctions pour extraire le texte de documents.
+
+Les PDF volumineux sont découpés en plages de pages extraites en parallèle
+dans un pool de processus (pdfplumber est CPU-bound et ne libère pas le GIL),
+puis réassemblées dans l'ordre. Les petits fichiers restent en séquentiel.
+
+Un budget de caractères (`max_chars`) permet d'arrêter le parsing dès que le
+texte utile au LLM est atteint: le résultat indique alors le nombre total de
+pages et la troncature.
+
+Côté API, `extract_document_async` exécute l'extraction hors de la boucle
+d'événements dans un pool borné et refuse immédiatement les demandes
+excédentaires (`ExtractionBusyError`) plutôt que de les empiler.
+
+Le parsing s'exécute dans un processus enfant isolé (`EXTRACTION_SANDBOX_ENABLED`),
+limité en durée et en espace d'adressage: un PDF pathologique lève
+`DocumentTooComplexError` au lieu de bloquer ou de faire tomber le worker.
+Le nombre de pages est vérifié avant tout parsing, depuis le catalogue du PDF.
+
+Les contrats sont lus depuis le stockage configuré (`object_storage`) par
+`extract_stored_document`: directement pour le stockage local, après
+téléchargement par plages sinon (sauf si le texte est déjà en cache).
 """
 
-import io
+import asyncio
+import itertools
+import logging
+import math
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Generator, cast
 
 import pdfplumber
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+from app.config import settings
+from app.services.extraction_cache import (
+    compute_file_hash,
+    get_cached_extraction,
+    store_cached_extraction,
+)
+from app.services.object_storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Taille max d'une plage de pages soumise au pool (granularité de l'arrêt sur budget)
+_PDF_CHUNK_MAX_PAGES = 16
+
+
+@dataclass
+class ExtractionResult:
+    """Résultat d'une extraction de document.
+
+    Attributes:
+        pages: Texte par page (PDF) ou texte complet en un seul élément (DOCX)
+        page_count: Nombre total de pages du document, si connu
+        truncated: True si le parsing s'est arrêté sur le budget de caractères
+    """
+
+    pages: list[str]
+    page_count: int | None
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        """Texte complet extrait (pages séparées par une ligne vide)."""
+        return "\n\n".join(page for page in self.pages if page)
+
+
+class ExtractionBusyError(RuntimeError):
+    """Levée quand toutes les places du pool d'extraction sont occupées."""
+
+
+_TOO_COMPLEX_MESSAGES = {
+    "pages": "Document trop volumineux: plus de {limit} pages",
+    "timeout": "Document trop complexe: extraction interrompue après {limit} secondes",
+    "memory": "Document trop complexe: extraction interrompue au-delà de {limit} Mo de mémoire",
+    "crashed": "Document trop complexe: le processus d'extraction s'est arrêté anormalement",
+}
+
+
+class DocumentTooComplexError(ValueError):
+    """Levée quand un document dépasse les limites d'extraction.
+
+    Attributes:
+        reason: Limite atteinte ("pages", "timeout", "memory" ou "crashed")
+        limit: Valeur de la limite (pages, secondes ou Mo), None si sans objet
+    """
+
+    def __init__(self, reason: str, limit: int | None = None) -> None:
+        self.reason = reason
+        self.limit = limit
+        super().__init__(_TOO_COMPLEX_MESSAGES[reason].format(limit=limit))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Erreur structurée renvoyée à l'API et stockée avec l'analyse."""
+        return {
+            "code": "document_too_complex",
+            "reason": self.reason,
+            "limit": self.limit,
+            "message": str(self),
+        }
+
+
+# Places d'extraction côté API (sémaphore threading: indépendant de la boucle asyncio)
+_extraction_slots = threading.BoundedSemaphore(settings.EXTRACTION_MAX_CONCURRENCY)
+_extraction_executor: ThreadPoolExecutor | None = None
+
+
+def _pdf_worker_count() -> int:
+    """Nombre effectif de processus d'extraction (borné par le nombre de cœurs)."""
+    return max(1, min(settings.PDF_EXTRACTION_WORKERS, os.cpu_count() or 1))
+
+
+def _split_page_ranges(page_count: int, chunks: int) -> list[tuple[int, int]]:
+    """Découpe [0, page_count) en plages contiguës [start, end).
+
+    Args:
+        page_count: Nombre total de pages
+        chunks: Nombre de plages souhaité
+
+    Returns:
+        Liste ordonnée de plages (start, end)
+    """
+    if page_count <= 0:
+        return []
+    size = math.ceil(page_count / max(1, chunks))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _extract_pdf_page_range(file_path: str, start: int, end: int) -> list[str]:
+    """Extrait le texte des pages [start, end) d'un PDF.
+
+    Exécutée dans un processus du pool: chaque worker rouvre le fichier.
+    """
+    texts: list[str] = []
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            page.close()
+    return texts
+
+
+def _extract_pdf_pages_parallel(
+    file_path: str,
+    page_count: int,
+    workers: int,
+    max_chars: int | None = None,
+) -> list[str]:
+    """Extrait les pages d'un PDF via un pool de processus.
+
+    Les plages sont soumises au fil de l'eau (fenêtre de `2 * workers` plages en
+    vol) et consommées dans l'ordre. Une fois le budget atteint, les plages non
+    démarrées sont annulées: les pages au-delà ne sont jamais parsées.
+    """
+    chunks = max(workers * 2, math.ceil(page_count / _PDF_CHUNK_MAX_PAGES))
+    ranges = iter(_split_page_ranges(page_count, chunks))
+    pages: list[str] = []
+    chars = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[list[str]]] = deque(
+            pool.submit(_extract_pdf_page_range, file_path, start, end)
+            for start, end in itertools.islice(ranges, workers * 2)
+        )
+        while pending:
+            chunk = pending.popleft().result()
+            pages.extend(chunk)
+            chars += sum(len(text) for text in chunk)
+            if max_chars is not None and chars >= max_chars:
+                for future in pending:
+                    future.cancel()
+                break
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(pool.submit(_extract_pdf_page_range, file_path, *next_range))
+
+    return pages
+
+
+def extract_pdf_document(file_path: str | Path, max_chars: int | None = None) -> ExtractionResult:
+    """Extrait le texte d'un fichier PDF, page par page.
+
+    Au-delà de `PDF_PARALLEL_MIN_PAGES` pages, l'extraction est répartie sur
+    `PDF_EXTRACTION_WORKERS` processus. En cas d'impossibilité de créer le pool
+    (ex: processus daemon), on retombe sur l'extraction séquentielle.
+
+    Args:
+        file_path: Chemin vers le fichier PDF
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+
+    Returns:
+        Les pages extraites, le nombre total de pages et l'indicateur de troncature
+
+    Raises:
+        ValueError: Si l'extraction échoue
+    """
+    try:
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+            workers = _pdf_worker_count()
+
+            pages: list[str] | None = None
+            if workers > 1 and page_count >= settings.PDF_PARALLEL_MIN_PAGES:
+                try:
+                    pages = _extract_pdf_pages_parallel(
+                        str(file_path), page_count, workers, max_chars
+                    )
+                except (OSError, AssertionError, BrokenProcessPool) as e:
+                    logger.warning(f"Extraction PDF parallèle indisponible, repli séquentiel: {e}")
+
+            if pages is None:
+                pages = []
+                chars = 0
+                for page in pdf.pages:
+                    pages.append(page.extract_text() or "")
+                    page.close()
+                    chars += len(pages[-1])
+                    if max_chars is not None and chars >= max_chars:
+                        break
+
+        return ExtractionResult(
+            pages=pages, page_count=page_count, truncated=len(pages) < page_count
+        )
+    except Exception as e:
+        raise ValueError(f"Erreur lors de l'extraction du PDF: {e}")
+
+
+def _read_pdf_page_count(file_path: str | Path) -> int | None:
+    """Lit le nombre de pages déclaré par le PDF (trailer -> catalogue -> /Pages /Count).
+
+    Seuls la table des références et le catalogue sont lus: aucune page n'est
+    parsée, ce qui permet de refuser un document avant l'extraction.
+
+    Returns:
+        Le nombre de pages, ou None s'il est illisible
+    """
+    try:
+        with open(file_path, "rb") as f:
+            document = PDFDocument(PDFParser(f))
+            pages = resolve1(document.catalog.get("Pages"))
+            count = resolve1(pages.get("Count")) if isinstance(pages, dict) else None
+        return count if isinstance(count, int) else None
+    except Exception:
+        return None
 
 
 def extract_text_from_pdf(file_path: str | Path) -> str:
@@ -18,24 +270,170 @@ def extract_text_from_pdf(file_path: str | Path) -> str:
     Returns:
         Le texte extrait
 
+    Raises:
+        ValueError: Si l'extraction échoue
+    """
+    return extract_pdf_document(file_path).text
+
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = f"{_W_NS}p"
+_W_T = f"{_W_NS}t"
+_W_TC = f"{_W_NS}tc"
+_W_TR = f"{_W_NS}tr"
+_W_TBL = f"{_W_NS}tbl"
+_W_BODY = f"{_W_NS}body"
+_W_BR = f"{_W_NS}br"
+_W_TYPE = f"{_W_NS}type"
+# Éléments de run traduits en texte (mêmes équivalences que python-docx)
+_W_RUN_TEXT = {
+    f"{_W_NS}tab": "\t",
+    f"{_W_NS}ptab": "\t",
+    f"{_W_NS}cr": "\n",
+    f"{_W_NS}noBreakHyphen": "-",
+}
+
+
+def _iter_docx_blocks(file_path: str | Path) -> Generator[str, None, None]:
+    """Parcourt `word/document.xml` en flux et produit les blocs de texte.
+
+    Les paragraphes et les lignes de tableau (cellules séparées par " | ") sont
+    produits dans l'ordre du document. Les éléments déjà traités sont détachés
+    du corps au fil de l'eau, la mémoire reste bornée par le plus gros bloc.
+
+    Args:
+        file_path: Chemin vers le fichier DOCX
+
+    Yields:
+        Paragraphes et lignes de tableau non vides
+    """
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+        body: ET.Element | None = None
+        paragraphs: list[list[str]] = []  # paragraphes ouverts (zones de texte imbriquées)
+        cells: list[list[str]] = []  # cellules ouvertes -> paragraphes de la cellule
+        rows: list[list[str]] = []  # lignes ouvertes -> textes des cellules
+
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == _W_P:
+                    paragraphs.append([])
+                elif tag == _W_TC:
+                    cells.append([])
+                elif tag == _W_TR:
+                    rows.append([])
+                elif tag == _W_BODY:
+                    body = elem
+                continue
+
+            block: str | None = None
+            if tag == _W_T:
+                if paragraphs:
+                    paragraphs[-1].append(elem.text or "")
+            elif tag in _W_RUN_TEXT:
+                if paragraphs:
+                    paragraphs[-1].append(_W_RUN_TEXT[tag])
+            elif tag == _W_BR:
+                if paragraphs and elem.get(_W_TYPE) not in ("page", "column"):
+                    paragraphs[-1].append("\n")
+            elif tag == _W_P:
+                text = "".join(paragraphs.pop())
+                if text.strip():
+                    if cells:
+                        cells[-1].append(text)
+                    else:
+                        block = text
+            elif tag == _W_TC:
+                cell_text = "\n".join(cells.pop())
+                if rows:
+                    rows[-1].append(cell_text)
+            elif tag == _W_TR:
+                row = rows.pop()
+                if any(cell.strip() for cell in row):
+                    row_text = " | ".join(row)
+                    if cells:  # tableau imbriqué dans une cellule
+                        cells[-1].append(row_text)
+                    else:
+                        block = row_text
+
+            if block is not None:
+                yield block
+
+            # Bloc de premier niveau terminé: on libère ses éléments
+            if body is not None and tag in (_W_P, _W_TBL) and not (paragraphs or cells):
+                body.clear()
+
+
+_EP_PAGES = "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}Pages"
+
+
+def _read_docx_page_count(file_path: str | Path) -> int | None:
+    """Lit le nombre de pages enregistré par le traitement de texte (docProps/app.xml)."""
+    try:
+        with zipfile.ZipFile(file_path) as archive, archive.open("docProps/app.xml") as xml:
+            pages = ET.parse(xml).getroot().findtext(_EP_PAGES)
+        return int(pages) if pages else None
+    except (KeyError, ValueError, ET.ParseError):
+        return None
+
+
+def extract_docx_document(file_path: str | Path, max_chars: int | None = None) -> ExtractionResult:
+    """Extrait le texte d'un fichier DOCX, tableaux compris.
+
+    Parse `word/document.xml` en flux (sans construire le modèle python-docx),
+    ce qui conserve le texte des tableaux (grilles tarifaires, pénalités) et
+    permet de s'arrêter dès que le budget de caractères est atteint.
+
+    Args:
+        file_path: Chemin vers le fichier DOCX
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+
+    Returns:
+        Le texte extrait (un seul élément), le nombre de pages déclaré et la troncature
+
     Raises:
         ValueError: Si l'extraction échoue
     """
     try:
-        text_parts = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        blocks: list[str] = []
+        chars = 0
+        truncated = False
+        with closing(_iter_docx_blocks(file_path)) as iterator:
+            for block in iterator:
+                blocks.append(block)
+                chars += len(block)
+                if max_chars is not None and chars >= max_chars:
+                    truncated = next(iterator, None) is not None
+                    break
 
-        return "\n\n".join(text_parts)
+        return ExtractionResult(
+            pages=["\n\n".join(blocks)],
+            page_count=_read_docx_page_count(file_path),
+            truncated=truncated,
+        )
     except Exception as e:
-        raise ValueError(f"Erreur lors de l'extraction du PDF: {e}")
+        raise ValueError(f"Erreur lors de l'extraction du DOCX: {e}")
 
 
 def extract_text_from_docx(file_path: str | Path) -> str:
-    """Extrait le texte d'un fichier DOCX.
+    """Extrait le texte d'un fichier DOCX, tableaux compris.
+
+    Args:
+        file_path: Chemin vers le fichier DOCX
+
+    Returns:
+        Le texte extrait
+
+    Raises:
+        ValueError: Si l'extraction échoue
+    """
+    return extract_docx_document(file_path).text
+
+
+def extract_text_from_docx_python_docx(file_path: str | Path) -> str:
+    """Extrait le texte d'un DOCX via python-docx (paragraphes uniquement).
+
+    Ancien moteur, conservé comme référence pour les benchmarks.
 
     Args:
         file_path: Chemin vers le fichier DOCX
@@ -61,12 +459,287 @@ def extract_text_from_docx(file_path: str | Path) -> str:
         raise ValueError(f"Erreur lors de l'extraction du DOCX: {e}")
 
 
-def extract_text(file_path: str | Path, file_type: str | None = None) -> str:
+def _document_kind(path: Path, file_type: str | None) -> str:
+    """Détermine le type de document ("pdf" ou "docx") selon l'extension ou le type MIME.
+
+    Raises:
+        ValueError: Si le type de fichier n'est pas supporté
+    """
+    ext = path.suffix.lower()
+
+    if file_type == "application/pdf" or ext == ".pdf":
+        return "pdf"
+    elif (
+        file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        or ext == ".docx"
+    ):
+        return "docx"
+    else:
+        raise ValueError(f"Type de fichier non supporté: {ext or file_type}")
+
+
+def _select_extractor(
+    path: Path, file_type: str | None
+) -> Callable[[Path, int | None], ExtractionResult]:
+    """Choisit l'extracteur selon l'extension ou le type MIME.
+
+    Raises:
+        ValueError: Si le type de fichier n'est pas supporté
+    """
+    if _document_kind(path, file_type) == "pdf":
+        return extract_pdf_document
+    return extract_docx_document
+
+
+def _check_page_limit(path: Path, file_type: str | None) -> None:
+    """Refuse un document dont le nombre de pages déclaré dépasse `EXTRACTION_MAX_PAGES`.
+
+    Raises:
+        DocumentTooComplexError: Si le document a trop de pages
+    """
+    limit = settings.EXTRACTION_MAX_PAGES
+    if limit <= 0:
+        return
+    if _document_kind(path, file_type) == "pdf":
+        page_count = _read_pdf_page_count(path)
+    else:
+        page_count = _read_docx_page_count(path)
+    if page_count is not None and page_count > limit:
+        raise DocumentTooComplexError("pages", limit)
+
+
+# Processus d'extraction isolés en cours (arrêtés à la fermeture du worker)
+_sandboxes: set[subprocess.Popen[bytes]] = set()
+_sandboxes_lock = threading.Lock()
+
+
+def _stop_sandbox(process: subprocess.Popen[bytes]) -> None:
+    """Arrête le processus isolé et tout son groupe (workers du pool PDF compris)."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # Groupe déjà terminé
+        pass
+    process.wait()
+
+
+def stop_sandboxes() -> None:
+    """Arrête les extractions isolées en cours (fermeture du processus worker)."""
+    with _sandboxes_lock:
+        running = list(_sandboxes)
+    for process in running:
+        _stop_sandbox(process)
+
+
+def _extract_in_sandbox(
+    extractor: Callable[[Path, int | None], ExtractionResult],
+    path: Path,
+    max_chars: int | None,
+) -> ExtractionResult:
+    """Exécute un extracteur dans un processus enfant limité en durée et en mémoire.
+
+    Le processus (`app.services.extraction_sandbox`) est lancé avec `subprocess`
+    dans sa propre session: un seul signal arrête son groupe, et il s'arrête
+    de lui-même si le processus qui l'a lancé disparaît.
+
+    Args:
+        extractor: Fonction d'extraction (importable, exécutée dans l'enfant)
+        path: Chemin du document
+        max_chars: Budget de caractères
+
+    Returns:
+        Le résultat d'extraction
+
+    Raises:
+        DocumentTooComplexError: Si une limite est atteinte
+        ValueError: Si l'extraction échoue
+    """
+    timeout = settings.EXTRACTION_TIMEOUT_SECONDS
+    memory_mb = settings.EXTRACTION_MAX_MEMORY_MB
+
+    request = pickle.dumps((extractor, str(path), max_chars, memory_mb * 1024 * 1024))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.services.extraction_sandbox"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        # Mêmes modules importables que le worker (extracteur désérialisé dans l'enfant)
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(entry for entry in sys.path if entry)},
+        start_new_session=True,
+    )
+    with _sandboxes_lock:
+        _sandboxes.add(process)
+    try:
+        try:
+            output, _ = process.communicate(request, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Extraction interrompue après {timeout}s: {path.name}")
+            raise DocumentTooComplexError("timeout", timeout)
+    finally:
+        _stop_sandbox(process)
+        with _sandboxes_lock:
+            _sandboxes.discard(process)
+
+    try:
+        status, payload = pickle.loads(output)
+    except (EOFError, pickle.UnpicklingError):
+        logger.warning(f"Processus d'extraction arrêté (code {process.returncode}): {path.name}")
+        raise DocumentTooComplexError("crashed")
+
+    if status == "memory":
+        logger.warning(f"Extraction interrompue au-delà de {memory_mb} Mo: {path.name}")
+        raise DocumentTooComplexError("memory", memory_mb)
+    if status == "error":
+        raise ValueError(payload)
+    return cast(ExtractionResult, payload)
+
+
+def _apply_budget(result: ExtractionResult, max_chars: int | None) -> ExtractionResult:
+    """Ramène un résultat complet (cache) au budget, page entière par page entière."""
+    if max_chars is None:
+        return result
+    pages: list[str] = []
+    chars = 0
+    for page in result.pages:
+        pages.append(page)
+        chars += len(page)
+        if chars >= max_chars:
+            break
+    truncated = len(pages) < len(result.pages)
+    return ExtractionResult(pages=pages, page_count=result.page_count, truncated=truncated)
+
+
+def _run_extractor(
+    extractor: Callable[[Path, int | None], ExtractionResult],
+    path: Path,
+    file_type: str | None,
+    max_chars: int | None,
+) -> ExtractionResult:
+    """Vérifie le nombre de pages puis parse le document, isolé si activé."""
+    _check_page_limit(path, file_type)
+    if settings.EXTRACTION_SANDBOX_ENABLED:
+        return _extract_in_sandbox(extractor, path, max_chars)
+    return extractor(path, max_chars)
+
+
+def extract_document(
+    file_path: str | Path,
+    file_type: str | None = None,
+    max_chars: int | None = None,
+    content_hash: str | None = None,
+    use_cache: bool = True,
+) -> ExtractionResult:
+    """Extrait un document selon son type.
+
+    Le cache de texte extrait (indexé par SHA-256 du fichier) est consulté avant
+    le parsing et alimenté après, sauf si `use_cache` est faux ou si le cache est
+    désactivé (`EXTRACTION_CACHE_ENABLED`). Seules les extractions complètes
+    (non tronquées) sont mises en cache.
+
+    Args:
+        file_path: Chemin vers le fichier
+        file_type: Type MIME du fichier (optionnel)
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+        content_hash: SHA-256 du fichier s'il est déjà connu (évite une relecture)
+        use_cache: Utiliser le cache de texte extrait
+
+    Returns:
+        Le résultat d'extraction (pages, nombre de pages, troncature)
+
+    Raises:
+        DocumentTooComplexError: Si le document dépasse les limites d'extraction
+        ValueError: Si le type de fichier n'est pas supporté ou si l'extraction échoue
+    """
+    path = Path(file_path)
+    extractor = _select_extractor(path, file_type)
+
+    if not (use_cache and settings.EXTRACTION_CACHE_ENABLED):
+        return _run_extractor(extractor, path, file_type, max_chars)
+
+    try:
+        content_hash = content_hash or compute_file_hash(path)
+    except OSError as e:
+        raise ValueError(f"Fichier illisible: {e}")
+
+    cached = _cached_result(content_hash, max_chars)
+    if cached is not None:
+        return cached
+
+    result = _run_extractor(extractor, path, file_type, max_chars)
+    if not result.truncated:
+        store_cached_extraction(
+            content_hash, {"pages": result.pages, "page_count": result.page_count}
+        )
+    return result
+
+
+def _cached_result(content_hash: str, max_chars: int | None) -> ExtractionResult | None:
+    """Extraction en cache pour une empreinte, ramenée au budget."""
+    cached = get_cached_extraction(content_hash)
+    if cached is None:
+        return None
+    return _apply_budget(
+        ExtractionResult(pages=cached["pages"], page_count=cached["page_count"]), max_chars
+    )
+
+
+def extract_stored_document(
+    key: str,
+    file_type: str | None = None,
+    max_chars: int | None = None,
+    content_hash: str | None = None,
+) -> ExtractionResult:
+    """Extrait un document depuis le stockage de fichiers (`Contract.file_path`).
+
+    Avec un stockage distant, le fichier n'est téléchargé que si son texte
+    n'est pas déjà en cache (l'empreinte est connue depuis l'upload).
+
+    Args:
+        key: Clé de stockage (ou chemin local absolu des contrats antérieurs)
+        file_type: Type MIME du fichier (optionnel)
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+        content_hash: SHA-256 du fichier s'il est connu
+
+    Returns:
+        Le résultat d'extraction
+
+    Raises:
+        DocumentTooComplexError: Si le document dépasse les limites d'extraction
+        ValueError: Si le type n'est pas supporté, si l'extraction échoue ou si le
+            fichier est illisible dans le stockage
+    """
+    storage = get_storage()
+    local = storage.local_path(key)
+    if local is not None:
+        return extract_document(local, file_type, max_chars, content_hash)
+
+    if content_hash and settings.EXTRACTION_CACHE_ENABLED:
+        cached = _cached_result(content_hash, max_chars)
+        if cached is not None:
+            return cached
+
+    try:
+        with storage.open_local(key) as path:
+            return extract_document(path, file_type, max_chars, content_hash)
+    except OSError as e:
+        # Cause conservée: les workers retentent un stockage injoignable
+        raise ValueError(f"Fichier illisible: {e}") from e
+
+
+def extract_text(
+    file_path: str | Path,
+    file_type: str | None = None,
+    max_chars: int | None = None,
+    content_hash: str | None = None,
+    use_cache: bool = True,
+) -> str:
     """Extrait le texte d'un document selon son type.
 
     Args:
         file_path: Chemin vers le fichier
         file_type: Type MIME du fichier (optionnel)
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+        content_hash: SHA-256 du fichier s'il est déjà connu (évite une relecture)
+        use_cache: Utiliser le cache de texte extrait
 
     Returns:
         Le texte extrait
@@ -74,16 +747,59 @@ def extract_text(file_path: str | Path, file_type: str | None = None) -> str:
     Raises:
         ValueError: Si le type de fichier n'est pas supporté ou si l'extraction échoue
     """
-    path = Path(file_path)
-    ext = path.suffix.lower()
+    return extract_document(file_path, file_type, max_chars, content_hash, use_cache).text
 
-    # Détermine le type à partir de l'extension ou du MIME type
-    if file_type == "application/pdf" or ext == ".pdf":
-        return extract_text_from_pdf(path)
-    elif (
-        file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        or ext == ".docx"
-    ):
-        return extract_text_from_docx(path)
-    else:
-        raise ValueError(f"Type de fichier non supporté: {ext or file_type}")
+
+def _get_extraction_executor() -> ThreadPoolExecutor:
+    """Retourne le pool de threads d'extraction (créé à la demande)."""
+    global _extraction_executor
+    if _extraction_executor is None:
+        _extraction_executor = ThreadPoolExecutor(
+            max_workers=settings.EXTRACTION_MAX_CONCURRENCY,
+            thread_name_prefix="text-extraction",
+        )
+    return _extraction_executor
+
+
+async def extract_document_async(
+    file_path: str | Path,
+    file_type: str | None = None,
+    max_chars: int | None = None,
+    content_hash: str | None = None,
+) -> ExtractionResult:
+    """Extrait un document stocké sans bloquer la boucle d'événements.
+
+    L'extraction (`extract_stored_document`) s'exécute dans un pool de threads
+    borné. La place est libérée à la fin de l'extraction elle-même (et non à
+    l'annulation de l'appelant), de sorte que le plafond reflète le travail
+    réellement en cours.
+
+    Args:
+        file_path: Clé de stockage du fichier (ou chemin local absolu)
+        file_type: Type MIME du fichier (optionnel)
+        max_chars: Budget de caractères au-delà duquel le parsing s'arrête
+        content_hash: SHA-256 du fichier s'il est déjà connu (évite une relecture)
+
+    Returns:
+        Le résultat d'extraction
+
+    Raises:
+        ExtractionBusyError: Si le pool d'extraction est saturé
+        ValueError: Si le type n'est pas supporté ou si l'extraction échoue
+    """
+    if not _extraction_slots.acquire(blocking=False):
+        raise ExtractionBusyError("Pool d'extraction saturé")
+
+    def _run() -> ExtractionResult:
+        try:
+            return extract_stored_document(str(file_path), file_type, max_chars, content_hash)
+        finally:
+            _extraction_slots.release()
+
+    try:
+        future = _get_extraction_executor().submit(_run)
+    except BaseException:
+        _extraction_slots.release()
+        raise
+
+    return await asyncio.wrap_future(future)
@@ -0,0 +1,191 @@
+"""Text normalization service.
+
+Ce module nettoie le texte extrait avant la construction des prompts LLM:
+- suppression des en-têtes/pieds de page répétés d'une page à l'autre
+- suppression des numéros de page isolés en bord de page
+- recollage des mots coupés en fin de ligne (césure): le saut de ligne est
+  retiré, le trait d'union conservé, car il appartient souvent au mot
+  (« sous-traitant », « ci-dessous »)
+- réduction des espaces et lignes vides superflus
+
+Chaque caractère retiré est un token d'entrée en moins sur chaque appel Claude;
+les gains sont mesurés et rapportés par contrat.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from app.services.text_extractor import ExtractionResult
+
+# Approximation usuelle pour du texte français (tokenizer Claude)
+CHARS_PER_TOKEN = 4
+
+# Lignes examinées en haut et en bas de chaque page
+_EDGE_LINES = 2
+# Nombre minimal de pages pour détecter des en-têtes/pieds récurrents
+_MIN_PAGES_FOR_RUNNING_LINES = 3
+# Part des pages sur laquelle une ligne doit se répéter pour être considérée récurrente
+_RUNNING_LINE_RATIO = 0.5
+
+_PAGE_NUMBER_RE = re.compile(
+    r"^\s*(?:page\s*)?[-–—]?\s*\d{1,4}\s*[-–—]?\s*(?:(?:/|sur|of)\s*\d{1,4})?\s*$",
+    re.IGNORECASE,
+)
+_DIGITS_RE = re.compile(r"\d+")
+# Mot coupé en fin de ligne: le trait d'union est gardé (mots composés)
+_HYPHENATED_BREAK_RE = re.compile(r"(\w)-\n[ \t]*([a-zà-ÿ])")
+_INLINE_SPACES_RE = re.compile(r"[ \t\u00a0\u202f]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+@dataclass
+class NormalizationStats:
+    """Mesure des gains de la normalisation pour un contrat."""
+
+    chars_before: int
+    chars_after: int
+
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return estimate_tokens_from_chars(self.chars_before) - estimate_tokens_from_chars(
+            self.chars_after
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Sérialisation pour `Analysis.results`."""
+        return {
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            "chars_saved": self.chars_saved,
+            "estimated_tokens_saved": self.tokens_saved,
+        }
+
+
+@dataclass
+class NormalizedText:
+    """Texte normalisé et statistiques associées."""
+
+    text: str
+    stats: NormalizationStats
+
+
+def estimate_tokens_from_chars(chars: int) -> int:
+    """Estime le nombre de tokens correspondant à un nombre de caractères."""
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estime le nombre de tokens d'un texte."""
+    return estimate_tokens_from_chars(len(text))
+
+
+def _line_signature(line: str) -> str:
+    """Forme canonique d'une ligne (casse, espaces, chiffres) pour comparer les pages."""
+    return _DIGITS_RE.sub("#", " ".join(line.lower().split()))
+
+
+def _edge_lines(lines: list[str]) -> list[str]:
+    """Premières et dernières lignes non vides d'une page."""
+    non_blank = [line for line in lines if line.strip()]
+    return non_blank[:_EDGE_LINES] + non_blank[-_EDGE_LINES:]
+
+
+def _detect_running_lines(pages_lines: list[list[str]]) -> set[str]:
+    """Signatures des lignes répétées en bord de page sur une majorité de pages."""
+    if len(pages_lines) < _MIN_PAGES_FOR_RUNNING_LINES:
+        return set()
+
+    counts: Counter[str] = Counter()
+    for lines in pages_lines:
+        counts.update({_line_signature(line) for line in _edge_lines(lines)})
+
+    threshold = max(_MIN_PAGES_FOR_RUNNING_LINES, math.ceil(len(pages_lines) * _RUNNING_LINE_RATIO))
+    return {signature for signature, count in counts.items() if signature and count >= threshold}
+
+
+def _strip_page_edges(lines: list[str], running: set[str], multi_page: bool) -> list[str]:
+    """Retire en-têtes/pieds récurrents et numéros de page en haut et bas de page."""
+
+    def _is_boilerplate(line: str) -> bool:
+        if _line_signature(line) in running:
+            return True
+        return multi_page and bool(_PAGE_NUMBER_RE.match(line))
+
+    start, end = 0, len(lines)
+    removed = 0
+    while start < end and removed < _EDGE_LINES:
+        if lines[start].strip() and not _is_boilerplate(lines[start]):
+            break
+        removed += bool(lines[start].strip())
+        start += 1
+
+    removed = 0
+    while end > start and removed < _EDGE_LINES:
+        if lines[end - 1].strip() and not _is_boilerplate(lines[end - 1]):
+            break
+        removed += bool(lines[end - 1].strip())
+        end -= 1
+
+    return lines[start:end]
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Réduit les espaces multiples et les lignes vides superflues."""
+    lines = [_INLINE_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def normalize_pages(pages: list[str]) -> NormalizedText:
+    """Normalise le texte extrait d'un document, page par page.
+
+    Args:
+        pages: Texte par page (un seul élément pour un document non paginé)
+
+    Returns:
+        Le texte normalisé et les statistiques de gain
+    """
+    chars_before = len("\n\n".join(page for page in pages if page))
+
+    pages_lines = [page.split("\n") for page in pages if page]
+    running = _detect_running_lines(pages_lines)
+    multi_page = len(pages_lines) > 1
+    cleaned_pages = [
+        "\n".join(_strip_page_edges(lines, running, multi_page)) for lines in pages_lines
+    ]
+
+    text = "\n\n".join(page for page in cleaned_pages if page.strip())
+    text = _HYPHENATED_BREAK_RE.sub(r"\1-\2", text)
+    text = _collapse_whitespace(text)
+
+    stats = NormalizationStats(chars_before=chars_before, chars_after=len(text))
+    return NormalizedText(text=text, stats=stats)
+
+
+def normalize_text(text: str) -> NormalizedText:
+    """Normalise un texte non paginé (césure et espaces uniquement)."""
+    return normalize_pages([text])
+
+
+def describe_extraction(extraction: ExtractionResult, normalized: NormalizedText) -> dict[str, Any]:
+    """Métadonnées d'extraction stockées dans `Analysis.results["_extraction"]`.
+
+    Args:
+        extraction: Résultat brut de l'extraction
+        normalized: Texte normalisé correspondant
+
+    Returns:
+        Nombre de pages, troncature et gains de normalisation
+    """
+    return {
+        "page_count": extraction.page_count,
+        "pages_parsed": len(extraction.pages),
+        "truncated": extraction.truncated,
+        "normalization": normalized.stats.as_dict(),
+    }
@@ -1,62 +1,344 @@
 """Analysis tasks.
 
 Ce module contient les tâches Celery pour l'analyse des contrats.
+
+L'analyse est découpée en étapes chaînées (voir `analysis_pipeline`), routées
+vers deux files: l'extraction du texte, gourmande en CPU, sur `CPU_QUEUE`
+(pool prefork dimensionné aux cœurs), l'appel au LLM et l'enregistrement, qui
+attendent surtout le réseau, sur `IO_QUEUE` (worker en mode async). Le texte
+extrait ne transite pas par le broker: il est déposé dans le stockage et les
+étapes suivantes n'en reçoivent que la clé.
+
+Un même contrat n'est jamais analysé deux fois en parallèle (redélivraison
+`task_acks_late`, analyse envoyée deux fois): chaque analyse tient un bail
+Redis par contrat (voir `app/core/locks.py`), renouvelé pendant chaque étape et
+transmis d'une étape à la suivante. Une tâche qui trouve le bail tenu par une
+autre s'arrête (statut `duplicate`) sans appeler le LLM.
+
+Chaque changement d'étape est publié sur Redis (voir `progress_events`) pour
+l'endpoint SSE `GET /contracts/{id}/events`.
+
+En mode batch (uploads groupés, voir `llm_batches`), l'étape LLM est remplacée
+par une mise en attente de soumission: la tâche périodique `poll_llm_batches`
+soumet les contrats en Message Batch puis enregistre leurs résultats.
 """
 
 import asyncio
+import logging
+import os
+import random
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
 from typing import Any
 from uuid import UUID
 
-from celery import Task
+from celery import Task, chain
+from celery.canvas import Signature
 from celery.exceptions import MaxRetriesExceededError
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import col
-from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 
 from app.celery_app import celery_app
+from app.core.locks import (
+    DUPLICATE_ANALYSIS_METRIC,
+    LeaseLock,
+    analysis_lease,
+    claim_lease,
+    release_lease,
+)
+from app.core.metrics import increment_daily
 from app.models import Contract, Analysis, AnalysisStatus, ContractStatus
-from app.services.text_extractor import extract_text
+from app.services.analysis_reuse import apply_reused_analysis, find_reusable_analysis
+from app.services.analysis_scheduler import dispatch_ready, finish_analysis, keep_slot
+from app.services.claude_service import (
+    LLMServiceError,
+    build_analysis_payload,
+    parse_analysis_message,
+)
+from app.services.clause_segmenter import ClauseIndex, load_or_segment, segment_clauses
+from app.services.llm_batches import (
+    BATCH_ENDED,
+    POLL_LOCK_KEY,
+    RESULT_SUCCEEDED,
+    batch_results,
+    batch_stages,
+    create_batch,
+    enqueue_request,
+    forget_batch,
+    forget_request,
+    result_error,
+    retrieve_batch,
+    submitted_batches,
+    take_pending,
+    track_batch,
+)
+from app.services.llm_cache import (
+    KIND_ANALYSIS,
+    cache_key,
+    get_cached_result,
+    invalidate_stale_entries,
+    store_cached_result,
+)
+from app.services.object_storage import get_storage
+from app.services.progress_events import (
+    STAGE_CALLING_MODEL,
+    STAGE_COMPLETED,
+    STAGE_EXTRACTING,
+    STAGE_FAILED,
+    STAGE_SCORING,
+    publish_progress,
+)
+from app.services.text_extractor import DocumentTooComplexError, extract_stored_document
+from app.services.text_normalizer import describe_extraction, normalize_pages
+from app.tasks.runtime import WorkerRuntime, get_runtime
+
+logger = logging.getLogger(__name__)
+
+# Statut des résultats intermédiaires passés d'une étape à la suivante: une
+# étape reçoit un résultat final (analyse réutilisée, échec) et le transmet tel quel
+STAGE_PENDING = "processing"
+
+# Texte normalisé d'un contrat entre l'extraction et l'appel au LLM
+STAGE_KEY_PREFIX = "stages/"
+
+# Résultat d'une tâche arrêtée car le contrat est déjà en cours d'analyse
+STAGE_DUPLICATE = "duplicate"
+
+# Résultat d'une étape confiée au mode batch (analyse terminée par `poll_llm_batches`)
+STAGE_BATCHED = "batched"
+
+
+def analysis_pipeline(*contract_ids: str) -> Signature:
+    """Chaîne des étapes d'analyse (extraction → LLM → enregistrement).
+
+    Args:
+        contract_ids: IDs des contrats à analyser (UUID string), l'un après l'autre
+
+    Returns:
+        La signature à envoyer
+    """
+    return chain(
+        *(
+            step
+            for contract_id in contract_ids
+            for step in (
+                extract_contract_text.si(contract_id),
+                run_llm_analysis.s(),
+                persist_analysis.s(),
+            )
+        )
+    )
 
 
-class DatabaseTask(Task):
-    """Tâche Celery avec accès à la base de données."""
+def batch_analysis_pipeline(contract_id: str, *followers: str) -> Signature:
+    """Chaîne d'une analyse en mode batch (extraction → attente de soumission).
 
-    _db_session: Any = None
+    Args:
+        contract_id: Contrat soumis à la prochaine Message Batch (UUID string)
+        followers: Contrats de contenu identique, analysés (par réutilisation)
+            une fois l'analyse du premier enregistrée
 
-    def after_return(self, *args: Any, **kwargs: Any) -> None:
-        """Ferme la session DB après l'exécution."""
-        if self._db_session:
-            asyncio.run(self._db_session.close())
-            self._db_session = None
+    Returns:
+        La signature à envoyer
+    """
+    return chain(
+        extract_contract_text.si(contract_id),
+        queue_batch_analysis.s(list(followers)),
+    )
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+@celery_app.task(bind=True, max_retries=settings.ANALYSIS_MAX_RETRIES)
 def analyze_contract(self: Task, contract_id: str) -> dict:
-    """Tâche d'analyse d'un contrat.
+    """Tâche d'analyse d'un contrat en une seule étape.
 
     Cette tâche:
     1. Extrait le texte du contrat
     2. Envoie le texte à Claude pour analyse
     3. Stocke les résultats en base de données
 
+    Les nouvelles analyses passent par `analysis_pipeline`; cette tâche traite
+    les messages déjà en file.
+
     Args:
         contract_id: ID du contrat à analyser (UUID string)
 
     Returns:
         Les résultats de l'analyse
     """
-    import asyncio
+    return _run_stage(
+        self, contract_id, lambda runtime: _analyze_contract_async(contract_id, runtime)
+    )
+
+
+@celery_app.task
+def dispatch_scheduled_analyses() -> int:
+    """Tâche périodique: envoie les analyses en attente dont la place s'est libérée.
+
+    Les places sont normalement libérées à la fin de chaque analyse; ce passage
+    rattrape celles d'analyses perdues (voir `SCHEDULER_SLOT_TIMEOUT_SECONDS`).
+
+    Returns:
+        Le nombre d'analyses envoyées
+    """
+    runtime = get_runtime()
+    return runtime.run(dispatch_ready(runtime.redis))
+
 
-    return asyncio.run(_analyze_contract_async(self, contract_id))
+@celery_app.task
+def poll_llm_batches() -> dict:
+    """Tâche périodique: enregistre les résultats des Message Batches terminées et
+    soumet en une nouvelle batch les contrats en attente.
+
+    Returns:
+        Le nombre de résultats enregistrés et de contrats soumis
+    """
+    runtime = get_runtime()
+    return runtime.run(_poll_batches(runtime))
 
 
-async def _analyze_contract_async(task: Task, contract_id: str) -> dict[str, Any]:
-    """Version asynchrone de l'analyse de contrat."""
-    from app.services.claude_service import analyze_contract_with_claude
+@celery_app.task
+def purge_llm_cache() -> int:
+    """Tâche périodique: supprime du cache des résultats du LLM les entrées
+    expirées (`LLM_CACHE_DB_TTL_DAYS`) ou produites avec d'anciens prompts.
+
+    Returns:
+        Le nombre d'entrées supprimées
+    """
+    runtime = get_runtime()
+    return runtime.run(invalidate_stale_entries(runtime.redis, runtime.session_factory))
+
+
+@celery_app.task(bind=True, max_retries=settings.ANALYSIS_MAX_RETRIES)
+def extract_contract_text(self: Task, contract_id: str) -> dict:
+    """Étape 1 (CPU): extrait, normalise et segmente le texte du contrat.
+
+    Args:
+        contract_id: ID du contrat à analyser (UUID string)
+
+    Returns:
+        Le résultat intermédiaire (clé du texte dans le stockage), ou le
+        résultat final si une analyse identique a été réutilisée
+    """
+    return _run_stage(self, contract_id, lambda runtime: _extract_stage(contract_id, runtime))
+
+
+@celery_app.task(bind=True, max_retries=settings.ANALYSIS_MAX_RETRIES)
+def run_llm_analysis(self: Task, stage: dict) -> dict:
+    """Étape 2 (I/O): analyse le texte extrait avec Claude.
+
+    Args:
+        stage: Résultat de `extract_contract_text`
+
+    Returns:
+        Le résultat intermédiaire complété des résultats d'analyse
+    """
+    if stage["status"] != STAGE_PENDING:
+        return stage
+    return _run_stage(
+        self,
+        stage["contract_id"],
+        lambda runtime: _llm_stage(stage, runtime),
+        lease_token=stage.get("lease_token"),
+    )
+
+
+@celery_app.task(bind=True, max_retries=settings.ANALYSIS_MAX_RETRIES)
+def persist_analysis(self: Task, stage: dict) -> dict:
+    """Étape 3 (I/O): enregistre l'analyse et les scores.
+
+    Args:
+        stage: Résultat de `run_llm_analysis`
 
+    Returns:
+        Les résultats de l'analyse
+    """
+    if stage["status"] != STAGE_PENDING:
+        return stage
+    return _run_stage(
+        self,
+        stage["contract_id"],
+        lambda runtime: _persist_stage(stage, runtime),
+        lease_token=stage.get("lease_token"),
+    )
+
+
+@celery_app.task(bind=True, max_retries=settings.ANALYSIS_MAX_RETRIES)
+def queue_batch_analysis(self: Task, stage: dict, followers: list[str] | None = None) -> dict:
+    """Étape 2 (mode batch): met le texte extrait en attente de la prochaine Message Batch.
+
+    Args:
+        stage: Résultat de `extract_contract_text`
+        followers: Contrats de contenu identique (voir `batch_analysis_pipeline`)
+
+    Returns:
+        Le résultat intermédiaire, au statut `batched`
+    """
+    if stage["status"] != STAGE_PENDING:
+        _dispatch_followers(followers or [])
+        return stage
+    return _run_stage(
+        self,
+        stage["contract_id"],
+        lambda runtime: _batch_stage(stage, followers or [], runtime),
+        lease_token=stage.get("lease_token"),
+    )
+
+
+def _run_stage(
+    task: Task,
+    contract_id: str,
+    stage: Callable[[WorkerRuntime], Awaitable[dict[str, Any]]],
+    lease_token: str | None = None,
+) -> dict[str, Any]:
+    """Exécute une étape sur la boucle du processus worker, avec retry en cas d'erreur."""
+    # Boucle, pool de connexions et client HTTP du processus worker (voir runtime)
+    runtime = get_runtime()
+    try:
+        return runtime.run(
+            runtime.limited(_guarded(contract_id, runtime, stage, lease_token))
+        )
+    except Exception as exc:
+        if task.request.retries >= (task.max_retries or 0):
+            # Échec définitif: la place de l'analyse dans la file est libérée
+            runtime.run(_give_up(runtime, contract_id, exc))
+        else:
+            # La place dans la file reste prise pendant l'attente du nouvel essai
+            runtime.run(keep_slot(contract_id, runtime.redis))
+        # Retry décidé ici: en mode async, la coroutine tourne dans le thread de la
+        # boucle, où le contexte de la requête Celery n'est pas disponible
+        countdown = retry_countdown(exc, task.request.retries)
+        logger.warning(f"Contrat {contract_id}: nouvel essai dans {countdown:.0f}s ({exc})")
+        try:
+            raise task.retry(exc=exc, countdown=countdown)
+        except MaxRetriesExceededError:
+            return {
+                "contract_id": contract_id,
+                "status": "failed",
+                "error": str(exc),
+            }
+
+
+async def _guarded(
+    contract_id: str,
+    runtime: WorkerRuntime,
+    stage: Callable[[WorkerRuntime], Awaitable[dict[str, Any]]],
+    lease_token: str | None = None,
+) -> dict[str, Any]:
+    """Exécute une étape sous le bail du contrat et le passe en échec si elle lève une erreur.
+
+    Args:
+        contract_id: ID du contrat (UUID string)
+        runtime: Ressources du processus worker
+        stage: Étape à exécuter
+        lease_token: Bail pris par l'étape précédente (un nouveau bail sinon)
+
+    Raises:
+        Exception: Toute erreur passagère, à retenter (voir `is_retryable`); une
+            erreur définitive termine l'analyse en échec sans retry
+    """
     try:
         contract_uuid = UUID(contract_id)
     except ValueError:
@@ -66,142 +348,564 @@ async def _analyze_contract_async(task: Task, contract_id: str) -> dict[str, Any
             "error": "Identifiant de contrat invalide",
         }
 
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=settings.DEBUG,
-        future=True,
-    )
-    session_factory = async_sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
+    lease = analysis_lease(runtime.redis, contract_id, lease_token)
+    if not await claim_lease(lease):
+        # Une autre tâche analyse ce contrat: elle enregistrera le résultat
+        logger.info(f"Contrat {contract_id} déjà en cours d'analyse, tâche en double ignorée")
+        await increment_daily(DUPLICATE_ANALYSIS_METRIC, redis=runtime.redis)
+        return {"contract_id": contract_id, "status": STAGE_DUPLICATE}
 
-    async with session_factory() as db:
-        try:
-            # Récupère le contrat
-            result = await db.execute(
-                select(Contract).where(col(Contract.id) == contract_uuid)
-            )
-            contract = result.scalar_one_or_none()
+    try:
+        async with lease.heartbeat():
+            result = await stage(runtime)
+    except Exception as exc:
+        # Bail libéré: le retry (nouvelle tâche) doit pouvoir le reprendre
+        await release_lease(lease)
+
+        if is_retryable(exc):
+            # Retry si possible (voir _run_stage): le contrat reste en cours d'analyse
+            # jusqu'au dernier essai (voir _give_up)
+            raise
+        # Échec définitif: un nouvel essai échouerait pareil, la place du worker est libérée
+        await _mark_failed(runtime, contract_uuid, exc)
+        logger.warning(f"Contrat {contract_id}: échec définitif ({exc})")
+        result = {
+            "contract_id": contract_id,
+            "status": "failed",
+            "error": str(exc),
+        }
+        if isinstance(exc, DocumentTooComplexError):
+            result["details"] = exc.as_dict()
+
+    if result["status"] == STAGE_PENDING:
+        # Bail gardé jusqu'à l'étape suivante
+        return {**result, "lease_token": lease.token}
+
+    if result["status"] == STAGE_BATCHED:
+        # La batch peut durer des heures: `poll_llm_batches` reprend un nouveau bail
+        await release_lease(lease)
+        return result
+
+    # Résultat final (analyse enregistrée ou réutilisée, échec): place suivante
+    await release_lease(lease)
+    if result["status"] == "completed":
+        await publish_progress(
+            runtime.redis,
+            contract_id,
+            STAGE_COMPLETED,
+            score_equity=result.get("score_equity"),
+            score_clarity=result.get("score_clarity"),
+        )
+    else:
+        await publish_progress(runtime.redis, contract_id, STAGE_FAILED, error=result.get("error"))
+    await finish_analysis(contract_id, runtime.redis)
+    return result
+
+
+async def _give_up(runtime: WorkerRuntime, contract_id: str, exc: Exception) -> None:
+    """Termine une analyse dont les nouveaux essais sont épuisés."""
+    try:
+        await _mark_failed(runtime, UUID(contract_id), exc)
+    except ValueError:
+        pass
+    await publish_progress(runtime.redis, contract_id, STAGE_FAILED, error=str(exc))
+    await finish_analysis(contract_id, runtime.redis)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Indique si une erreur d'analyse est passagère (un nouvel essai peut réussir).
+
+    Sont définitives les erreurs dues au contrat ou à la réponse du modèle:
+    type de fichier non supporté, fichier corrompu, document hors limites,
+    requête refusée ou JSON invalide (`ValueError`, `LLMServiceError` non
+    retentable). Le reste (réseau, surcharge de l'API, base de données, Redis,
+    stockage injoignable) est retenté.
+    """
+    if isinstance(exc, LLMServiceError):
+        return exc.retryable
+    if isinstance(exc, ValueError):
+        # Stockage injoignable à la lecture du fichier (voir extract_stored_document)
+        return isinstance(exc.__cause__, OSError)
+    return True
 
-            if not contract:
-                return {
-                    "contract_id": contract_id,
-                    "status": "failed",
-                    "error": f"Contrat {contract_id} non trouvé",
-                }
 
-            # Récupère ou crée l'analyse
+def retry_countdown(exc: BaseException, retries: int) -> float:
+    """Délai avant le nouvel essai numéro `retries + 1` (backoff exponentiel, jitter complet).
+
+    Le délai est tiré au hasard entre 0 et `base * 2^retries` (plafonné): des
+    workers en échec au même moment (surcharge de l'API) ne reviennent pas
+    ensemble. Un `retry-after` renvoyé par l'API est un minimum, auquel
+    s'ajoute un jitter pour la même raison.
+
+    Args:
+        exc: Erreur à retenter
+        retries: Nombre d'essais déjà retentés
+
+    Returns:
+        Le délai en secondes
+    """
+    base = settings.ANALYSIS_RETRY_BASE_DELAY_SECONDS
+    ceiling = min(settings.ANALYSIS_RETRY_MAX_DELAY_SECONDS, base * 2**retries)
+    delay = random.uniform(0, ceiling)
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, base))
+    return delay
+
+
+async def _mark_failed(runtime: WorkerRuntime, contract_uuid: UUID, exc: Exception) -> None:
+    """Met à jour le statut d'erreur du contrat et de son analyse."""
+    try:
+        async with runtime.session_factory() as db:
             result = await db.execute(
                 select(Analysis).where(col(Analysis.contract_id) == contract_uuid)
             )
             analysis = result.scalar_one_or_none()
+            if analysis:
+                analysis.status = AnalysisStatus.FAILED
+                analysis.error_message = str(exc)
 
-            if not analysis:
-                analysis = Analysis(contract_id=contract_uuid)
-                db.add(analysis)
+            result = await db.execute(
+                select(Contract).where(col(Contract.id) == contract_uuid)
+            )
+            contract = result.scalar_one_or_none()
+            if contract:
+                contract.status = ContractStatus.FAILED
 
-            # Met à jour le statut
-            analysis.status = AnalysisStatus.PROCESSING
-            contract.status = ContractStatus.PROCESSING
             await db.commit()
+    except Exception:
+        pass
 
-            # Extrait le texte du contrat
-            try:
-                contract_text = extract_text(contract.file_path, contract.file_type)
-            except Exception as e:
-                raise ValueError(f"Erreur d'extraction du texte: {e}")
-
-            # Analyse avec Claude
-            try:
-                results = await analyze_contract_with_claude(contract_text)
-            except Exception as e:
-                # Si pas de clé API (ou appels externes désactivés), on simule une analyse pour les tests
-                msg = str(e)
-                if "non configurée" in msg or "désactiv" in msg:
-                    results = _generate_mock_analysis(contract_text)
-                else:
-                    raise
-
-            # Met à jour l'analyse avec les résultats
-            analysis.status = AnalysisStatus.COMPLETED
-            analysis.results = results
-            analysis.score_equity = results.get("score_equity")
-            analysis.score_clarity = results.get("score_clarity")
-
-            contract.status = ContractStatus.COMPLETED
 
-            await db.commit()
+async def _analyze_contract_async(contract_id: str, runtime: WorkerRuntime) -> dict[str, Any]:
+    """Enchaîne les trois étapes dans la même tâche (voir `analyze_contract`)."""
+    stage = await _extract_stage(contract_id, runtime)
+    stage = await _llm_stage(stage, runtime)
+    return await _persist_stage(stage, runtime)
+
+
+def _stage_key(contract_id: str) -> str:
+    """Clé de stockage du texte normalisé d'un contrat en cours d'analyse."""
+    return f"{STAGE_KEY_PREFIX}{contract_id}.txt"
+
+
+def _store_stage_text(contract_id: str, text: str) -> str:
+    """Dépose le texte normalisé dans le stockage et retourne sa clé."""
+    # Fichier temporaire sur le même volume que le stockage local (déplacement atomique)
+    settings.upload_path.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix=".stage-", suffix=".part", dir=settings.upload_path)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        key = _stage_key(contract_id)
+        get_storage().put_file(key, Path(name))
+    finally:
+        Path(name).unlink(missing_ok=True)
+    return key
+
+
+def _load_stage_text(key: str) -> str:
+    """Relit le texte normalisé déposé par l'étape d'extraction."""
+    with get_storage().open_local(key) as path:
+        return path.read_text(encoding="utf-8")
+
+
+async def _extract_stage(contract_id: str, runtime: WorkerRuntime) -> dict[str, Any]:
+    """Extrait le texte du contrat (ou réutilise une analyse d'un contenu identique)."""
+    contract_uuid = UUID(contract_id)
+
+    async with runtime.session_factory() as db:
+        # Récupère le contrat
+        result = await db.execute(
+            select(Contract).where(col(Contract.id) == contract_uuid)
+        )
+        contract = result.scalar_one_or_none()
 
+        if not contract:
+            return {
+                "contract_id": contract_id,
+                "status": "failed",
+                "error": f"Contrat {contract_id} non trouvé",
+            }
+
+        # Récupère ou crée l'analyse
+        result = await db.execute(
+            select(Analysis).where(col(Analysis.contract_id) == contract_uuid)
+        )
+        analysis = result.scalar_one_or_none()
+
+        if not analysis:
+            analysis = Analysis(contract_id=contract_uuid)
+            db.add(analysis)
+        elif analysis.status == AnalysisStatus.COMPLETED:
+            # Tâche redélivrée après la fin de l'analyse: son résultat est repris
+            await increment_daily(DUPLICATE_ANALYSIS_METRIC, redis=runtime.redis)
             return {
                 "contract_id": contract_id,
                 "status": "completed",
                 "score_equity": analysis.score_equity,
                 "score_clarity": analysis.score_clarity,
+                "duplicate": True,
             }
 
-        except Exception as exc:
-            # Met à jour le statut d'erreur
-            try:
-                result = await db.execute(
-                    select(Analysis).where(col(Analysis.contract_id) == contract_uuid)
-                )
-                analysis = result.scalar_one_or_none()
-                if analysis:
-                    analysis.status = AnalysisStatus.FAILED
-                    analysis.error_message = str(exc)
+        # Contenu identique analysé entre-temps (upload concurrent, ré-analyse)
+        reusable = await find_reusable_analysis(
+            db, contract.content_hash, exclude_contract_id=contract.id
+        )
+        if reusable is not None:
+            apply_reused_analysis(reusable, analysis, contract)
+            await db.commit()
+            return {
+                "contract_id": contract_id,
+                "status": "completed",
+                "score_equity": analysis.score_equity,
+                "score_clarity": analysis.score_clarity,
+                "reused": True,
+            }
 
-                result = await db.execute(
-                    select(Contract).where(col(Contract.id) == contract_uuid)
+        # Met à jour le statut
+        analysis.status = AnalysisStatus.PROCESSING
+        contract.status = ContractStatus.PROCESSING
+        await db.commit()
+        await publish_progress(runtime.redis, contract_id, STAGE_EXTRACTING)
+
+        # Extrait le texte du contrat (arrêt au budget utile au LLM), hors de la
+        # boucle pour ne pas bloquer les autres analyses en cours
+        try:
+            async with runtime.extraction_slots:
+                extraction = await asyncio.to_thread(
+                    extract_stored_document,
+                    contract.file_path,
+                    contract.file_type,
+                    max_chars=settings.EXTRACTION_CHAR_BUDGET,
+                    content_hash=contract.content_hash,
                 )
-                contract = result.scalar_one_or_none()
-                if contract:
-                    contract.status = ContractStatus.FAILED
-
-                await db.commit()
-            except Exception:
-                pass
-
-            # Retry si possible
-            try:
-                task.retry(exc=exc, countdown=60)
-            except MaxRetriesExceededError:
-                return {
-                    "contract_id": contract_id,
-                    "status": "failed",
-                    "error": str(exc),
-                }
+        except ValueError as e:
+            # Document hors limites, stockage injoignable: erreur transmise telle quelle
+            if isinstance(e, DocumentTooComplexError) or isinstance(e.__cause__, OSError):
+                raise
+            raise ValueError(f"Erreur d'extraction du texte: {e}") from e
+
+        # Normalise le texte (en-têtes/pieds, césures, espaces) avant le prompt
+        normalized = normalize_pages(extraction.pages)
+        contract_text = normalized.text
+        logger.info(
+            f"Contrat {contract_id}: normalisation -{normalized.stats.chars_saved} caractères "
+            f"(~{normalized.stats.tokens_saved} tokens)"
+        )
+
+        # Segmente le texte en articles une seule fois (index réutilisé aux retries)
+        clause_index = load_or_segment(contract.clause_index, contract_text)
+        contract.clause_index = clause_index.as_dict()
+        await db.commit()
+
+    text_key = await asyncio.to_thread(_store_stage_text, contract_id, contract_text)
+    return {
+        "contract_id": contract_id,
+        "status": STAGE_PENDING,
+        "text_key": text_key,
+        "extraction": describe_extraction(extraction, normalized),
+    }
+
+
+async def _llm_stage(stage: dict[str, Any], runtime: WorkerRuntime) -> dict[str, Any]:
+    """Analyse avec Claude le texte déposé par l'étape d'extraction.
+
+    Un texte déjà analysé avec le même modèle et les mêmes prompts est relu
+    depuis le cache des résultats du LLM (voir `llm_cache`).
+    """
+    from app.services.claude_service import (
+        MOCK_ANALYSIS_MODEL,
+        analyze_contract_with_claude,
+        current_analysis_model,
+    )
+
+    if stage["status"] != STAGE_PENDING:
+        return stage
 
+    await publish_progress(runtime.redis, stage["contract_id"], STAGE_CALLING_MODEL)
+    contract_text, clause_index = await _load_stage_input(stage, runtime)
+
+    key = cache_key(KIND_ANALYSIS, current_analysis_model(), contract_text)
+    if key is not None:
+        cached = await get_cached_result(key, runtime.redis, runtime.session_factory)
+        if cached is not None:
+            return {**stage, "results": cached, "model": key.model, "llm_cache_key": str(key)}
+
+    # Analyse avec Claude
+    model = settings.ANTHROPIC_MODEL
+    try:
+        results = await analyze_contract_with_claude(
+            contract_text, clause_index, client=runtime.http_client
+        )
+    except Exception as e:
+        # Si pas de clé API (ou appels externes désactivés), on simule une analyse pour les tests
+        msg = str(e)
+        if "non configurée" in msg or "désactiv" in msg:
+            results = _generate_mock_analysis(contract_text, clause_index)
+            model = MOCK_ANALYSIS_MODEL
+        else:
+            raise
+
+    if key is None or model == MOCK_ANALYSIS_MODEL:
+        return {**stage, "results": results, "model": model}
+    await store_cached_result(key, results, runtime.redis, runtime.session_factory)
+    return {**stage, "results": results, "model": model, "llm_cache_key": str(key)}
+
+
+async def _load_stage_input(
+    stage: dict[str, Any], runtime: WorkerRuntime
+) -> tuple[str, ClauseIndex]:
+    """Relit le texte extrait d'un contrat et son index de segmentation."""
+    contract_text = await asyncio.to_thread(_load_stage_text, stage["text_key"])
+    async with runtime.session_factory() as db:
+        result = await db.execute(
+            select(col(Contract.clause_index)).where(col(Contract.id) == UUID(stage["contract_id"]))
+        )
+        clause_index = load_or_segment(result.scalar_one_or_none(), contract_text)
+    return contract_text, clause_index
+
+
+async def _persist_stage(stage: dict[str, Any], runtime: WorkerRuntime) -> dict[str, Any]:
+    """Enregistre les résultats de l'analyse et libère le texte intermédiaire."""
+    from app.services.claude_service import ANALYSIS_PROMPT_VERSION
+
+    if stage["status"] != STAGE_PENDING:
+        return stage
+
+    await publish_progress(runtime.redis, stage["contract_id"], STAGE_SCORING)
+    contract_uuid = UUID(stage["contract_id"])
+    results = stage["results"]
+    results["_extraction"] = stage["extraction"]
+
+    async with runtime.session_factory() as db:
+        result = await db.execute(
+            select(Contract).where(col(Contract.id) == contract_uuid)
+        )
+        contract = result.scalar_one_or_none()
+        result = await db.execute(
+            select(Analysis).where(col(Analysis.contract_id) == contract_uuid)
+        )
+        analysis = result.scalar_one_or_none()
+        if contract is None or analysis is None:
+            return {
+                "contract_id": stage["contract_id"],
+                "status": "failed",
+                "error": f"Contrat {stage['contract_id']} non trouvé",
+            }
+
+        # Met à jour l'analyse avec les résultats
+        analysis.status = AnalysisStatus.COMPLETED
+        analysis.results = results
+        analysis.score_equity = results.get("score_equity")
+        analysis.score_clarity = results.get("score_clarity")
+        analysis.model = stage["model"]
+        analysis.prompt_version = ANALYSIS_PROMPT_VERSION
+        analysis.llm_cache_key = stage.get("llm_cache_key")
+
+        contract.status = ContractStatus.COMPLETED
+
+        await db.commit()
+
+    try:
+        await asyncio.to_thread(get_storage().delete, stage["text_key"])
+    except OSError as e:
+        logger.warning(f"Texte intermédiaire non supprimé ({stage['text_key']}): {e}")
+
+    return {
+        "contract_id": stage["contract_id"],
+        "status": "completed",
+        "score_equity": analysis.score_equity,
+        "score_clarity": analysis.score_clarity,
+    }
+
+
+async def _batch_stage(
+    stage: dict[str, Any], followers: list[str], runtime: WorkerRuntime
+) -> dict[str, Any]:
+    """Met le résultat d'extraction en attente de soumission (mode batch)."""
+    request = {key: value for key, value in stage.items() if key != "lease_token"}
+    await enqueue_request(runtime.redis, stage["contract_id"], {**request, "followers": followers})
+    await publish_progress(runtime.redis, stage["contract_id"], STAGE_CALLING_MODEL, batch=True)
+    return {**request, "status": STAGE_BATCHED}
+
+
+def _dispatch_followers(followers: list[str]) -> None:
+    """Analyse les contrats de contenu identique à un contrat analysé en batch.
+
+    Leur pipeline reprend l'analyse enregistrée (voir `find_reusable_analysis`).
+    """
+    if followers:
+        analysis_pipeline(*followers).apply_async()
+
+
+async def _poll_batches(runtime: WorkerRuntime) -> dict[str, int]:
+    """Relève les batches soumises, puis soumet les contrats en attente."""
+    lock = LeaseLock(runtime.redis, POLL_LOCK_KEY, settings.ANALYSIS_LEASE_TTL_SECONDS)
+    if not await lock.acquire():
+        # Passage précédent encore en cours
+        return {"collected": 0, "submitted": 0}
+
+    collected = 0
+    try:
+        async with lock.heartbeat():
+            for batch_id in await submitted_batches(runtime.redis):
+                try:
+                    collected += await _collect_batch(runtime, batch_id)
+                except Exception as exc:
+                    if is_retryable(exc):
+                        # Relevée au prochain passage, sans retarder les autres batches
+                        logger.warning(f"Batch {batch_id} non relevée ({exc})")
+                        continue
+                    logger.error(f"Batch {batch_id} abandonnée ({exc})")
+                    await _abandon_batch(runtime, batch_id, exc)
+            submitted = await _submit_batch(runtime)
+    finally:
+        await lock.release()
+    return {"collected": collected, "submitted": submitted}
+
+
+async def _submit_batch(runtime: WorkerRuntime) -> int:
+    """Soumet en une Message Batch les contrats en attente (au plus `LLM_BATCH_MAX_REQUESTS`)."""
+    stages = await take_pending(runtime.redis, settings.LLM_BATCH_MAX_REQUESTS)
+    if not stages:
+        return 0
+
+    try:
+        requests = []
+        for contract_id, stage in stages.items():
+            contract_text, clause_index = await _load_stage_input(stage, runtime)
+            params = build_analysis_payload(contract_text, clause_index)
+            stage["model"] = params["model"]
+            requests.append({"custom_id": contract_id, "params": params})
+        batch = await create_batch(runtime.http_client, requests)
+    except Exception as exc:
+        if is_retryable(exc):
+            # Contrats soumis au prochain passage
+            for contract_id, stage in stages.items():
+                await enqueue_request(runtime.redis, contract_id, stage, resubmit=True)
             raise
-        finally:
-            await engine.dispose()
+        logger.warning(f"Batch refusée, {len(stages)} analyses en échec ({exc})")
+        for contract_id in stages:
+            await _guarded(contract_id, runtime, _raising(exc))
+        return 0
+
+    await track_batch(runtime.redis, batch["id"], stages)
+    logger.info(f"Batch {batch['id']} soumise ({len(stages)} contrats)")
+    return len(stages)
+
 
+async def _collect_batch(runtime: WorkerRuntime, batch_id: str) -> int:
+    """Enregistre les résultats d'une batch terminée (aucun si elle est en cours).
+
+    Un résultat dont l'enregistrement échoue (base, stockage) reste attaché à la
+    batch et est repris au passage suivant.
+
+    Returns:
+        Le nombre de résultats traités
+    """
+    batch = await retrieve_batch(runtime.http_client, batch_id)
+    if batch["processing_status"] != BATCH_ENDED:
+        return 0
+
+    stages = await batch_stages(runtime.redis, batch_id)
+    items = await batch_results(runtime.http_client, batch)
+    results = {item["custom_id"]: item["result"] for item in items}
+    collected = 0
+    remaining = False
+    for contract_id, stage in stages.items():
+        try:
+            await _collect_result(runtime, stage, results.get(contract_id))
+        except Exception as e:
+            logger.warning(f"Contrat {contract_id}: résultat de batch non enregistré ({e})")
+            remaining = True
+            continue
+        await forget_request(runtime.redis, batch_id, contract_id)
+        collected += 1
+
+    if not remaining:
+        await forget_batch(runtime.redis, batch_id)
+    return collected
+
+
+async def _abandon_batch(runtime: WorkerRuntime, batch_id: str, exc: Exception) -> None:
+    """Oublie une batch dont les résultats sont inaccessibles (batch inconnue de
+    l'API, requête refusée) et met ses contrats en échec."""
+    for contract_id in await batch_stages(runtime.redis, batch_id):
+        await _guarded(contract_id, runtime, _raising(exc))
+        await forget_request(runtime.redis, batch_id, contract_id)
+    await forget_batch(runtime.redis, batch_id)
+
+
+async def _collect_result(
+    runtime: WorkerRuntime, stage: dict[str, Any], result: dict[str, Any] | None
+) -> None:
+    """Enregistre le résultat d'une requête de batch, ou la remet en attente de soumission."""
+    contract_id = stage["contract_id"]
+    if result is not None and result["type"] == RESULT_SUCCEEDED:
+        message = result["message"]
+
+        async def _persist(runtime: WorkerRuntime) -> dict[str, Any]:
+            results = parse_analysis_message(message)
+            return await _persist_stage({**stage, "results": results}, runtime)
+
+        await _guarded(contract_id, runtime, _persist)
+    else:
+        error = (
+            result_error(result)
+            if result is not None
+            else LLMServiceError("Requête absente des résultats de la batch", retryable=True)
+        )
+        if error.retryable:
+            # Erreur passagère, requête expirée: soumise dans une prochaine batch
+            await enqueue_request(runtime.redis, contract_id, stage, resubmit=True)
+            return
+        await _guarded(contract_id, runtime, _raising(error))
 
-def _generate_mock_analysis(contract_text: str) -> dict:
+    _dispatch_followers(stage.get("followers", []))
+
+
+def _raising(exc: Exception) -> Callable[[WorkerRuntime], Awaitable[dict[str, Any]]]:
+    """Étape qui lève `exc` (échec passé par `_guarded`: statut, événement, file)."""
+
+    async def _stage(runtime: WorkerRuntime) -> dict[str, Any]:
+        raise exc
+
+    return _stage
+
+
+# Types de clauses signalés comme risques par l'analyse simulée
+_MOCK_RISK_TYPES = {
+    "clause_pénalité": "pénalité",
+    "délai_résiliation": "résiliation",
+    "non_concurrence": "non concurrence",
+    "garantie": "garantie",
+}
+
+
+def _generate_mock_analysis(contract_text: str, clause_index: ClauseIndex | None = None) -> dict:
     """Génère une analyse simulée pour les tests sans clé API.
 
     Args:
         contract_text: Texte du contrat
+        clause_index: Index de segmentation du contrat (calculé ici sinon)
 
     Returns:
         Résultats d'analyse simulés
     """
-    # Analyse simple basée sur la longueur et le contenu
-    text_lower = contract_text.lower()
+    if clause_index is None:
+        clause_index = segment_clauses(contract_text)
 
-    # Détecte des termes à risque
-    risk_terms = ["pénalité", "résiliation", "exclusivité", "non concurrence", "garantie"]
+    # Détecte des clauses à risque à partir de l'index (sans reparcourir le texte)
     detected_risks = []
-
-    for term in risk_terms:
-        if term in text_lower:
+    for clause_type, term in _MOCK_RISK_TYPES.items():
+        segments = clause_index.segments_of_type(clause_type)
+        if segments:
             detected_risks.append(
                 {
                     "severity": "medium",
                     "description": f"Clause contenant '{term}' détectée",
-                    "clause": f"Mention de {term} dans le contrat",
+                    "clause": segments[0].heading or f"Mention de {term} dans le contrat",
                 }
             )
 
@@ -214,6 +918,12 @@ def _generate_mock_analysis(contract_text: str) -> dict:
             }
         ]
 
+    articles = [segment for segment in clause_index.segments if segment.number is not None]
+    key_clauses = [
+        {"name": segment.heading, "content": ", ".join(segment.clause_types), "importance": "standard"}
+        for segment in articles[:5]
+    ] or [{"name": "Clause principale", "content": "Objet du contrat", "importance": "critical"}]
+
     # Scores basés sur la complexité
     text_length = len(contract_text)
     if text_length < 1000:
@@ -233,9 +943,7 @@ def _generate_mock_analysis(contract_text: str) -> dict:
             "Faire relire le contrat par un juriste pour validation finale",
             "Vérifier que toutes les clauses essentielles sont présentes",
         ],
-        "key_clauses": [
-            {"name": "Clause principale", "content": "Objet du contrat", "importance": "critical"}
-        ],
+        "key_clauses": key_clauses,
         "unfair_terms": [],
         "score_equity": equity_score,
         "score_clarity": clarity_score,
@@ -0,0 +1,209 @@
+"""Worker runtime.
+
+Ce module porte les ressources longue durée d'un processus worker Celery: une
+boucle d'événements, un moteur SQLAlchemy (pool de connexions) et un client
+HTTP pour l'API Anthropic (voir `llm_client`). Elles sont créées une fois par processus (signal
+`worker_process_init` en prefork, première tâche en pool solo) et partagées
+par toutes ses tâches, au lieu d'un `asyncio.run` et d'un moteur par tâche.
+
+Chaque processus a sa propre boucle: les connexions asyncpg et httpx restent
+attachées à la boucle qui les a créées, ce qui permet le pool prefork avec
+`--concurrency` supérieur à 1.
+
+En mode `ANALYSIS_WORKER_MODE=async` (pool de threads Celery), la boucle tourne
+dans un thread dédié: chaque thread du pool y soumet son analyse et attend le
+résultat, si bien qu'un seul processus mène jusqu'à `ANALYSIS_MAX_IN_FLIGHT`
+analyses en parallèle pendant qu'elles attendent l'API Anthropic. Le pool de
+threads n'applique pas les limites de durée des tâches Celery: `run` arrête
+lui-même une coroutine au bout de `task_soft_time_limit`.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import httpx
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.services.llm_client import close_llm_client, create_llm_client
+from app.services.text_extractor import stop_sandboxes
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class WorkerRuntime:
+    """Ressources partagées par les tâches d'un processus worker.
+
+    Attributes:
+        loop: Boucle d'événements du processus (toutes les tâches y sont exécutées)
+        engine: Moteur SQLAlchemy (pool de connexions du processus)
+        session_factory: Fabrique de sessions liées à `engine`
+        http_client: Client HTTP (connexions gardées ouvertes vers l'API Anthropic)
+        redis: Client Redis (file d'analyses)
+        analysis_slots: Analyses menées en même temps sur la boucle
+        extraction_slots: Extractions de texte (processus isolés) en même temps
+        thread: Thread qui fait tourner la boucle (mode async), None sinon
+        time_limit: Durée maximale d'une coroutine soumise par `run` (mode
+            async, en secondes), None sinon
+    """
+
+    loop: asyncio.AbstractEventLoop
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    http_client: httpx.AsyncClient
+    redis: Redis
+    analysis_slots: asyncio.Semaphore
+    extraction_slots: asyncio.Semaphore
+    thread: threading.Thread | None = None
+    time_limit: float | None = None
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Exécute une coroutine sur la boucle du processus et attend son résultat.
+
+        En mode async, peut être appelée depuis plusieurs threads à la fois.
+
+        Raises:
+            SoftTimeLimitExceeded: Si la coroutine dépasse `time_limit` (elle est annulée)
+        """
+        if self.thread is None:
+            return self.loop.run_until_complete(coro)
+        if self.time_limit is not None:
+            coro = _within(coro, self.time_limit)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def limited(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Exécute une analyse quand un emplacement `ANALYSIS_MAX_IN_FLIGHT` se libère."""
+        async with self.analysis_slots:
+            return await coro
+
+    def close(self) -> None:
+        """Ferme le client HTTP, le pool de connexions et la boucle."""
+        try:
+            self.run(close_llm_client(self.http_client))
+            self.run(self.redis.aclose())
+            self.run(self.engine.dispose())
+            self.run(self.loop.shutdown_asyncgens())
+        finally:
+            if self.thread is not None:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self.thread.join()
+            self.loop.close()
+            if self.thread is None:
+                asyncio.set_event_loop(None)
+
+
+async def _within(coro: Coroutine[Any, Any, T], seconds: float) -> T:
+    """Attend une coroutine au plus `seconds` secondes (limite douce des tâches Celery)."""
+    try:
+        return await asyncio.wait_for(coro, seconds)
+    except TimeoutError as e:
+        raise SoftTimeLimitExceeded(f"Tâche arrêtée après {seconds:g}s") from e
+
+
+_runtime: WorkerRuntime | None = None
+_runtime_pid: int | None = None
+# Les threads du pool (mode async) demandent le runtime en même temps
+_runtime_lock = threading.Lock()
+
+
+def _create_runtime() -> WorkerRuntime:
+    """Crée la boucle, le moteur et le client HTTP du processus courant."""
+    async_mode = settings.ANALYSIS_WORKER_MODE == "async"
+    loop = asyncio.new_event_loop()
+    if not async_mode:
+        asyncio.set_event_loop(loop)
+
+    engine_options: dict[str, Any] = {}
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        # Connexions coupées pendant l'inactivité du worker: vérifiées avant usage
+        engine_options = {"pool_size": settings.WORKER_DB_POOL_SIZE, "pool_pre_ping": True}
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True,
+        **engine_options,
+    )
+    session_factory = async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+    max_in_flight = settings.ANALYSIS_MAX_IN_FLIGHT if async_mode else 1
+    # Une connexion HTTP par analyse en vol au minimum
+    http_connections = max(settings.WORKER_HTTP_MAX_CONNECTIONS, max_in_flight)
+    http_client = create_llm_client(max_connections=http_connections)
+
+    thread = None
+    if async_mode:
+        thread = threading.Thread(target=loop.run_forever, name="analysis-event-loop", daemon=True)
+        thread.start()
+
+    return WorkerRuntime(
+        loop=loop,
+        engine=engine,
+        session_factory=session_factory,
+        http_client=http_client,
+        redis=Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True),
+        analysis_slots=asyncio.Semaphore(max_in_flight),
+        extraction_slots=asyncio.Semaphore(settings.EXTRACTION_MAX_CONCURRENCY),
+        thread=thread,
+        time_limit=celery_app.conf.task_soft_time_limit if async_mode else None,
+    )
+
+
+def get_runtime() -> WorkerRuntime:
+    """Retourne les ressources du processus courant (créées au premier appel).
+
+    Des ressources héritées d'un fork ne sont jamais réutilisées: leurs
+    sockets sont partagées avec le processus parent.
+    """
+    global _runtime, _runtime_pid
+
+    with _runtime_lock:
+        if _runtime is None or _runtime_pid != os.getpid():
+            _runtime = _create_runtime()
+            _runtime_pid = os.getpid()
+            logger.info(
+                f"Runtime worker initialisé (pid {_runtime_pid}, "
+                f"mode {settings.ANALYSIS_WORKER_MODE})"
+            )
+        return _runtime
+
+
+def close_runtime() -> None:
+    """Libère les ressources du processus courant (sans effet si aucune n'a été créée)."""
+    global _runtime, _runtime_pid
+
+    with _runtime_lock:
+        if _runtime is not None and _runtime_pid == os.getpid():
+            _runtime.close()
+        _runtime = None
+        _runtime_pid = None
+
+
+@worker_process_init.connect
+def _init_worker_process(**_: Any) -> None:
+    """Prépare un processus enfant du pool prefork avant sa première tâche."""
+    get_runtime()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _shutdown_worker_process(**_: Any) -> None:
+    """Arrête les extractions en cours et ferme les connexions à l'arrêt du processus."""
+    stop_sandboxes()
+    close_runtime()
@@ -0,0 +1 @@
+"""Benchmarks d'extraction de texte (hors suite de tests)."""
@@ -0,0 +1,193 @@
+"""Corpus de benchmark: contrats de test rendus en PDF et DOCX.
+
+Les contrats de `test-contracts/*.txt` sont mis en page (lignes de largeur
+fixe, nombre de lignes fixe par page, pied de page numéroté) puis écrits en
+PDF (Helvetica, WinAnsi, sans dépendance) et en DOCX (python-docx, un saut de
+page par page). Des variantes synthétiques de N pages enchaînent les articles
+de tous les contrats, renumérotés, jusqu'à atteindre la taille demandée.
+
+Usage (depuis backend/):
+    python -m benchmarks.corpus --pages 1 10 100 --output /tmp/corpus
+"""
+
+import argparse
+import itertools
+import re
+import textwrap
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+CONTRACTS_DIR = Path(__file__).resolve().parents[2] / "test-contracts"
+
+LINE_WIDTH = 90
+LINES_PER_PAGE = 46
+# Un tableau tarifaire (DOCX) toutes les N pages
+TABLE_EVERY_PAGES = 10
+
+_ARTICLE_RE = re.compile(r"^Article (\d+(?:\.\d+)?)", re.MULTILINE)
+
+
+@dataclass
+class CorpusDocument:
+    """Document du corpus, rendu dans les deux formats."""
+
+    name: str
+    pages: int
+    pdf_path: Path
+    docx_path: Path
+
+
+def load_contracts(directory: Path = CONTRACTS_DIR) -> dict[str, str]:
+    """Textes des contrats de test, indexés par nom de fichier (sans extension)."""
+    return {path.stem: path.read_text(encoding="utf-8") for path in sorted(directory.glob("*.txt"))}
+
+
+def _wrap(text: str) -> list[str]:
+    """Découpe un texte en lignes d'au plus `LINE_WIDTH` caractères (lignes vides conservées)."""
+    lines: list[str] = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, LINE_WIDTH) or [""])
+    return lines
+
+
+def paginate(text: str) -> list[list[str]]:
+    """Met un texte en pages de `LINES_PER_PAGE` lignes."""
+    lines = _wrap(text)
+    return [lines[i : i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+
+def _synthetic_lines(contracts: dict[str, str]) -> Iterator[str]:
+    """Flux infini de lignes: articles de tous les contrats, renumérotés en continu."""
+    counter = itertools.count(1)
+    for name in itertools.cycle(sorted(contracts)):
+        renumbered = _ARTICLE_RE.sub(lambda _: f"Article {next(counter)}", contracts[name])
+        yield from _wrap(renumbered)
+        yield ""
+
+
+def synthetic_pages(contracts: dict[str, str], page_count: int) -> list[list[str]]:
+    """Pages d'un contrat synthétique d'exactement `page_count` pages."""
+    lines = list(itertools.islice(_synthetic_lines(contracts), page_count * LINES_PER_PAGE))
+    return [lines[i : i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def _footer(number: int, total: int) -> str:
+    return f"Contrat de test - confidentiel - Page {number} / {total}"
+
+
+def _pdf_string(text: str) -> bytes:
+    """Chaîne littérale PDF encodée en WinAnsi (cp1252), parenthèses échappées."""
+    raw = text.encode("cp1252", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    """Écrit un PDF texte (une ligne de contenu par ligne de page, pied de page numéroté)."""
+    total = len(pages)
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids ["
+            + " ".join(f"{4 + 2 * i} 0 R" for i in range(total))
+            + f"] /Count {total} >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for number, lines in enumerate(pages, start=1):
+        content = [b"BT /F1 10 Tf 13 TL 56 790 Td"]
+        content.extend(_pdf_string(line) + b" Tj T*" for line in lines)
+        footer = _pdf_string(_footer(number, total))
+        content.append(b"ET BT /F1 8 Tf 56 30 Td " + footer + b" Tj ET")
+        stream = b"\n".join(content)
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {3 + 2 * number} 0 R >>"
+            ).encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(out))
+
+
+def write_docx(path: Path, pages: list[list[str]]) -> None:
+    """Écrit un DOCX (un paragraphe par ligne non vide, saut de page entre les pages)."""
+    from docx import Document
+
+    document = Document()
+    for number, lines in enumerate(pages, start=1):
+        for line in lines:
+            if line:
+                document.add_paragraph(line)
+        if number % TABLE_EVERY_PAGES == 0:
+            table = document.add_table(rows=4, cols=3)
+            for row in range(4):
+                for col in range(3):
+                    table.cell(row, col).text = f"Palier {row} / colonne {col}"
+        document.add_paragraph(_footer(number, len(pages)))
+        if number < len(pages):
+            document.add_page_break()
+    document.save(str(path))
+
+
+def build_corpus(
+    output_dir: Path,
+    page_counts: list[int],
+    contracts: dict[str, str] | None = None,
+) -> list[CorpusDocument]:
+    """Génère le corpus: chaque contrat à sa taille réelle, puis les variantes synthétiques.
+
+    Args:
+        output_dir: Dossier de sortie
+        page_counts: Tailles des variantes synthétiques (en pages)
+        contracts: Textes sources (défaut: `test-contracts/*.txt`)
+
+    Returns:
+        Les documents générés
+    """
+    contracts = contracts if contracts is not None else load_contracts()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    layouts = [(name, paginate(text)) for name, text in contracts.items()]
+    layouts += [
+        (f"synthetique-{count}p", synthetic_pages(contracts, count)) for count in page_counts
+    ]
+
+    documents = []
+    for name, pages in layouts:
+        pdf_path = output_dir / f"{name}.pdf"
+        docx_path = output_dir / f"{name}.docx"
+        write_pdf(pdf_path, pages)
+        write_docx(docx_path, pages)
+        documents.append(
+            CorpusDocument(name=name, pages=len(pages), pdf_path=pdf_path, docx_path=docx_path)
+        )
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+
+    for document in build_corpus(args.output, args.pages):
+        print(f"{document.name:>40} {document.pages:>5} pages  {document.pdf_path.parent}")
+
+
+if __name__ == "__main__":
+    main()
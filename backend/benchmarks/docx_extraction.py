@@ -0,0 +1,89 @@
+"""Benchmark DOCX: extracteur en flux vs python-docx.
+
+Génère des DOCX synthétiques (paragraphes + grilles tarifaires) puis mesure,
+pour chaque moteur, le temps d'extraction et le pic mémoire (RSS) dans un
+processus dédié afin que les allocations lxml soient comptabilisées.
+
+Usage (depuis backend/):
+    python -m benchmarks.docx_extraction --paragraphs 500 5000 --repeat 3
+"""
+
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.services.text_extractor import extract_text_from_docx, extract_text_from_docx_python_docx
+
+ENGINES: dict[str, Callable[[Path], str]] = {
+    "streaming": extract_text_from_docx,
+    "python-docx": extract_text_from_docx_python_docx,
+}
+
+
+def build_docx(path: Path, paragraphs: int) -> None:
+    """Écrit un DOCX avec `paragraphs` paragraphes et un tableau toutes les 50."""
+    from docx import Document
+
+    document = Document()
+    for i in range(paragraphs):
+        document.add_paragraph(
+            f"Article {i + 1} - Le prestataire s'engage à exécuter les prestations "
+            "décrites en annexe dans les délais convenus, sous peine de pénalités."
+        )
+        if i % 50 == 49:
+            table = document.add_table(rows=6, cols=3)
+            for row in range(6):
+                for col in range(3):
+                    table.cell(row, col).text = f"Palier {row} / colonne {col}"
+    document.save(str(path))
+
+
+def _measure(
+    engine: str, path: str, queue: "multiprocessing.Queue[tuple[float, int, int]]"
+) -> None:
+    """Exécute un moteur dans un processus neuf et renvoie (durée, pic RSS Ko, caractères)."""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    text = ENGINES[engine](Path(path))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, max(0, peak - baseline), len(text)))
+
+
+def run_engine(engine: str, path: Path) -> tuple[float, int, int]:
+    """Mesure un moteur sur un fichier dans un processus isolé."""
+    queue: "multiprocessing.Queue[tuple[float, int, int]]" = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(engine, str(path), queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'paragraphes':>11} {'moteur':>12} {'temps (s)':>10} {'pic RSS (Mo)':>13} {'caractères':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.paragraphs:
+            path = Path(tmp) / f"bench-{count}.docx"
+            build_docx(path, count)
+            for engine in ENGINES:
+                runs = [run_engine(engine, path) for _ in range(args.repeat)]
+                best = min(run[0] for run in runs)
+                peak = max(run[1] for run in runs)
+                chars = runs[0][2]
+                print(f"{count:>11} {engine:>12} {best:>10.3f} {peak / 1024:>13.1f} {chars:>11}")
+
+
+if __name__ == "__main__":
+    main()
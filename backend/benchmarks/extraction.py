@@ -0,0 +1,240 @@
+"""Benchmark d'extraction PDF/DOCX sur le corpus des contrats de test.
+
+Pour chaque document du corpus (contrats réels et variantes synthétiques de
+1, 10, 100 et 500 pages) et chaque moteur, mesure le débit (pages/s,
+caractères/s) et le pic mémoire (RSS) dans un processus neuf. Les résultats
+peuvent être enregistrés comme référence JSON puis comparés lors des
+exécutions suivantes (les chiffres dépendent de la machine: la référence
+n'est pas versionnée).
+
+Usage (depuis backend/):
+    python -m benchmarks.extraction --save /tmp/extraction-baseline.json
+    python -m benchmarks.extraction --compare /tmp/extraction-baseline.json --max-regression 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.services.text_extractor import (
+    extract_text_from_docx,
+    extract_text_from_docx_python_docx,
+    extract_text_from_pdf,
+)
+from benchmarks.corpus import CorpusDocument, build_corpus
+
+BASELINE_FORMAT_VERSION = 1
+
+# Mesures dans des processus issus d'un serveur de fork léger: ni l'empreinte
+# mémoire du processus principal (génération du corpus) ni ses copies sur
+# écriture ne faussent le pic RSS et le temps mesurés
+_context = multiprocessing.get_context("forkserver")
+_context.set_forkserver_preload([__name__])
+
+
+def _pdf_sequential(path: Path) -> str:
+    """Extracteur PDF du service, forcé en séquentiel (un seul processus)."""
+    settings.PDF_EXTRACTION_WORKERS = 1
+    return extract_text_from_pdf(path)
+
+
+def _pdfminer(path: Path) -> str:
+    """Extraction pdfminer.six brute (moteur sous-jacent de pdfplumber)."""
+    from pdfminer.high_level import extract_text
+
+    return str(extract_text(str(path)))
+
+
+def _pypdf(path: Path) -> str:
+    """Extraction pypdf (dépendance optionnelle)."""
+    from pypdf import PdfReader
+
+    return "\n\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+
+
+ENGINES: dict[str, dict[str, Callable[[Path], str]]] = {
+    "pdf": {
+        "pdfplumber": extract_text_from_pdf,
+        "pdfplumber-sequential": _pdf_sequential,
+        "pdfminer": _pdfminer,
+    },
+    "docx": {
+        "streaming": extract_text_from_docx,
+        "python-docx": extract_text_from_docx_python_docx,
+    },
+}
+
+try:
+    import pypdf  # noqa: F401
+
+    ENGINES["pdf"]["pypdf"] = _pypdf
+except ImportError:
+    pass
+
+
+def _measure(
+    file_format: str,
+    engine: str,
+    path: str,
+    queue: "multiprocessing.Queue[tuple[float, int, int, int]]",
+) -> None:
+    """Exécute un moteur dans un processus neuf.
+
+    Renvoie (durée, pic RSS Ko du processus, pic RSS Ko des sous-processus, caractères).
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    text = ENGINES[file_format][engine](Path(path))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    queue.put((elapsed, max(0, peak - baseline), children, len(text)))
+
+
+def run_engine(file_format: str, engine: str, path: Path) -> tuple[float, int, int, int]:
+    """Mesure un moteur sur un fichier dans un processus isolé."""
+    queue: "multiprocessing.Queue[tuple[float, int, int, int]]" = _context.Queue()
+    process = _context.Process(target=_measure, args=(file_format, engine, str(path), queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def benchmark_document(
+    document: CorpusDocument, file_format: str, engine: str, repeat: int
+) -> dict[str, Any]:
+    """Meilleur temps et pic mémoire d'un moteur sur un document.
+
+    Returns:
+        Une ligne de résultat (clé: format, moteur, document)
+    """
+    path = document.pdf_path if file_format == "pdf" else document.docx_path
+    runs = [run_engine(file_format, engine, path) for _ in range(repeat)]
+    seconds = min(run[0] for run in runs)
+    chars = runs[0][3]
+    return {
+        "format": file_format,
+        "engine": engine,
+        "document": document.name,
+        "pages": document.pages,
+        "seconds": round(seconds, 4),
+        "pages_per_sec": round(document.pages / seconds, 2),
+        "chars": chars,
+        "chars_per_sec": round(chars / seconds),
+        "peak_rss_mb": round(max(run[1] for run in runs) / 1024, 1),
+        "children_peak_rss_mb": round(max(run[2] for run in runs) / 1024, 1),
+    }
+
+
+def _result_key(result: dict[str, Any]) -> tuple[str, str, str]:
+    return result["format"], result["engine"], result["document"]
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: dict[str, Any], max_regression: float | None
+) -> list[str]:
+    """Compare les résultats à une référence.
+
+    Args:
+        results: Résultats de l'exécution courante
+        baseline: Contenu d'un fichier produit par `--save`
+        max_regression: Baisse de débit (%) tolérée, None pour ne rien signaler
+
+    Returns:
+        Les régressions au-delà du seuil (une ligne par résultat)
+    """
+    reference = {_result_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    print(f"\nComparaison avec la référence du {baseline.get('generated_at', '?')}")
+    print(f"{'format':>6} {'moteur':>22} {'document':>34} {'pages/s':>16} {'pic RSS (Mo)':>18}")
+    for result in results:
+        previous = reference.get(_result_key(result))
+        if previous is None:
+            continue
+        speed = (result["pages_per_sec"] / previous["pages_per_sec"] - 1) * 100
+        memory = result["peak_rss_mb"] - previous["peak_rss_mb"]
+        print(
+            f"{result['format']:>6} {result['engine']:>22} {result['document']:>34} "
+            f"{speed:>+15.1f}% {memory:>+17.1f}"
+        )
+        if max_regression is not None and speed < -max_regression:
+            regressions.append(
+                f"{result['format']}/{result['engine']}/{result['document']}: {speed:+.1f}% pages/s"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--formats", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("--engines", nargs="+", help="Restreint aux moteurs nommés")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="Enregistre les résultats en référence JSON")
+    parser.add_argument("--compare", type=Path, help="Compare à une référence JSON")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="Code de sortie 1 si le débit baisse de plus de N %% par rapport à la référence",
+    )
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'format':>6} {'moteur':>22} {'document':>34} {'pages':>5} {'temps (s)':>10} "
+        f"{'pages/s':>9} {'car./s':>10} {'pic RSS (Mo)':>13}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for document in build_corpus(Path(tmp), args.pages):
+            for file_format in args.formats:
+                for engine in ENGINES[file_format]:
+                    if args.engines and engine not in args.engines:
+                        continue
+                    result = benchmark_document(document, file_format, engine, args.repeat)
+                    results.append(result)
+                    print(
+                        f"{file_format:>6} {engine:>22} {document.name:>34} {document.pages:>5} "
+                        f"{result['seconds']:>10.3f} {result['pages_per_sec']:>9.1f} "
+                        f"{result['chars_per_sec']:>10} {result['peak_rss_mb']:>13.1f}"
+                    )
+
+    if args.save:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "version": BASELINE_FORMAT_VERSION,
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": multiprocessing.cpu_count(),
+                    "pdf_extraction_workers": settings.PDF_EXTRACTION_WORKERS,
+                    "results": results,
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        print(f"\nRéférence enregistrée: {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("\nRégressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Tests for the staged analysis pipeline (extraction, LLM and persistence tasks)."""
+
+import asyncio
+import json
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.celery_app import CPU_QUEUE, IO_QUEUE, celery_app
+from app.config import settings
+from app.core.security import get_password_hash
+from app.models import Analysis, AnalysisStatus, Contract, User
+from app.tasks.analysis import (
+    analysis_pipeline,
+    extract_contract_text,
+    persist_analysis,
+    run_llm_analysis,
+)
+from app.tasks.runtime import WorkerRuntime, close_runtime, get_runtime
+from benchmarks.corpus import write_pdf
+
+
+@pytest.fixture
+def runtime(
+    db_session: AsyncSession, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Generator[WorkerRuntime, None, None]:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "EXTRACTION_SANDBOX_ENABLED", False)
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_DIR", str(tmp_path / "cache"))
+    previous_loop = asyncio.get_event_loop()
+    close_runtime()
+    yield get_runtime()
+    close_runtime()
+    asyncio.set_event_loop(previous_loop)
+
+
+def _create_contracts(
+    runtime: WorkerRuntime, tmp_path: Path, count: int, content_hash: str | None = None
+) -> list[str]:
+    path = tmp_path / "contrat.pdf"
+    write_pdf(path, [["Article 1 - Objet du contrat"], ["Article 2 - Pénalités de retard"]])
+
+    async def _create() -> list[str]:
+        async with runtime.session_factory() as db:
+            user = User(email="pipeline@example.com", password_hash=get_password_hash("x"))
+            db.add(user)
+            await db.commit()
+            contracts = [
+                Contract(
+                    user_id=user.id,
+                    filename=path.name,
+                    file_path=str(path),
+                    file_size=path.stat().st_size,
+                    file_type="application/pdf",
+                    content_hash=content_hash,
+                )
+                for _ in range(count)
+            ]
+            db.add_all(contracts)
+            await db.commit()
+            return [str(contract.id) for contract in contracts]
+
+    return runtime.run(_create())
+
+
+def _analyses(runtime: WorkerRuntime) -> list[Analysis]:
+    async def _load() -> list[Analysis]:
+        async with runtime.session_factory() as db:
+            result = await db.execute(select(Analysis))
+            return list(result.scalars().all())
+
+    return runtime.run(_load())
+
+
+def test_stages_pass_the_text_by_reference(runtime: WorkerRuntime, tmp_path: Path) -> None:
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+
+    extracted = extract_contract_text(contract_id)
+
+    # Le message vers l'étape LLM ne porte que la clé du texte
+    stage_file = settings.upload_path / extracted["text_key"]
+    assert "Pénalités de retard" in stage_file.read_text(encoding="utf-8")
+    assert "Pénalités" not in json.dumps(extracted)
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.PROCESSING]
+
+    analyzed = run_llm_analysis(extracted)
+    final = persist_analysis(analyzed)
+
+    assert final["status"] == "completed"
+    (analysis,) = _analyses(runtime)
+    assert analysis.status == AnalysisStatus.COMPLETED
+    assert analysis.results["_extraction"]["page_count"] == 2
+    assert not stage_file.exists()
+
+
+def test_duplicate_pipeline_reuses_the_first_analysis(
+    runtime: WorkerRuntime, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    first, duplicate = _create_contracts(runtime, tmp_path, 2, content_hash="ab" * 32)
+
+    result = analysis_pipeline(first, duplicate).apply().get()
+
+    assert result["status"] == "completed" and result["reused"] is True
+    analyses = {str(analysis.contract_id): analysis for analysis in _analyses(runtime)}
+    assert analyses[duplicate].results == analyses[first].results
+    assert analyses[duplicate].status == AnalysisStatus.COMPLETED
+
+
+def test_missing_contract_stops_the_pipeline(runtime: WorkerRuntime) -> None:
+    stage = extract_contract_text("00000000-0000-0000-0000-000000000001")
+
+    assert stage["status"] == "failed"
+    assert persist_analysis(run_llm_analysis(stage)) == stage
+
+
+def test_stages_are_routed_to_cpu_and_io_queues() -> None:
+    router = celery_app.amqp.router
+
+    def queue(task_name: str) -> str:
+        return router.route({}, f"app.tasks.analysis.{task_name}")["queue"].name
+
+    assert queue("extract_contract_text") == CPU_QUEUE
+    assert queue("run_llm_analysis") == IO_QUEUE
+    assert queue("persist_analysis") == IO_QUEUE
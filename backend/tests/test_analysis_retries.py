@@ -0,0 +1,157 @@
+"""Tests for LLM error classification and analysis retry backoff."""
+
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from celery.exceptions import Retry
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import AnalysisStatus, Contract, ContractStatus
+from app.services.claude_service import LLMServiceError, _request_analysis
+from app.tasks.analysis import (
+    extract_contract_text,
+    is_retryable,
+    retry_countdown,
+    run_llm_analysis,
+)
+from app.tasks.runtime import WorkerRuntime
+from tests.test_analysis_pipeline import _analyses, _create_contracts, runtime  # noqa: F401
+
+
+async def _classify(response: httpx.Response | Exception) -> LLMServiceError:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(LLMServiceError) as error:
+            await _request_analysis(client, {}, {})
+    return error.value
+
+
+@pytest.mark.asyncio
+async def test_llm_errors_are_classified() -> None:
+    overloaded = await _classify(httpx.Response(529, headers={"retry-after": "7"}))
+    assert overloaded.retryable and overloaded.status_code == 529
+    assert overloaded.retry_after == 7.0
+
+    rate_limited = await _classify(
+        httpx.Response(429, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    )
+    assert rate_limited.retryable and rate_limited.retry_after == 0.0
+
+    assert (await _classify(httpx.ConnectError("refused"))).retryable
+    assert (await _classify(httpx.ReadTimeout("timeout"))).retryable
+
+    rejected = await _classify(httpx.Response(400, json={"error": "prompt too long"}))
+    assert not rejected.retryable and rejected.retry_after is None
+    not_json = await _classify(httpx.Response(200, json={"content": [{"text": "{pas du json"}]}))
+    assert not not_json.retryable
+
+
+def test_only_transient_errors_are_retried() -> None:
+    assert is_retryable(LLMServiceError("surcharge", retryable=True))
+    assert not is_retryable(LLMServiceError("JSON invalide"))
+    assert not is_retryable(ValueError("Type de fichier non supporté: .odt"))
+    assert is_retryable(ConnectionError("Connection refused"))
+
+    try:
+        raise ValueError("Fichier illisible") from OSError("Stockage S3 injoignable")
+    except ValueError as unreachable:
+        assert is_retryable(unreachable)
+
+
+def test_backoff_uses_full_jitter_and_honors_retry_after(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "ANALYSIS_RETRY_BASE_DELAY_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "ANALYSIS_RETRY_MAX_DELAY_SECONDS", 60.0)
+    error = LLMServiceError("surcharge", retryable=True)
+
+    first = [retry_countdown(error, 0) for _ in range(200)]
+    assert all(0 <= delay <= 10 for delay in first)
+    # Délais dispersés: les workers ne reviennent pas ensemble
+    assert max(first) - min(first) > 5
+    assert all(0 <= retry_countdown(error, 10) <= 60 for _ in range(200))
+
+    error.retry_after = 30.0
+    assert all(30 <= retry_countdown(error, 0) <= 40 for _ in range(200))
+
+
+def test_permanent_llm_error_fails_without_retry(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    status_code = 400
+    runtime.http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(status_code, headers={"retry-after": "3"})
+        )
+    )
+    retries: list[dict[str, Any]] = []
+
+    def _retry(**kwargs: Any) -> Retry:
+        retries.append(kwargs)
+        return Retry()
+
+    monkeypatch.setattr(run_llm_analysis, "retry", _retry)
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+    extracted = extract_contract_text(contract_id)
+
+    # Surcharge: nouvel essai après le délai demandé par l'API
+    status_code = 529
+    with pytest.raises(Retry):
+        run_llm_analysis(extracted)
+    assert len(retries) == 1 and retries[0]["countdown"] >= 3
+
+    # Requête refusée: échec immédiat, sans nouvel essai
+    status_code = 400
+    result = run_llm_analysis(extracted)
+
+    assert result["status"] == "failed" and "400" in result["error"]
+    assert len(retries) == 1
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.FAILED]
+
+
+def test_contract_stays_processing_until_retries_are_exhausted(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    runtime.http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(429))
+    )
+    monkeypatch.setattr(run_llm_analysis, "retry", lambda **kwargs: Retry())
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+    extracted = extract_contract_text(contract_id)
+
+    # Erreur passagère: le contrat reste en cours pendant l'attente du nouvel essai
+    with pytest.raises(Retry):
+        run_llm_analysis(extracted)
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.PROCESSING]
+    assert _contract_statuses(runtime) == [ContractStatus.PROCESSING]
+
+    # Dernier essai: échec enregistré
+    monkeypatch.setattr(run_llm_analysis, "max_retries", 0)
+    with pytest.raises(Retry):
+        run_llm_analysis(extracted)
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.FAILED]
+    assert _contract_statuses(runtime) == [ContractStatus.FAILED]
+
+
+def _contract_statuses(runtime: WorkerRuntime) -> list[ContractStatus]:  # noqa: F811
+    async def _load() -> list[ContractStatus]:
+        async with runtime.session_factory() as db:
+            result = await db.execute(select(Contract.status))
+            return list(result.scalars().all())
+
+    return runtime.run(_load())
@@ -0,0 +1,257 @@
+"""Tests for the fair analysis scheduler, against an in-memory Redis double."""
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.security import get_password_hash
+from app.models import Analysis, Contract, User
+from app.services import analysis_scheduler
+from app.services.analysis_scheduler import (
+    dispatch_ready,
+    finish_analysis,
+    keep_slot,
+    queue_position,
+    schedule_analyses,
+)
+
+
+class FakeRedis:
+    """Sous-ensemble des commandes Redis utilisées par la file (chaînes décodées)."""
+
+    def __init__(self) -> None:
+        self.strings: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    def _sorted(self, key: str) -> list[tuple[str, float]]:
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+
+    async def get(self, key: str) -> str | None:
+        return self.strings.get(key)
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        return [self.strings.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.strings[key] = str(value)
+
+    async def hset(self, key: str, mapping: dict[str, str]) -> None:
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hget(self, key: str, field: str) -> str | None:
+        return self.hashes.get(key, {}).get(field)
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def zadd(self, key: str, mapping: dict[str, float], xx: bool = False) -> None:
+        zset = self.zsets.setdefault(key, {})
+        zset.update(
+            {member: score for member, score in mapping.items() if member in zset or not xx}
+        )
+
+    async def zrem(self, key: str, *members: str) -> None:
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    async def zcard(self, key: str) -> int:
+        return len(self.zsets.get(key, {}))
+
+    async def zrank(self, key: str, member: str) -> int | None:
+        members = [name for name, _ in self._sorted(key)]
+        return members.index(member) if member in members else None
+
+    async def zpopmin(self, key: str) -> list[tuple[str, float]]:
+        items = self._sorted(key)
+        if not items:
+            return []
+        del self.zsets[key][items[0][0]]
+        return [items[0]]
+
+    async def zremrangebyscore(self, key: str, low: str, high: float) -> None:
+        for member, score in self._sorted(key):
+            if score <= high:
+                del self.zsets[key][member]
+
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def dispatched(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Analyses envoyées à Celery, dans l'ordre."""
+    sent: list[list[str]] = []
+    monkeypatch.setattr(analysis_scheduler, "_dispatch_now", sent.extend)
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_RUNNING", 1)
+    return sent
+
+
+async def _drain(redis: FakeRedis, dispatched: list[list[str]]) -> list[str]:
+    """Termine les analyses une à une (une seule place) et retourne l'ordre d'envoi."""
+    finished = 0
+    while finished < len(dispatched):
+        await finish_analysis(dispatched[finished][-1], redis)
+        finished += 1
+    return [contract_ids[0] for contract_ids in dispatched]
+
+
+@pytest.mark.asyncio
+async def test_small_user_is_not_stuck_behind_a_bulk_upload(
+    redis: FakeRedis, dispatched: list[list[str]]
+) -> None:
+    await schedule_analyses([[f"bulk-{n}"] for n in range(6)], "bulk-user", redis=redis)
+    await schedule_analyses([["urgent-0"], ["urgent-1"]], "small-user", redis=redis)
+
+    order = await _drain(redis, dispatched)
+
+    assert len(order) == 8
+    # Les deux utilisateurs alternent au lieu de servir d'abord les six contrats du lot
+    assert {"urgent-0", "urgent-1"} <= set(order[:5])
+
+
+@pytest.mark.asyncio
+async def test_weights_and_priority_lane(
+    redis: FakeRedis, dispatched: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "SCHEDULER_USER_WEIGHTS", "heavy:2")
+    await schedule_analyses([["running"]], "other", redis=redis)
+    await schedule_analyses([[f"heavy-{n}"] for n in range(4)], "heavy", redis=redis)
+    await schedule_analyses([[f"light-{n}"] for n in range(2)], "light", redis=redis)
+    await schedule_analyses([["interactive"]], "light", priority=True, redis=redis)
+
+    assert await queue_position("interactive", redis) == 1
+    assert await queue_position("heavy-0", redis) == 2
+    assert await queue_position("running", redis) is None
+
+    order = await _drain(redis, dispatched)
+
+    assert order[:2] == ["running", "interactive"]
+    # Poids 2: deux analyses de "heavy" pour une de "light"
+    assert order[2:] == ["heavy-0", "heavy-1", "light-0", "heavy-2", "heavy-3", "light-1"]
+
+
+@pytest.mark.asyncio
+async def test_duplicates_hold_one_slot_until_the_last_one_finishes(
+    redis: FakeRedis, dispatched: list[list[str]]
+) -> None:
+    await schedule_analyses([["original", "copy"], ["next"]], "user", redis=redis)
+    assert dispatched == [["original", "copy"]]
+
+    await finish_analysis("original", redis)
+    assert dispatched == [["original", "copy"]]
+
+    await finish_analysis("copy", redis)
+    assert dispatched == [["original", "copy"], ["next"]]
+
+
+@pytest.mark.asyncio
+async def test_lost_analyses_release_their_slot(
+    redis: FakeRedis, dispatched: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await schedule_analyses([["lost"], ["waiting"]], "user", redis=redis)
+    assert await dispatch_ready(redis) == 0
+
+    monkeypatch.setattr(settings, "SCHEDULER_SLOT_TIMEOUT_SECONDS", -1)
+    assert await dispatch_ready(redis) == 1
+    assert dispatched == [["lost"], ["waiting"]]
+
+
+@pytest.mark.asyncio
+async def test_retried_analyses_keep_their_slot(
+    redis: FakeRedis, dispatched: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await schedule_analyses([["retried"], ["waiting"]], "user", redis=redis)
+    redis.zsets[analysis_scheduler.RUNNING_KEY]["retried"] = 0.0
+
+    await keep_slot("retried", redis)
+    await keep_slot("waiting", redis)
+
+    assert await dispatch_ready(redis) == 0
+    assert list(redis.zsets[analysis_scheduler.RUNNING_KEY]) == ["retried"]
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_puts_the_analysis_back_in_the_queue(
+    redis: FakeRedis, dispatched: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def broker_down(jobs: list[list[str]]) -> None:
+        raise OSError("Broker injoignable")
+
+    monkeypatch.setattr(analysis_scheduler, "_dispatch_now", broker_down)
+    await schedule_analyses([["a"]], "user", redis=redis)
+    await schedule_analyses([["b"]], "user", priority=True, redis=redis)
+
+    assert await queue_position("a", redis) == 2
+    assert await queue_position("b", redis) == 1
+    assert redis.zsets[analysis_scheduler.RUNNING_KEY] == {}
+
+    monkeypatch.setattr(analysis_scheduler, "_dispatch_now", dispatched.extend)
+    assert await dispatch_ready(redis) == 1
+    assert dispatched == [["b"]]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_direct_dispatch_without_redis(
+    redis: FakeRedis, dispatched: list[list[str]]
+) -> None:
+    async def unavailable(*args: Any, **kwargs: Any) -> None:
+        raise RedisConnectionError("Connection refused")
+
+    redis.zadd = unavailable  # type: ignore[method-assign]
+
+    await schedule_analyses([["a"], ["b"]], "user", redis=redis)
+
+    assert dispatched == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_status_reports_queue_position(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    redis: FakeRedis,
+    dispatched: list[list[str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def _redis_client() -> FakeRedis:
+        return redis
+
+    monkeypatch.setattr(analysis_scheduler, "get_redis_client", _redis_client)
+    user = User(email="queue@example.com", password_hash=get_password_hash("TestPassword123!"))
+    db_session.add(user)
+    await db_session.commit()
+    contracts = [
+        Contract(
+            user_id=user.id,
+            filename=f"contrat-{n}.pdf",
+            file_path=f"blobs/{n}.pdf",
+            file_size=100,
+            file_type="application/pdf",
+        )
+        for n in range(3)
+    ]
+    db_session.add_all(contracts)
+    await db_session.commit()
+    db_session.add_all([Analysis(contract_id=contract.id) for contract in contracts])
+    await db_session.commit()
+    await schedule_analyses([[str(contract.id)] for contract in contracts], str(user.id))
+
+    login = await async_client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": "TestPassword123!"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    positions = [
+        (await async_client.get(f"/api/v1/contracts/{contract.id}/status", headers=headers)).json()[
+            "queue_position"
+        ]
+        for contract in contracts
+    ]
+
+    assert positions == [None, 1, 2]
@@ -0,0 +1,171 @@
+"""Tests for the v2 analysis endpoints."""
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api import analysis_v2
+from app.config import settings
+from app.core.locks import analysis_lease
+from app.core.security import get_password_hash
+from app.models import Contract, ContractStatus, User
+from app.services import text_extractor
+from tests.test_locks import FakeRedis
+from tests.test_text_extractor import build_pdf
+
+
+async def _create_contract(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    file_path: Path,
+) -> tuple[Contract, dict[str, str]]:
+    user = User(email="v2@example.com", password_hash=get_password_hash("TestPassword123!"))
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    contract = Contract(
+        user_id=user.id,
+        filename=file_path.name,
+        file_path=str(file_path),
+        file_size=file_path.stat().st_size if file_path.exists() else 0,
+        file_type="application/pdf",
+        status=ContractStatus.PENDING,
+    )
+    db_session.add(contract)
+    await db_session.commit()
+    await db_session.refresh(contract)
+
+    login_response = await async_client.post(
+        "/api/v1/auth/login",
+        json={"email": user.email, "password": "TestPassword123!"},
+    )
+    token = login_response.json()["access_token"]
+    return contract, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(autouse=True)
+def extraction_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.mark.asyncio
+async def test_analyze_v2_extracts_real_contract_text(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pdf_path = tmp_path / "contrat.pdf"
+    pdf_path.write_bytes(build_pdf(["Article 1 - Objet du contrat"]))
+    contract, headers = await _create_contract(async_client, db_session, pdf_path)
+
+    received: dict[str, Any] = {}
+
+    async def _fake_analyze(contract_text: str, **kwargs: Any) -> dict[str, Any]:
+        received["text"] = contract_text
+        received["clause_index"] = kwargs["clause_index"]
+        return {"disclaimer": "ok", "score_confiance_global": 80}
+
+    monkeypatch.setattr(analysis_v2, "analyze_contract_enhanced", _fake_analyze)
+
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract.id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 200
+    assert "Objet du contrat" in received["text"]
+    assert received["clause_index"].segments[0].number == "1"
+    await db_session.refresh(contract)
+    assert contract.clause_index == received["clause_index"].as_dict()
+
+
+@pytest.mark.asyncio
+async def test_analyze_v2_missing_file_returns_400(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+) -> None:
+    contract, headers = await _create_contract(async_client, db_session, tmp_path / "absent.pdf")
+
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract.id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_analyze_v2_saturated_pool_returns_503(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pdf_path = tmp_path / "contrat.pdf"
+    pdf_path.write_bytes(build_pdf(["Article 1"]))
+    contract, headers = await _create_contract(async_client, db_session, pdf_path)
+
+    saturated = threading.BoundedSemaphore(1)
+    saturated.acquire()
+    monkeypatch.setattr(text_extractor, "_extraction_slots", saturated)
+
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract.id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.EXTRACTION_RETRY_AFTER_SECONDS)
+
+
+@pytest.mark.asyncio
+async def test_analyze_v2_too_many_pages_returns_422(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pdf_path = tmp_path / "contrat.pdf"
+    pdf_path.write_bytes(build_pdf(["Article 1", "Article 2", "Article 3"]))
+    contract, headers = await _create_contract(async_client, db_session, pdf_path)
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_PAGES", 2)
+
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract.id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["code"] == "document_too_complex"
+    assert response.json()["detail"]["reason"] == "pages"
+
+
+@pytest.mark.asyncio
+async def test_analyze_v2_contract_already_being_analyzed_returns_409(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pdf_path = tmp_path / "contrat.pdf"
+    pdf_path.write_bytes(build_pdf(["Article 1 - Objet du contrat"]))
+    contract, headers = await _create_contract(async_client, db_session, pdf_path)
+    redis = FakeRedis()
+
+    async def _redis_client() -> FakeRedis:
+        return redis
+
+    monkeypatch.setattr(analysis_v2, "get_redis_client", _redis_client)
+    # Analyse du même contrat en cours dans un worker
+    assert await analysis_lease(redis, str(contract.id)).acquire()  # type: ignore[arg-type]
+
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract.id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 409
+    await db_session.refresh(contract)
+    assert contract.status == ContractStatus.PENDING
@@ -0,0 +1,160 @@
+"""Tests for batch contract upload and batch progress."""
+
+import io
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+from celery import canvas
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api import contracts as contracts_api
+from app.config import settings
+from app.models import Analysis, AnalysisStatus, Contract
+
+PDF = "application/pdf"
+
+
+@pytest.fixture(autouse=True)
+def _upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+
+@pytest.fixture
+def dispatched(monkeypatch: pytest.MonkeyPatch) -> list[list[list[UUID]]]:
+    """Capture les lots mis en file d'analyses (pas de broker dans les tests)."""
+    calls: list[list[list[UUID]]] = []
+
+    async def _record(contract_groups: list[list[UUID]], *args: object, **kwargs: object) -> None:
+        calls.append(contract_groups)
+
+    monkeypatch.setattr(contracts_api, "_dispatch_analyses", _record)
+    return calls
+
+
+async def _auth_headers(client: AsyncClient, email: str) -> dict[str, str]:
+    user = {"email": email, "password": "TestPassword123!", "is_professional": True}
+    await client.post("/api/v1/auth/register", json=user)
+    login = await client.post("/api/v1/auth/login", json=user)
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def _files(*contents: bytes) -> list[tuple[str, tuple[str, io.BytesIO, str]]]:
+    return [
+        ("files", (f"contrat-{number}.pdf", io.BytesIO(content), PDF))
+        for number, content in enumerate(contents)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_persists_all_and_dispatches_one_group(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    dispatched: list[list[list[UUID]]],
+) -> None:
+    headers = await _auth_headers(async_client, "batch@example.com")
+
+    response = await async_client.post(
+        "/api/v1/contracts/batch",
+        files=_files(b"%PDF CGV", b"%PDF bail", b"%PDF CGV"),
+        headers=headers,
+    )
+
+    assert response.status_code == 201
+    payload = response.json()
+    batch_id = UUID(payload["batch_id"])
+    ids = [UUID(contract["id"]) for contract in payload["contracts"]]
+    assert len(ids) == 3
+    assert {contract["batch_id"] for contract in payload["contracts"]} == {str(batch_id)}
+    # Un seul envoi; les deux copies identiques sont chaînées
+    assert dispatched == [[[ids[0], ids[2]], [ids[1]]]]
+
+    analyses = await db_session.execute(select(Analysis).where(col(Analysis.contract_id).in_(ids)))
+    assert len(analyses.scalars().all()) == 3
+
+    status_response = await async_client.get(
+        f"/api/v1/contracts/batches/{batch_id}", headers=headers
+    )
+    assert status_response.json() == {
+        "batch_id": str(batch_id),
+        "total": 3,
+        "pending": 3,
+        "processing": 0,
+        "completed": 0,
+        "failed": 0,
+        "progress": 0.0,
+        "done": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_status_aggregates_progress_per_user(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    dispatched: list[list[list[UUID]]],
+) -> None:
+    headers = await _auth_headers(async_client, "progress@example.com")
+    response = await async_client.post(
+        "/api/v1/contracts/batch",
+        files=_files(b"%PDF a", b"%PDF b", b"%PDF c", b"%PDF d"),
+        headers=headers,
+    )
+    batch_id = response.json()["batch_id"]
+    ids = [UUID(contract["id"]) for contract in response.json()["contracts"]]
+
+    result = await db_session.execute(select(Analysis).where(col(Analysis.contract_id).in_(ids)))
+    analyses = {analysis.contract_id: analysis for analysis in result.scalars().all()}
+    analyses[ids[0]].status = AnalysisStatus.COMPLETED
+    analyses[ids[1]].status = AnalysisStatus.FAILED
+    analyses[ids[2]].status = AnalysisStatus.PROCESSING
+    await db_session.commit()
+
+    progress = await async_client.get(f"/api/v1/contracts/batches/{batch_id}", headers=headers)
+    assert progress.json()["progress"] == 0.5
+    assert progress.json()["processing"] == 1
+    assert not progress.json()["done"]
+
+    other = await _auth_headers(async_client, "other@example.com")
+    hidden = await async_client.get(f"/api/v1/contracts/batches/{batch_id}", headers=other)
+    assert hidden.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_with_invalid_file_stores_nothing(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    dispatched: list[list[list[UUID]]],
+) -> None:
+    headers = await _auth_headers(async_client, "invalid@example.com")
+    files = _files(b"%PDF a") + [("files", ("notes.txt", io.BytesIO(b"notes"), "text/plain"))]
+
+    response = await async_client.post("/api/v1/contracts/batch", files=files, headers=headers)
+
+    assert response.status_code == 400
+    assert dispatched == []
+    contracts = await db_session.execute(select(Contract))
+    assert contracts.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_dispatch_without_scheduler_sends_a_group_of_chains(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", False)
+    sent: list[canvas.Signature] = []
+    monkeypatch.setattr(canvas.group, "apply_async", lambda self, *a, **kw: sent.append(self))
+    first, duplicate, other = (UUID(int=number) for number in range(1, 4))
+
+    await contracts_api._dispatch_analyses([[first, duplicate], [other]], UUID(int=9))
+
+    assert len(sent) == 1
+    # Le pipeline d'un doublon ne démarre qu'après celui du premier exemplaire
+    starts = [
+        [step.args for step in branch.tasks if step.name.endswith("extract_contract_text")]
+        for branch in sent[0].tasks
+    ]
+    assert starts == [[(str(first),), (str(duplicate),)], [(str(other),)]]
+    assert len(sent[0].tasks[0].tasks) == 6
@@ -0,0 +1,51 @@
+"""Tests for the extraction benchmark corpus and baseline comparison."""
+
+from pathlib import Path
+
+from app.services.text_extractor import extract_pdf_document, extract_text_from_docx
+from benchmarks.corpus import build_corpus, load_contracts
+from benchmarks.extraction import compare
+
+
+def test_corpus_renders_contracts_and_synthetic_variants(tmp_path: Path) -> None:
+    documents = build_corpus(tmp_path, [3])
+
+    assert [document.name for document in documents[:-1]] == sorted(load_contracts())
+    synthetic = documents[-1]
+    assert synthetic.name == "synthetique-3p"
+    assert synthetic.pages == 3
+
+    pdf = extract_pdf_document(synthetic.pdf_path)
+    assert pdf.page_count == 3
+    assert "Page 3 / 3" in pdf.pages[2]
+    assert "Propriété intellectuelle" in pdf.text
+
+    docx_text = extract_text_from_docx(synthetic.docx_path)
+    assert "Propriété intellectuelle" in docx_text
+    assert docx_text.count("Contrat de test - confidentiel") == 3
+
+
+def _row(file_format: str, engine: str, document: str, pages_per_sec: float) -> dict:
+    return {
+        "format": file_format,
+        "engine": engine,
+        "document": document,
+        "pages_per_sec": pages_per_sec,
+        "peak_rss_mb": 1.0,
+    }
+
+
+def test_compare_reports_throughput_regressions() -> None:
+    baseline = {
+        "results": [_row("pdf", "pdfplumber", "a", 10.0), _row("docx", "streaming", "a", 100.0)]
+    }
+    results = [
+        _row("pdf", "pdfplumber", "a", 7.0),
+        _row("docx", "streaming", "a", 95.0),
+        _row("docx", "streaming", "b", 1.0),
+    ]
+
+    regressions = compare(results, baseline, max_regression=20)
+
+    assert regressions == ["pdf/pdfplumber/a: -30.0% pages/s"]
+    assert compare(results, baseline, max_regression=None) == []
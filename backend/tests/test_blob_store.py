@@ -0,0 +1,186 @@
+"""Tests for the content-addressed blob store and analysis reuse."""
+
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.security import get_password_hash
+from app.models import Analysis, AnalysisStatus, Contract, ContractStatus, StoredBlob, User
+from app.services.analysis_reuse import find_reusable_analysis
+from app.services.blob_store import discard_uploads, purge_blob, release_blob, store_upload
+from app.services.claude_service import ANALYSIS_PROMPT_VERSION, MOCK_ANALYSIS_MODEL
+
+PDF = b"%PDF-1.4 CGV type " * 200
+
+
+@pytest.fixture(autouse=True)
+def _upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+
+def _upload(content: bytes = PDF) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="cgv.pdf")
+
+
+async def _create_user(db: AsyncSession, email: str) -> User:
+    user = User(email=email, password_hash=get_password_hash("TestPassword123!"))
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_refcounted_file(
+    db_session: AsyncSession, tmp_path: Path
+) -> None:
+    first = await store_upload(db_session, _upload(), ".pdf")
+    second = await store_upload(db_session, _upload(), ".pdf")
+    await db_session.commit()
+
+    content_hash = first.content_hash
+    assert first.file_path == second.file_path == f"blobs/{content_hash[:2]}/{content_hash}.pdf"
+    stored_path = tmp_path / first.file_path
+    assert stored_path.read_bytes() == PDF
+    assert list((tmp_path / ".incoming").iterdir()) == []
+    blob = await db_session.get(StoredBlob, first.content_hash, populate_existing=True)
+    assert blob is not None and blob.ref_count == 2
+
+    assert await release_blob(db_session, first.content_hash) is None
+    orphan = await release_blob(db_session, first.content_hash)
+    await db_session.commit()
+
+    assert orphan == first.file_path
+    assert await purge_blob(db_session, orphan, first.content_hash)
+    assert not stored_path.exists()
+    assert await db_session.get(StoredBlob, first.content_hash) is None
+
+
+@pytest.mark.asyncio
+async def test_purge_keeps_a_file_referenced_again(
+    db_session: AsyncSession, tmp_path: Path
+) -> None:
+    content_hash = (await store_upload(db_session, _upload(), ".pdf")).content_hash
+    await db_session.commit()
+    orphan = await release_blob(db_session, content_hash)
+    await db_session.commit()
+    assert orphan is not None
+
+    # Même contenu uploadé entre la validation et la suppression du fichier
+    await store_upload(db_session, _upload(), ".pdf")
+    await db_session.commit()
+
+    assert not await purge_blob(db_session, orphan, content_hash)
+    assert (tmp_path / orphan).read_bytes() == PDF
+    blob = await db_session.get(StoredBlob, content_hash, populate_existing=True)
+    assert blob is not None and blob.ref_count == 1
+
+
+@pytest.mark.asyncio
+async def test_discarded_upload_removes_its_file(db_session: AsyncSession, tmp_path: Path) -> None:
+    stored = await store_upload(db_session, _upload(), ".pdf")
+    key, content_hash = stored.file_path, stored.content_hash
+    assert (tmp_path / key).exists()
+
+    # Enregistrement du contrat en échec: la transaction est annulée
+    await discard_uploads(db_session)
+
+    assert not (tmp_path / key).exists()
+    assert await db_session.get(StoredBlob, content_hash) is None
+
+
+@pytest.mark.asyncio
+async def test_reusable_analysis_requires_same_model_and_prompt_version(
+    db_session: AsyncSession,
+) -> None:
+    user = await _create_user(db_session, "reuse@example.com")
+    contract = Contract(
+        user_id=user.id,
+        filename="cgv.pdf",
+        file_path=f"blobs/ab/{'ab' * 32}.pdf",
+        file_size=len(PDF),
+        file_type="application/pdf",
+        content_hash="ab" * 32,
+        status=ContractStatus.COMPLETED,
+    )
+    db_session.add(contract)
+    await db_session.commit()
+    analysis = Analysis(
+        contract_id=contract.id,
+        status=AnalysisStatus.COMPLETED,
+        results={"summary": "CGV"},
+        model=MOCK_ANALYSIS_MODEL,
+        prompt_version=ANALYSIS_PROMPT_VERSION,
+    )
+    db_session.add(analysis)
+    await db_session.commit()
+
+    found = await find_reusable_analysis(db_session, "ab" * 32)
+    assert found is not None and found.id == analysis.id
+    assert await find_reusable_analysis(db_session, "cd" * 32) is None
+    excluded = await find_reusable_analysis(db_session, "ab" * 32, exclude_contract_id=contract.id)
+    assert excluded is None
+
+    analysis.prompt_version = "0"
+    await db_session.commit()
+    assert await find_reusable_analysis(db_session, "ab" * 32) is None
+
+
+@pytest.mark.asyncio
+async def test_upload_of_analyzed_content_reuses_analysis(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    owner = await _create_user(db_session, "owner@example.com")
+    stored = await store_upload(db_session, _upload(), ".pdf")
+    contract = Contract(
+        user_id=owner.id,
+        filename="cgv.pdf",
+        file_path=stored.file_path,
+        file_size=stored.size,
+        file_type="application/pdf",
+        content_hash=stored.content_hash,
+        status=ContractStatus.COMPLETED,
+    )
+    db_session.add(contract)
+    await db_session.commit()
+    db_session.add(
+        Analysis(
+            contract_id=contract.id,
+            status=AnalysisStatus.COMPLETED,
+            results={"summary": "CGV déjà analysées"},
+            score_equity=70,
+            score_clarity=80,
+            model=MOCK_ANALYSIS_MODEL,
+            prompt_version=ANALYSIS_PROMPT_VERSION,
+        )
+    )
+    await db_session.commit()
+
+    user = await _create_user(db_session, "second@example.com")
+    login = await async_client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": "TestPassword123!"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    # Aucune tâche Celery n'est lancée (pas de broker dans les tests)
+    response = await async_client.post(
+        "/api/v1/contracts/upload",
+        files={"file": ("copie.pdf", io.BytesIO(PDF), "application/pdf")},
+        headers=headers,
+    )
+
+    assert response.status_code == 201
+    assert response.json()["status"] == ContractStatus.COMPLETED.value
+    analysis = await async_client.get(
+        f"/api/v1/contracts/{response.json()['id']}/analysis", headers=headers
+    )
+    assert analysis.json()["results"] == {"summary": "CGV déjà analysées"}
+    assert analysis.json()["score_equity"] == 70
+    blob = await db_session.get(StoredBlob, stored.content_hash, populate_existing=True)
+    assert blob is not None and blob.ref_count == 2
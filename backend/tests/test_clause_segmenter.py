@@ -0,0 +1,116 @@
+"""Tests for the clause segmentation service."""
+
+from pathlib import Path
+
+import pytest
+
+from app.core.legal_search import detect_clause_type
+from app.prompts.legal_analysis import format_legal_analysis_prompt
+from app.services.clause_segmenter import ClauseIndex, load_or_segment, segment_clauses
+from app.services.text_normalizer import normalize_text
+from app.tasks.analysis import _generate_mock_analysis
+
+CONTRACTS_DIR = Path(__file__).resolve().parents[2] / "test-contracts"
+
+CGV = """CONDITIONS GÉNÉRALES DE VENTE
+Société E-COMMERCE SARL
+
+Article 1 - Champ d'application
+Les présentes CGV s'appliquent à toutes les ventes.
+
+Article 5 - Garanties
+Article 5.1 - Garantie légale de conformité
+La garantie est due conformément au Code de la consommation.
+Article 1641 du Code civil applicable aux vices cachés.
+
+ARTICLE 6 : Paiement
+En cas de retard de paiement, des pénalités seront appliquées."""
+
+
+def test_segments_cover_text_with_headings_and_offsets() -> None:
+    index = segment_clauses(CGV)
+
+    assert [segment.number for segment in index.segments] == [None, "1", "5", "5.1", "6"]
+    assert index.segments[0].heading == "Préambule"
+    assert index.segments[0].start == 0
+    assert index.segments[-1].end == len(CGV)
+    for segment, following in zip(index.segments, index.segments[1:]):
+        assert segment.end == following.start
+    sub_article = index.segments[3]
+    assert sub_article.level == 2
+    assert sub_article.parent == "5"
+    assert CGV[sub_article.start :].startswith("Article 5.1 - Garantie légale")
+    assert "Article 1641" in CGV[sub_article.start : sub_article.end]
+
+
+def test_segments_carry_their_clause_types() -> None:
+    index = segment_clauses(CGV)
+
+    assert [segment.number for segment in index.segments_of_type("clause_pénalité")] == ["6"]
+    assert index.segments_of_type("garantie")[0].number == "5"
+    assert index.segment_at(CGV.index("pénalités")).heading == "ARTICLE 6 : Paiement"
+
+
+def test_alternative_heading_styles() -> None:
+    index = segment_clauses("Art. IV. Durée\nUn an.\nArticle premier\nObjet.")
+    assert [segment.number for segment in index.segments] == ["IV", "1"]
+
+    numbered = segment_clauses("1. OBJET\nLe texte.\n2.1 Durée du contrat\nUn an.")
+    assert [segment.number for segment in numbered.segments] == ["1", "2.1"]
+
+    flat = segment_clauses("Un texte sans article.")
+    assert len(flat.segments) == 1
+    assert flat.segments[0].number is None
+
+
+@pytest.mark.parametrize(
+    "filename",
+    sorted(path.name for path in CONTRACTS_DIR.glob("*.txt")),
+)
+def test_index_clause_types_match_full_text_detection(filename: str) -> None:
+    text = normalize_text((CONTRACTS_DIR / filename).read_text(encoding="utf-8")).text
+
+    index = segment_clauses(text)
+
+    assert len(index.segments) > 5
+    assert detect_clause_type(text, index) == detect_clause_type(text)
+
+
+def test_persisted_index_is_reused_only_for_same_text() -> None:
+    stored = segment_clauses(CGV).as_dict()
+
+    reloaded = ClauseIndex.from_dict(stored, CGV)
+    assert reloaded is not None
+    assert reloaded.segments == segment_clauses(CGV).segments
+
+    assert ClauseIndex.from_dict(stored, CGV + "\nArticle 7 - Durée") is None
+    assert ClauseIndex.from_dict({**stored, "version": 0}, CGV) is None
+    assert load_or_segment(stored, CGV + "\nArticle 7 - Durée").segments[-1].number == "7"
+
+
+def test_prompt_truncation_stops_at_clause_boundary() -> None:
+    index = segment_clauses(CGV)
+    limit = CGV.index("retard")
+
+    prompt = format_legal_analysis_prompt(CGV, max_contract_length=limit, clause_index=index)
+
+    assert "Article 1641 du Code civil" in prompt
+    assert "ARTICLE 6" not in prompt
+    assert f"{len(CGV) - index.segments[-1].start} caractères omis" in prompt
+
+
+def test_locate_links_excerpt_to_article() -> None:
+    index = segment_clauses(CGV)
+
+    segment = index.locate(CGV, "La garantie est due   conformément\nau Code")
+
+    assert segment is not None and segment.number == "5.1"
+    assert index.locate(CGV, "texte absent du contrat") is None
+
+
+def test_mock_analysis_uses_clause_headings() -> None:
+    results = _generate_mock_analysis(CGV, segment_clauses(CGV))
+
+    clauses = {risk["clause"] for risk in results["risks"]}
+    assert "ARTICLE 6 : Paiement" in clauses
+    assert results["key_clauses"][0]["name"] == "Article 1 - Champ d'application"
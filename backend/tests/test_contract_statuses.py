@@ -0,0 +1,123 @@
+"""Tests for the bulk contract status endpoint."""
+
+from collections.abc import Iterator
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models import Analysis, AnalysisStatus, Contract, User
+from tests.conftest import engine
+
+
+@pytest.fixture
+def statements() -> Iterator[list[str]]:
+    """Capture les requêtes SQL exécutées."""
+    executed: list[str] = []
+
+    def _record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+
+async def _auth_headers(client: AsyncClient, email: str) -> tuple[UUID, dict[str, str]]:
+    user = {"email": email, "password": "TestPassword123!", "is_professional": True}
+    registered = await client.post("/api/v1/auth/register", json=user)
+    login = await client.post("/api/v1/auth/login", json=user)
+    return UUID(registered.json()["id"]), {
+        "Authorization": f"Bearer {login.json()['access_token']}"
+    }
+
+
+async def _create_analysis(
+    db_session: AsyncSession, user_id: UUID, analysis_status: AnalysisStatus
+) -> UUID:
+    contract = Contract(
+        user_id=user_id,
+        filename="contrat.pdf",
+        file_path="blobs/contrat.pdf",
+        file_size=100,
+        file_type="application/pdf",
+    )
+    db_session.add(contract)
+    await db_session.commit()
+    db_session.add(
+        Analysis(
+            contract_id=contract.id,
+            status=analysis_status,
+            score_equity=80 if analysis_status == AnalysisStatus.COMPLETED else None,
+            results={"summary": "volumineux"},
+        )
+    )
+    await db_session.commit()
+    return contract.id
+
+
+@pytest.mark.asyncio
+async def test_statuses_of_listed_contracts_in_one_query(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    statements: list[str],
+) -> None:
+    user_id, headers = await _auth_headers(async_client, "statuses@example.com")
+    other_id, _ = await _auth_headers(async_client, "other-statuses@example.com")
+    pending = await _create_analysis(db_session, user_id, AnalysisStatus.PENDING)
+    completed = await _create_analysis(db_session, user_id, AnalysisStatus.COMPLETED)
+    foreign = await _create_analysis(db_session, other_id, AnalysisStatus.PENDING)
+    statements.clear()
+
+    response = await async_client.post(
+        "/api/v1/contracts/statuses",
+        json={"contract_ids": [str(pending), str(completed), str(foreign), str(uuid4())]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    statuses = {item["contract_id"]: item for item in response.json()}
+    # Contrats d'un autre utilisateur ou inconnus: omis
+    assert set(statuses) == {str(pending), str(completed)}
+    assert statuses[str(pending)]["status"] == "pending"
+    assert statuses[str(completed)]["score_equity"] == 80
+
+    queries = [sql for sql in statements if "analyses" in sql]
+    assert len(queries) == 1
+    assert "results" not in queries[0]
+
+
+@pytest.mark.asyncio
+async def test_statuses_default_to_unfinished_analyses(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    user_id, headers = await _auth_headers(async_client, "pending-statuses@example.com")
+    pending = await _create_analysis(db_session, user_id, AnalysisStatus.PENDING)
+    processing = await _create_analysis(db_session, user_id, AnalysisStatus.PROCESSING)
+    await _create_analysis(db_session, user_id, AnalysisStatus.COMPLETED)
+
+    response = await async_client.post("/api/v1/contracts/statuses", json={}, headers=headers)
+
+    assert [item["contract_id"] for item in response.json()] == [str(pending), str(processing)]
+
+
+@pytest.mark.asyncio
+async def test_statuses_reject_too_many_contracts(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "MAX_STATUS_CONTRACTS", 2)
+    _, headers = await _auth_headers(async_client, "many-statuses@example.com")
+
+    response = await async_client.post(
+        "/api/v1/contracts/statuses",
+        json={"contract_ids": [str(uuid4()) for _ in range(3)]},
+        headers=headers,
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+"""Tests for streamed upload storage."""
+
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.file_storage import FileTooLargeError, save_upload
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_to_destination_with_hash(tmp_path: Path) -> None:
+    content = b"%PDF-1.4 contrat " * 5000
+    upload = UploadFile(file=io.BytesIO(content), filename="contrat.pdf")
+
+    stored = await save_upload(upload, tmp_path / "contrat.pdf", chunk_size=4096)
+
+    assert stored.path.read_bytes() == content
+    assert stored.size == len(content)
+    assert stored.content_hash == hashlib.sha256(content).hexdigest()
+    assert [path.name for path in tmp_path.iterdir()] == ["contrat.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_oversized_file_without_reading_it_all(
+    tmp_path: Path,
+) -> None:
+    body = io.BytesIO(b"x" * 100_000)
+    upload = UploadFile(file=body, filename="contrat.pdf")
+
+    with pytest.raises(FileTooLargeError):
+        await save_upload(upload, tmp_path / "contrat.pdf", max_size=10_000, chunk_size=4096)
+
+    assert body.tell() <= 10_000 + 4096
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_endpoint_rejects_oversized_file(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1024)
+    user = {
+        "email": "upload@example.com",
+        "password": "TestPassword123!",
+        "is_professional": True,
+    }
+    client.post("/api/v1/auth/register", json=user)
+    token = client.post("/api/v1/auth/login", json=user).json()["access_token"]
+
+    response = client.post(
+        "/api/v1/contracts/upload",
+        files={"file": ("contrat.pdf", io.BytesIO(b"%PDF" + b"0" * 4096), "application/pdf")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 400
+    assert "trop volumineux" in response.json()["detail"]
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
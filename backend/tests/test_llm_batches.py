@@ -0,0 +1,246 @@
+"""Tests for the Anthropic Message Batches analysis mode."""
+
+import json
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import httpx
+import pytest
+
+from app.api import contracts as contracts_api
+from app.config import settings
+from app.models import AnalysisStatus
+from app.services.claude_service import LLMServiceError
+from app.services.llm_batches import PENDING_KEY, submitted_batches
+from app.tasks import analysis as analysis_tasks
+from app.tasks.analysis import (
+    STAGE_BATCHED,
+    extract_contract_text,
+    poll_llm_batches,
+    queue_batch_analysis,
+)
+from app.tasks.runtime import WorkerRuntime
+from tests.test_analysis_pipeline import _analyses, _create_contracts, runtime  # noqa: F401
+from tests.test_locks import FakeRedis as LeaseRedis
+
+BATCHES_PATH = "/v1/messages/batches"
+
+
+class FakeBatchServer:
+    """API Message Batches locale: les batches se terminent sur demande du test."""
+
+    def __init__(self) -> None:
+        self.batches: dict[str, list[dict[str, Any]]] = {}
+        self.ended: set[str] = set()
+        # custom_id → type d'erreur (ou "expired") du résultat, succès sinon
+        self.outcomes: dict[str, str] = {}
+        self.status_code = 200
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        path = request.url.path
+        if request.method == "POST" and path == BATCHES_PATH:
+            batch_id = f"msgbatch_{len(self.batches) + 1}"
+            self.batches[batch_id] = json.loads(request.content)["requests"]
+            return httpx.Response(200, json=self._batch(batch_id))
+        batch_id = path.removeprefix(f"{BATCHES_PATH}/").removesuffix("/results")
+        if batch_id not in self.batches:
+            return httpx.Response(404, json={"type": "error", "error": {"type": "not_found_error"}})
+        if path.endswith("/results"):
+            lines = [json.dumps(self._result(item)) for item in self.batches[batch_id]]
+            return httpx.Response(200, text="\n".join(lines))
+        return httpx.Response(200, json=self._batch(batch_id))
+
+    def _batch(self, batch_id: str) -> dict[str, Any]:
+        ended = batch_id in self.ended
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "results_url": (
+                f"https://api.anthropic.com{BATCHES_PATH}/{batch_id}/results" if ended else None
+            ),
+        }
+
+    def _result(self, item: dict[str, Any]) -> dict[str, Any]:
+        outcome = self.outcomes.get(item["custom_id"])
+        if outcome == "expired":
+            result: dict[str, Any] = {"type": "expired"}
+        elif outcome is not None:
+            result = {
+                "type": "errored",
+                "error": {"type": "error", "error": {"type": outcome, "message": "refusée"}},
+            }
+        else:
+            analysis = {"summary": "Analyse en batch", "score_equity": 72, "score_clarity": 64}
+            result = {
+                "type": "succeeded",
+                "message": {
+                    "model": item["params"]["model"],
+                    "content": [{"type": "text", "text": json.dumps(analysis)}],
+                },
+            }
+        return {"custom_id": item["custom_id"], "result": result}
+
+
+class FakeRedis(LeaseRedis):
+    """Bail d'analyse, hashs et ensembles Redis en mémoire."""
+
+    async def hset(
+        self,
+        key: str,
+        field: str | None = None,
+        value: str | None = None,
+        mapping: dict[str, str] | None = None,
+    ) -> None:
+        fields = self.values.setdefault(key, {})
+        if field is not None:
+            fields[field] = value
+        fields.update(mapping or {})
+
+    async def hget(self, key: str, field: str) -> str | None:  # type: ignore[override]
+        return self.values.get(key, {}).get(field)
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.values.get(key, {}))
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.values.get(key, {}).pop(field, None)
+
+    async def sadd(self, key: str, member: str) -> None:
+        self.values.setdefault(key, set()).add(member)
+
+    async def srem(self, key: str, member: str) -> None:
+        self.values.get(key, set()).discard(member)
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(self.values.get(key, set()))
+
+    async def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def server(
+    runtime: WorkerRuntime,  # noqa: F811
+    monkeypatch: pytest.MonkeyPatch,
+) -> FakeBatchServer:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "LLM_BATCH_ENABLED", True)
+    fake = FakeBatchServer()
+    runtime.http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    runtime.redis = FakeRedis()  # type: ignore[assignment]
+    return fake
+
+
+def test_batch_results_fan_back_into_analyses(
+    runtime: WorkerRuntime,  # noqa: F811
+    server: FakeBatchServer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    followers: list[str] = []
+    monkeypatch.setattr(analysis_tasks, "_dispatch_followers", followers.extend)
+    accepted, rejected, overloaded = _create_contracts(runtime, tmp_path, 3)
+
+    for contract_id, same_content in ((accepted, ["copie"]), (rejected, []), (overloaded, [])):
+        queued = queue_batch_analysis(extract_contract_text(contract_id), same_content)
+        assert queued["status"] == STAGE_BATCHED
+    # Aucun appel au LLM avant la soumission groupée
+    assert server.batches == {}
+
+    assert poll_llm_batches() == {"collected": 0, "submitted": 3}
+    ((batch_id, requests),) = server.batches.items()
+    assert sorted(item["custom_id"] for item in requests) == sorted(
+        [accepted, rejected, overloaded]
+    )
+    assert "Pénalités de retard" in requests[0]["params"]["messages"][0]["content"]
+
+    # Batch en cours: rien à enregistrer
+    assert poll_llm_batches() == {"collected": 0, "submitted": 0}
+
+    server.outcomes = {rejected: "invalid_request_error", overloaded: "overloaded_error"}
+    server.ended.add(batch_id)
+    assert poll_llm_batches() == {"collected": 3, "submitted": 1}
+
+    analyses = {str(analysis.contract_id): analysis for analysis in _analyses(runtime)}
+    assert analyses[accepted].status == AnalysisStatus.COMPLETED
+    assert analyses[accepted].score_equity == 72
+    assert analyses[accepted].model == settings.ANTHROPIC_MODEL
+    assert analyses[rejected].status == AnalysisStatus.FAILED
+    assert "invalid_request_error" in (analyses[rejected].error_message or "")
+    # Erreur passagère: requête soumise dans une nouvelle batch
+    assert analyses[overloaded].status == AnalysisStatus.PROCESSING
+    assert [item["custom_id"] for item in server.batches["msgbatch_2"]] == [overloaded]
+    assert followers == ["copie"]
+
+    server.outcomes = {}
+    server.ended.add("msgbatch_2")
+    assert poll_llm_batches() == {"collected": 1, "submitted": 0}
+    assert {analysis.status for analysis in _analyses(runtime)} == {
+        AnalysisStatus.COMPLETED,
+        AnalysisStatus.FAILED,
+    }
+
+
+@pytest.mark.asyncio
+async def test_only_bulk_uploads_use_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "LLM_BATCH_ENABLED", True)
+    batched: list[list[list[str]]] = []
+    scheduled: list[list[list[str]]] = []
+
+    async def _schedule(jobs: list[list[str]], *args: Any, **kwargs: Any) -> None:
+        scheduled.append(jobs)
+
+    monkeypatch.setattr(contracts_api, "dispatch_batch_analyses", batched.append)
+    monkeypatch.setattr(contracts_api, "schedule_analyses", _schedule)
+    first, duplicate = UUID(int=1), UUID(int=2)
+
+    await contracts_api._dispatch_analyses([[first, duplicate]], UUID(int=9), bulk=True)
+    await contracts_api._dispatch_analyses([[first]], UUID(int=9), priority=True)
+
+    assert batched == [[[str(first), str(duplicate)]]]
+    assert scheduled == [[[str(first)]]]
+
+
+def test_submission_is_retried_when_the_api_is_overloaded(
+    runtime: WorkerRuntime,  # noqa: F811
+    server: FakeBatchServer,
+    tmp_path: Path,
+) -> None:
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+    queue_batch_analysis(extract_contract_text(contract_id), [])
+
+    server.status_code = 529
+    with pytest.raises(LLMServiceError):
+        poll_llm_batches()
+    assert list(runtime.run(runtime.redis.hgetall(PENDING_KEY))) == [contract_id]
+
+    server.status_code = 200
+    assert poll_llm_batches() == {"collected": 0, "submitted": 1}
+
+
+def test_unknown_batch_does_not_block_the_others(
+    runtime: WorkerRuntime,  # noqa: F811
+    server: FakeBatchServer,
+    tmp_path: Path,
+) -> None:
+    lost, kept = _create_contracts(runtime, tmp_path, 2)
+    for contract_id in (lost, kept):
+        queue_batch_analysis(extract_contract_text(contract_id), [])
+        assert poll_llm_batches() == {"collected": 0, "submitted": 1}
+
+    # Première batch inconnue de l'API (404), seconde terminée
+    del server.batches["msgbatch_1"]
+    server.ended.add("msgbatch_2")
+    assert poll_llm_batches() == {"collected": 1, "submitted": 0}
+
+    statuses = {str(analysis.contract_id): analysis.status for analysis in _analyses(runtime)}
+    assert statuses == {lost: AnalysisStatus.FAILED, kept: AnalysisStatus.COMPLETED}
+    assert runtime.run(submitted_batches(runtime.redis)) == []
@@ -0,0 +1,158 @@
+"""Tests for the LLM result cache (Redis, then Postgres)."""
+
+import fnmatch
+import json
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models import LLMCacheEntry
+from app.models.base import utc_now
+from app.services.llm_cache import (
+    KIND_ANALYSIS,
+    KIND_LEGAL_ANALYSIS,
+    LLMCacheKey,
+    cache_key,
+    get_cached_result,
+    invalidate_stale_entries,
+    prompt_hash,
+)
+from app.tasks.analysis import extract_contract_text, persist_analysis, run_llm_analysis
+from app.tasks.runtime import WorkerRuntime
+from tests.conftest import TestingSessionLocal
+from tests.test_analysis_pipeline import _analyses, _create_contracts, runtime  # noqa: F401
+from tests.test_llm_batches import FakeRedis as HashRedis
+
+
+class FakeRedis(HashRedis):
+    """Redis en mémoire avec parcours des clés."""
+
+    async def scan_iter(self, match: str, count: int | None = None) -> AsyncIterator[str]:
+        for key in list(self.values):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+
+def test_identical_text_is_analysed_once(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    calls: list[httpx.Request] = []
+
+    def _messages_api(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        analysis = {"summary": "Analyse", "score_equity": 70, "score_clarity": 60}
+        return httpx.Response(
+            200,
+            json={
+                "model": settings.ANTHROPIC_MODEL,
+                "content": [{"type": "text", "text": json.dumps(analysis)}],
+            },
+        )
+
+    runtime.http_client = httpx.AsyncClient(transport=httpx.MockTransport(_messages_api))
+    runtime.redis = FakeRedis()  # type: ignore[assignment]
+    first, retried, reuploaded = _create_contracts(runtime, tmp_path, 3)
+
+    persist_analysis(run_llm_analysis(extract_contract_text(first)))
+    persist_analysis(run_llm_analysis(extract_contract_text(retried)))
+    # Redis vidé: le résultat est relu en base
+    runtime.redis = FakeRedis()  # type: ignore[assignment]
+    persist_analysis(run_llm_analysis(extract_contract_text(reuploaded)))
+
+    assert len(calls) == 1
+    analyses = {str(analysis.contract_id): analysis for analysis in _analyses(runtime)}
+    assert {analysis.score_equity for analysis in analyses.values()} == {70}
+    assert {analysis.model for analysis in analyses.values()} == {settings.ANTHROPIC_MODEL}
+    # Chaque analyse garde la clé de l'entrée utilisée (suppression du compte)
+    (key,) = {analysis.llm_cache_key for analysis in analyses.values()}
+    assert key is not None and key.startswith("llm-cache:analysis:")
+    # Résultat relu en base: remis dans Redis
+    assert runtime.run(runtime.redis.get(key)) is not None
+
+
+def test_key_depends_on_normalized_text_model_and_prompts() -> None:
+    key = cache_key(KIND_ANALYSIS, "claude", "Article 1\n\n  Objet du contrat ")
+
+    assert key == cache_key(KIND_ANALYSIS, "claude", "Article 1 Objet du contrat")
+    assert key != cache_key(KIND_ANALYSIS, "claude", "Article 2 Objet du contrat")
+    assert key != cache_key(KIND_ANALYSIS, "claude-opus", "Article 1 Objet du contrat")
+    assert key != cache_key(KIND_LEGAL_ANALYSIS, "claude", "Article 1 Objet du contrat")
+    # Analyse simulée: jamais mise en cache
+    assert cache_key(KIND_ANALYSIS, "mock", "Article 1") is None
+
+
+@pytest.mark.asyncio
+async def test_entries_of_previous_prompts_are_invalidated(db_session: AsyncSession) -> None:
+    current = cache_key(KIND_ANALYSIS, "claude", "Article 1 Objet du contrat")
+    assert current is not None
+    stale = LLMCacheKey(KIND_ANALYSIS, "claude", "0" * 16, current.text_hash)
+    redis = FakeRedis()
+    for key in (current, stale):
+        await redis.set(str(key), json.dumps({"summary": "Analyse"}))
+        db_session.add(
+            LLMCacheEntry(
+                cache_key=str(key),
+                kind=key.kind,
+                model=key.model,
+                prompt_hash=key.prompt_hash,
+                result={"summary": "Analyse"},
+            )
+        )
+    await db_session.commit()
+
+    assert await invalidate_stale_entries(redis, TestingSessionLocal) == 2  # type: ignore[arg-type]
+
+    assert await redis.get(str(stale)) is None
+    assert await redis.get(str(current)) is not None
+    assert await db_session.get(LLMCacheEntry, str(stale)) is None
+    assert await db_session.get(LLMCacheEntry, str(current)) is not None
+    assert (await redis.hgetall("llm-cache:prompts"))[KIND_ANALYSIS] == prompt_hash(KIND_ANALYSIS)
+
+
+@pytest.mark.asyncio
+async def test_hits_drop_call_metadata_and_expired_rows_are_ignored(
+    db_session: AsyncSession,
+) -> None:
+    fresh = cache_key(KIND_LEGAL_ANALYSIS, "claude", "Article 1 Objet du contrat")
+    expired = cache_key(KIND_LEGAL_ANALYSIS, "claude", "Article 2 Durée du contrat")
+    assert fresh is not None and expired is not None
+    result = {"summary": "Analyse", "_llm_usage": {"input_tokens": 120}}
+    db_session.add(
+        LLMCacheEntry(
+            cache_key=str(fresh),
+            kind=fresh.kind,
+            model=fresh.model,
+            prompt_hash=fresh.prompt_hash,
+            result=result,
+        )
+    )
+    db_session.add(
+        LLMCacheEntry(
+            cache_key=str(expired),
+            kind=expired.kind,
+            model=expired.model,
+            prompt_hash=expired.prompt_hash,
+            result=result,
+            created_at=utc_now() - timedelta(days=settings.LLM_CACHE_DB_TTL_DAYS + 1),
+        )
+    )
+    await db_session.commit()
+    redis = FakeRedis()
+
+    hit = await get_cached_result(fresh, redis, TestingSessionLocal)  # type: ignore[arg-type]
+    assert hit == {"summary": "Analyse"}
+    miss = await get_cached_result(expired, redis, TestingSessionLocal)  # type: ignore[arg-type]
+    assert miss is None
+
+    assert await invalidate_stale_entries(redis, TestingSessionLocal) == 1  # type: ignore[arg-type]
+    db_session.expire_all()
+    assert await db_session.get(LLMCacheEntry, str(expired)) is None
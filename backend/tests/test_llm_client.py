@@ -0,0 +1,82 @@
+"""Tests for the per-process pooled LLM HTTP client."""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import (
+    close_llm_client,
+    create_llm_client,
+    get_anthropic_client,
+    get_llm_client,
+)
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"content": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/messages"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connections(server_url: str) -> None:
+    client = create_llm_client(max_connections=2)
+
+    for _ in range(3):
+        response = await client.post(server_url, json={"model": "claude"})
+        assert response.status_code == 200
+
+    assert client.stats.requests == 3
+    assert client.stats.connections == 1
+    assert client.stats.reused == 2
+    await close_llm_client(client)
+    assert client.is_closed
+
+
+def test_process_client_is_bound_to_its_event_loop() -> None:
+    async def _clients() -> tuple[object, object, object]:
+        return get_llm_client(), get_llm_client(), get_anthropic_client()
+
+    first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        first, same, sdk = first_loop.run_until_complete(_clients())
+        assert first is same
+        # Le SDK Anthropic passe par le même pool de connexions
+        assert sdk._client is first  # type: ignore[attr-defined]
+
+        # Autre boucle: nouveau client, les connexions ne passent pas d'une boucle à l'autre
+        second, _, _ = second_loop.run_until_complete(_clients())
+        assert second is not first
+        # Le client remplacé est fermé sur sa propre boucle
+        first_loop.run_until_complete(asyncio.sleep(0.05))
+        assert first.is_closed  # type: ignore[attr-defined]
+
+        second_loop.run_until_complete(close_llm_client())
+        assert llm_client._current is None
+    finally:
+        first_loop.close()
+        second_loop.close()
@@ -0,0 +1,184 @@
+"""Tests for the Redis lease locks and duplicate analysis suppression."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.core.locks import (
+    DUPLICATE_ANALYSIS_METRIC,
+    EXTEND_SCRIPT,
+    RELEASE_SCRIPT,
+    LeaseLock,
+    analysis_lease,
+)
+from app.models import AnalysisStatus
+from app.tasks.analysis import (
+    STAGE_DUPLICATE,
+    extract_contract_text,
+    persist_analysis,
+    run_llm_analysis,
+)
+from app.tasks.runtime import WorkerRuntime
+from tests.test_analysis_pipeline import _analyses, _create_contracts, runtime  # noqa: F401
+
+
+class FakeRedis:
+    """Clés à expiration et scripts de bail, comme le serveur Redis les exécute."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+        self.expires: dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            del self.values[key], self.expires[key]
+        return key in self.values
+
+    async def get(self, key: str) -> Any:
+        return self.values[key] if self._alive(key) else None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        nx: bool = False,
+        px: int | None = None,
+        ex: int | None = None,
+    ) -> bool:
+        if nx and self._alive(key):
+            return False
+        self.values[key] = value
+        if px is not None or ex is not None:
+            self.expires[key] = time.monotonic() + (px / 1000 if px is not None else ex)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        deleted = [key for key in keys if self._alive(key)]
+        for key in deleted:
+            del self.values[key]
+            self.expires.pop(key, None)
+        return len(deleted)
+
+    async def publish(self, channel: str, message: str) -> int:
+        return 0
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def ttl(self, key: str) -> int:
+        return -1
+
+    async def expire(self, key: str, seconds: int) -> None:
+        pass
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str, *args: Any) -> int:
+        if await self.get(key) != token:
+            return 0
+        if script == EXTEND_SCRIPT:
+            self.expires[key] = time.monotonic() + int(args[0]) / 1000
+        elif script == RELEASE_SCRIPT:
+            del self.values[key]
+            self.expires.pop(key, None)
+        return 1
+
+    async def hget(self, key: str, field: str) -> None:
+        # Contrats envoyés hors file d'analyses (voir analysis_scheduler)
+        return None
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _duplicates(redis: FakeRedis) -> int:
+    return sum(
+        value for key, value in redis.values.items() if key.endswith(DUPLICATE_ANALYSIS_METRIC)
+    )
+
+
+@pytest.mark.asyncio
+async def test_lease_belongs_to_its_holder() -> None:
+    redis = FakeRedis()
+    first = LeaseLock(redis, "lock", ttl_seconds=10)
+    second = LeaseLock(redis, "lock", ttl_seconds=10)
+
+    assert await first.acquire()
+    assert not await second.acquire()
+    assert not await second.claim()
+    # Ni renouvellement ni libération du bail d'un autre
+    assert not await second.extend()
+    assert not await second.release()
+    assert await redis.get("lock") == first.token
+
+    # Le même porteur (étape suivante) reprend son bail
+    assert await LeaseLock(redis, "lock", ttl_seconds=10, token=first.token).claim()
+    assert await first.release()
+    assert await second.acquire()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_the_lease_past_its_ttl() -> None:
+    redis = FakeRedis()
+    lease = LeaseLock(redis, "lock", ttl_seconds=0.15)
+    assert await lease.acquire()
+
+    async with lease.heartbeat():
+        await asyncio.sleep(0.4)
+        assert await lease.holder() == lease.token
+
+    await asyncio.sleep(0.2)
+    assert await lease.holder() is None
+
+
+def test_duplicate_job_exits_while_an_analysis_is_in_flight(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+) -> None:
+    redis = FakeRedis()
+    runtime.redis = redis  # type: ignore[assignment]
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+
+    extracted = extract_contract_text(contract_id)
+    assert runtime.run(redis.get(f"analysis:lock:{contract_id}")) == extracted["lease_token"]
+
+    # Redélivraison pendant l'analyse: arrêt sans toucher au contrat
+    duplicate = extract_contract_text(contract_id)
+    assert duplicate == {"contract_id": contract_id, "status": STAGE_DUPLICATE}
+    assert run_llm_analysis(duplicate) == duplicate
+    assert _duplicates(redis) == 1
+
+    final = persist_analysis(run_llm_analysis(extracted))
+    assert final["status"] == "completed"
+    assert runtime.run(redis.get(f"analysis:lock:{contract_id}")) is None
+
+    # Redélivraison après la fin: le résultat enregistré est repris
+    late = extract_contract_text(contract_id)
+    assert late["duplicate"] is True
+    assert late["score_equity"] == final["score_equity"]
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.COMPLETED]
+    assert _duplicates(redis) == 2
+
+
+def test_stage_resumes_when_its_lease_expired_between_stages(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+) -> None:
+    redis = FakeRedis()
+    runtime.redis = redis  # type: ignore[assignment]
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+    extracted = extract_contract_text(contract_id)
+    key = f"analysis:lock:{contract_id}"
+
+    # Attente en file plus longue que le bail: l'étape suivante le reprend
+    runtime.run(redis.eval(RELEASE_SCRIPT, 1, key, extracted["lease_token"]))
+    analyzed = run_llm_analysis(extracted)
+    assert analyzed["status"] == "processing"
+
+    # Bail repris entre-temps par une autre analyse: celle-ci s'arrête
+    runtime.run(redis.eval(RELEASE_SCRIPT, 1, key, extracted["lease_token"]))
+    assert runtime.run(analysis_lease(redis, contract_id).acquire())  # type: ignore[arg-type]
+    assert persist_analysis(analyzed)["status"] == STAGE_DUPLICATE
+    assert [analysis.status for analysis in _analyses(runtime)] == [AnalysisStatus.PROCESSING]
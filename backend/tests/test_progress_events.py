@@ -0,0 +1,223 @@
+"""Tests for analysis progress events and the SSE status stream."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api import analysis_v2
+from app.api import contracts as contracts_api
+from app.core.security import get_password_hash
+from app.models import Analysis, AnalysisStatus, Contract, User
+from app.services.progress_events import (
+    EVENTS_CHANNEL,
+    LAST_EVENT_KEY,
+    STAGE_CALLING_MODEL,
+    STAGE_COMPLETED,
+    STAGE_EXTRACTING,
+    publish_progress,
+)
+from app.tasks.analysis import extract_contract_text, persist_analysis, run_llm_analysis
+from app.tasks.runtime import WorkerRuntime
+from tests.test_analysis_pipeline import _create_contracts, runtime  # noqa: F401
+from tests.test_locks import FakeRedis as LeaseRedis
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float = 0.0
+    ) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        for queues in self.redis.subscribers.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakeRedis(LeaseRedis):
+    """Bail d'analyse et pub/sub Redis en mémoire (un seul processus)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.subscribers: dict[str, list[asyncio.Queue[dict[str, Any]]]] = {}
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self.subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait({"type": "message", "data": message})
+        return len(queues)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def ping(self) -> bool:
+        return True
+
+
+def _events(body: str) -> list[dict[str, Any]]:
+    return [
+        json.loads(line.removeprefix("data: "))
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+async def _create_analysis(
+    async_client: AsyncClient, db_session: AsyncSession, status: AnalysisStatus
+) -> tuple[Analysis, dict[str, str]]:
+    user = User(email="events@example.com", password_hash=get_password_hash("TestPassword123!"))
+    db_session.add(user)
+    await db_session.commit()
+    contract = Contract(
+        user_id=user.id,
+        filename="contrat.pdf",
+        file_path="blobs/contrat.pdf",
+        file_size=100,
+        file_type="application/pdf",
+    )
+    db_session.add(contract)
+    await db_session.commit()
+    analysis = Analysis(contract_id=contract.id, status=status, score_equity=70)
+    db_session.add(analysis)
+    await db_session.commit()
+
+    login = await async_client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": "TestPassword123!"}
+    )
+    return analysis, {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def test_worker_publishes_each_stage(
+    runtime: WorkerRuntime,  # noqa: F811
+    tmp_path: Path,
+) -> None:
+    redis = FakeRedis()
+    runtime.redis = redis  # type: ignore[assignment]
+    (contract_id,) = _create_contracts(runtime, tmp_path, 1)
+    listener = redis.pubsub()
+    runtime.run(listener.subscribe(EVENTS_CHANNEL.format(contract_id=contract_id)))
+
+    persist_analysis(run_llm_analysis(extract_contract_text(contract_id)))
+
+    stages = []
+    while not listener.queue.empty():
+        stages.append(json.loads(listener.queue.get_nowait()["data"])["stage"])
+    assert stages == ["extracting", "calling_model", "scoring", "completed"]
+
+
+@pytest.mark.asyncio
+async def test_event_stream_relays_stages_until_completion(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    redis = FakeRedis()
+
+    async def _redis_client() -> FakeRedis:
+        return redis
+
+    monkeypatch.setattr(contracts_api, "get_redis_client", _redis_client)
+    analysis, headers = await _create_analysis(async_client, db_session, AnalysisStatus.PENDING)
+    contract_id = str(analysis.contract_id)
+    # Étape publiée avant la connexion: relue depuis le dernier événement
+    await publish_progress(redis, contract_id, STAGE_EXTRACTING)
+
+    async def _worker() -> None:
+        channel = EVENTS_CHANNEL.format(contract_id=contract_id)
+        while not redis.subscribers.get(channel):
+            await asyncio.sleep(0.01)
+        await publish_progress(redis, contract_id, STAGE_CALLING_MODEL)
+        await publish_progress(redis, contract_id, STAGE_COMPLETED, score_equity=70)
+
+    worker = asyncio.create_task(_worker())
+    response = await async_client.get(f"/api/v1/contracts/{contract_id}/events", headers=headers)
+    await worker
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [event["stage"] for event in events] == [
+        "queued",
+        "extracting",
+        "calling_model",
+        "completed",
+    ]
+    assert events[-1]["score_equity"] == 70
+    assert redis.subscribers[EVENTS_CHANNEL.format(contract_id=contract_id)] == []
+
+
+@pytest.mark.asyncio
+async def test_event_stream_of_finished_analysis_and_without_redis(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    analysis, headers = await _create_analysis(async_client, db_session, AnalysisStatus.COMPLETED)
+    contract_id = str(analysis.contract_id)
+
+    response = await async_client.get(f"/api/v1/contracts/{contract_id}/events", headers=headers)
+
+    assert [event["stage"] for event in _events(response.text)] == ["completed"]
+
+    analysis.status = AnalysisStatus.PROCESSING
+    await db_session.commit()
+
+    # Pas de Redis dans les tests: le client revient au sondage du statut
+    response = await async_client.get(f"/api/v1/contracts/{contract_id}/events", headers=headers)
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_inline_analysis_publishes_extraction_failures(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    redis = FakeRedis()
+
+    async def _redis_client() -> FakeRedis:
+        return redis
+
+    monkeypatch.setattr(analysis_v2, "get_redis_client", _redis_client)
+    analysis, headers = await _create_analysis(async_client, db_session, AnalysisStatus.FAILED)
+    contract_id = str(analysis.contract_id)
+    await db_session.delete(analysis)
+    await db_session.commit()
+    # Fin de l'analyse précédente, encore conservée
+    await publish_progress(redis, contract_id, STAGE_COMPLETED, score_equity=70)
+    listener = redis.pubsub()
+    await listener.subscribe(EVENTS_CHANNEL.format(contract_id=contract_id))
+    deleted: list[str] = []
+    delete = redis.delete
+
+    async def _delete(*keys: str) -> int:
+        deleted.extend(keys)
+        return await delete(*keys)
+
+    redis.delete = _delete  # type: ignore[method-assign]
+
+    # Fichier absent: extraction impossible (400)
+    response = await async_client.post(
+        f"/api/v1/analysis/v2/contracts/{contract_id}/analyze", headers=headers
+    )
+
+    assert response.status_code == 400
+    assert deleted == [LAST_EVENT_KEY.format(contract_id=contract_id)]
+    stages = []
+    while not listener.queue.empty():
+        stages.append(json.loads(listener.queue.get_nowait()["data"])["stage"])
+    assert stages == ["extracting", "failed"]
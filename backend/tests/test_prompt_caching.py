@@ -0,0 +1,73 @@
+"""Tests for the cached legal analysis instructions."""
+
+import json
+from typing import Any
+
+import httpx
+import pytest
+from anthropic import AsyncAnthropic
+
+from app.prompts.legal_analysis import LEGAL_ANALYSIS_INSTRUCTIONS, format_legal_analysis_prompt
+from app.services import analysis_enhanced
+from app.services.analysis_enhanced import analyze_contract_enhanced
+
+CONTRACT = "Article 1 - Pénalités de retard\nUne pénalité de 15 % par jour sera appliquée."
+
+
+def test_instructions_are_static() -> None:
+    assert "{contract_text}" not in LEGAL_ANALYSIS_INSTRUCTIONS
+    assert "{sources_json}" not in LEGAL_ANALYSIS_INSTRUCTIONS
+    # Le prompt complet reste disponible (instructions puis contrat)
+    prompt = format_legal_analysis_prompt(CONTRACT)
+    assert prompt.startswith(LEGAL_ANALYSIS_INSTRUCTIONS)
+    assert prompt.count(LEGAL_ANALYSIS_INSTRUCTIONS) == 1
+
+
+@pytest.mark.asyncio
+async def test_instructions_sent_once_and_cache_usage_recorded(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    bodies: list[dict[str, Any]] = []
+
+    def _messages_api(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            json={
+                "id": "msg_1",
+                "type": "message",
+                "role": "assistant",
+                "model": "claude",
+                "content": [{"type": "text", "text": json.dumps({"analyses": []})}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": 120,
+                    "output_tokens": 40,
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 1500,
+                },
+            },
+        )
+
+    client = AsyncAnthropic(
+        api_key="sk-test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(_messages_api)),
+    )
+    monkeypatch.setattr(analysis_enhanced, "get_anthropic_client", lambda: client)
+
+    result = await analyze_contract_enhanced(CONTRACT, use_web_search=False)
+
+    (body,) = bodies
+    (system,) = body["system"]
+    assert system["text"] == LEGAL_ANALYSIS_INSTRUCTIONS
+    assert system["cache_control"] == {"type": "ephemeral"}
+    user_message = body["messages"][0]["content"]
+    assert "Pénalités de retard" in user_message
+    assert LEGAL_ANALYSIS_INSTRUCTIONS[:200] not in user_message
+
+    usage = result["_llm_usage"]
+    assert usage["cache_read_input_tokens"] == 1500
+    assert usage["cache_creation_input_tokens"] == 0
+    assert usage["input_tokens"] == 120
+    assert usage["duration_ms"] >= 0
@@ -21,7 +21,8 @@ async def test_analyze_contract_basic() -> None:
     mock_response.usage.input_tokens = 1000
     mock_response.usage.output_tokens = 500
     
-    with patch('app.services.analysis_enhanced.anthropic_client.messages.create', new_callable=AsyncMock) as mock_create:
+    with patch('app.services.analysis_enhanced.get_anthropic_client') as mock_client:
+        mock_create = mock_client.return_value.messages.create = AsyncMock()
         mock_create.return_value = mock_response
         
         result = await analyze_contract_enhanced(contract_text, use_web_search=False)
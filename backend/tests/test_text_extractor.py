@@ -0,0 +1,442 @@
+"""Tests for the text extraction service."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import text_extractor
+from app.services.extraction_cache import (
+    compute_file_hash,
+    delete_cached_extraction,
+    get_cached_extraction,
+    store_cached_extraction,
+)
+from app.services.text_extractor import (
+    DocumentTooComplexError,
+    ExtractionBusyError,
+    ExtractionResult,
+    _split_page_ranges,
+    extract_document,
+    extract_document_async,
+    extract_docx_document,
+    extract_pdf_document,
+    extract_text,
+    extract_text_from_docx,
+    extract_text_from_docx_python_docx,
+    extract_text_from_pdf,
+)
+
+
+def build_pdf(pages: list[str]) -> bytes:
+    """Build a minimal multi-page PDF (Helvetica, one line per page)."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids ["
+            + " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+            + f"] /Count {len(pages)} >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+            ).encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+@pytest.fixture(autouse=True)
+def extraction_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Isolate the extracted-text cache per test, parsing in-process by default."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(settings, "EXTRACTION_SANDBOX_ENABLED", False)
+    return cache_dir
+
+
+def _hang_with_helper(file_path: str, max_chars: int | None) -> ExtractionResult:
+    """Sandboxed extractor that never returns and leaves a helper process behind."""
+    helper = subprocess.Popen(["sleep", "60"])
+    Path(file_path).with_suffix(".pid").write_text(str(helper.pid))
+    time.sleep(60)
+    raise AssertionError("unreachable")
+
+
+def _allocate(file_path: str, max_chars: int | None) -> ExtractionResult:
+    """Sandboxed extractor that exceeds any reasonable memory cap."""
+    bytearray(8 * 1024**3)
+    raise AssertionError("unreachable")
+
+
+@pytest.fixture
+def multi_page_pdf(tmp_path: Path) -> Path:
+    """Write a 12-page PDF to disk."""
+    path = tmp_path / "contrat.pdf"
+    path.write_bytes(build_pdf([f"Article {i} du contrat" for i in range(1, 13)]))
+    return path
+
+
+def test_split_page_ranges_covers_all_pages() -> None:
+    ranges = _split_page_ranges(10, 4)
+    assert ranges == [(0, 3), (3, 6), (6, 9), (9, 10)]
+    assert _split_page_ranges(0, 4) == []
+    assert _split_page_ranges(3, 8) == [(0, 1), (1, 2), (2, 3)]
+
+
+def test_parallel_extraction_preserves_page_order(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 1)
+    sequential = extract_text_from_pdf(multi_page_pdf)
+
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 3)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(text_extractor.os, "cpu_count", lambda: 4)
+    parallel = extract_text_from_pdf(multi_page_pdf)
+
+    assert parallel == sequential
+    assert parallel.index("Article 2 ") < parallel.index("Article 11 ")
+
+
+def test_small_pdf_stays_sequential(multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def _no_pool(*args: object, **kwargs: object) -> None:
+        raise AssertionError("le pool ne doit pas être utilisé")
+
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 50)
+    monkeypatch.setattr(text_extractor, "_extract_pdf_pages_parallel", _no_pool)
+
+    assert "Article 12 du contrat" in extract_text(multi_page_pdf, "application/pdf")
+
+
+def test_pool_failure_falls_back_to_sequential(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _broken_pool(*args: object, **kwargs: object) -> None:
+        raise OSError("daemonic processes are not allowed to have children")
+
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(text_extractor.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(text_extractor, "_extract_pdf_pages_parallel", _broken_pool)
+
+    assert "Article 1 du contrat" in extract_text_from_pdf(multi_page_pdf)
+
+
+def test_extract_text_rejects_unknown_type(tmp_path: Path) -> None:
+    path = tmp_path / "contrat.txt"
+    path.write_text("texte")
+    with pytest.raises(ValueError):
+        extract_text(path)
+
+
+def test_extract_text_uses_cache_on_second_call(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[Path] = []
+    original = text_extractor.extract_pdf_document
+
+    def _counting_extractor(path: Path, max_chars: int | None = None) -> ExtractionResult:
+        calls.append(path)
+        return original(path, max_chars)
+
+    monkeypatch.setattr(text_extractor, "extract_pdf_document", _counting_extractor)
+
+    first = extract_document(multi_page_pdf, "application/pdf")
+    second = extract_document(multi_page_pdf, "application/pdf")
+
+    assert first == second
+    assert second.page_count == 12
+    assert len(calls) == 1
+    cached = get_cached_extraction(compute_file_hash(multi_page_pdf))
+    assert cached is not None and cached["pages"] == first.pages
+
+
+def test_identical_bytes_share_cache_entry(multi_page_pdf: Path, tmp_path: Path) -> None:
+    copy = tmp_path / "copie.pdf"
+    copy.write_bytes(multi_page_pdf.read_bytes())
+    store_cached_extraction(
+        compute_file_hash(multi_page_pdf), {"pages": ["texte en cache"], "page_count": 1}
+    )
+
+    assert extract_text(copy) == "texte en cache"
+    assert extract_text(copy, use_cache=False) != "texte en cache"
+
+
+def test_corrupted_cache_entry_is_a_miss(
+    multi_page_pdf: Path, extraction_cache_dir: Path
+) -> None:
+    content_hash = compute_file_hash(multi_page_pdf)
+    store_cached_extraction(content_hash, {"pages": ["texte"], "page_count": 1})
+    for entry in extraction_cache_dir.rglob("*.gz"):
+        entry.write_bytes(b"pas du gzip")
+
+    assert get_cached_extraction(content_hash) is None
+    assert "Article 1 du contrat" in extract_text(multi_page_pdf)
+
+
+def test_delete_cached_text(multi_page_pdf: Path) -> None:
+    content_hash = compute_file_hash(multi_page_pdf)
+    extract_text(multi_page_pdf)
+
+    assert delete_cached_extraction(content_hash) is True
+    assert get_cached_extraction(content_hash) is None
+    assert delete_cached_extraction(content_hash) is False
+
+
+@pytest.mark.asyncio
+async def test_extract_text_async_releases_slot(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(text_extractor, "_extraction_slots", slots)
+
+    result = await extract_document_async(multi_page_pdf, "application/pdf")
+
+    assert "Article 12 du contrat" in result.text
+    assert slots.acquire(blocking=False)
+
+
+@pytest.mark.asyncio
+async def test_extract_text_async_rejects_when_saturated(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(text_extractor, "_extraction_slots", slots)
+
+    with pytest.raises(ExtractionBusyError):
+        await extract_document_async(multi_page_pdf)
+
+
+@pytest.fixture
+def docx_with_table(tmp_path: Path) -> Path:
+    """Write a DOCX with paragraphs around a price table."""
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("Article 1 - Objet")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Retard"
+    table.cell(0, 1).text = "Pénalité"
+    table.cell(1, 0).text = "10 jours"
+    table.cell(1, 1).text = "5 %"
+    document.add_paragraph("Article 2 - Durée\tun an")
+    path = tmp_path / "contrat.docx"
+    document.save(str(path))
+    return path
+
+
+def test_docx_extraction_keeps_tables_in_document_order(docx_with_table: Path) -> None:
+    text = extract_text_from_docx(docx_with_table)
+
+    assert text.split("\n\n") == [
+        "Article 1 - Objet",
+        "Retard | Pénalité",
+        "10 jours | 5 %",
+        "Article 2 - Durée\tun an",
+    ]
+
+
+def test_docx_streaming_matches_python_docx_paragraphs(tmp_path: Path) -> None:
+    from docx import Document
+
+    document = Document()
+    for i in range(20):
+        paragraph = document.add_paragraph(f"Clause {i} : ")
+        paragraph.add_run("obligations du prestataire").bold = True
+    document.add_paragraph("   ")
+    path = tmp_path / "paragraphes.docx"
+    document.save(str(path))
+
+    assert extract_text_from_docx(path) == extract_text_from_docx_python_docx(path)
+
+
+def test_docx_extraction_rejects_invalid_archive(tmp_path: Path) -> None:
+    path = tmp_path / "faux.docx"
+    path.write_bytes(b"pas un zip")
+    with pytest.raises(ValueError):
+        extract_text_from_docx(path)
+
+
+def test_pdf_budget_stops_parsing_early(multi_page_pdf: Path) -> None:
+    result = extract_pdf_document(multi_page_pdf, max_chars=40)
+
+    assert result.page_count == 12
+    assert result.truncated is True
+    assert len(result.pages) == 2
+    assert "Article 3 " not in result.text
+
+
+def test_parallel_pdf_budget_skips_remaining_ranges(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "long.pdf"
+    path.write_bytes(build_pdf([f"Page {i}" for i in range(1, 81)]))
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(text_extractor.os, "cpu_count", lambda: 2)
+
+    result = extract_pdf_document(path, max_chars=10)
+
+    assert result.page_count == 80
+    assert result.truncated is True
+    assert result.pages[0] == "Page 1"
+    assert len(result.pages) < 80
+
+
+def test_budget_not_reached_is_not_truncated(multi_page_pdf: Path) -> None:
+    result = extract_pdf_document(multi_page_pdf, max_chars=1_000_000)
+
+    assert result.truncated is False
+    assert len(result.pages) == 12
+
+
+def test_truncated_extraction_is_not_cached(multi_page_pdf: Path) -> None:
+    extract_document(multi_page_pdf, max_chars=40)
+    assert get_cached_extraction(compute_file_hash(multi_page_pdf)) is None
+
+    full = extract_document(multi_page_pdf)
+    from_cache = extract_document(multi_page_pdf, max_chars=40)
+
+    assert full.truncated is False
+    assert from_cache.truncated is True
+    assert from_cache.page_count == 12
+    assert from_cache.pages == full.pages[:2]
+
+
+def test_docx_budget_reports_truncation(docx_with_table: Path) -> None:
+    result = extract_docx_document(docx_with_table, max_chars=5)
+
+    assert result.truncated is True
+    assert result.text == "Article 1 - Objet"
+    assert extract_docx_document(docx_with_table).truncated is False
+
+
+def test_sandboxed_extraction_matches_in_process(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    in_process = extract_document(multi_page_pdf, use_cache=False)
+
+    monkeypatch.setattr(settings, "EXTRACTION_SANDBOX_ENABLED", True)
+    sandboxed = extract_document(multi_page_pdf, use_cache=False)
+
+    assert sandboxed == in_process
+
+
+def _process_gone(pid: int) -> bool:
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().split()[2]
+    except FileNotFoundError:
+        return True
+    return state == "Z"
+
+
+def test_sandbox_timeout_kills_process_group(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "EXTRACTION_TIMEOUT_SECONDS", 2)
+
+    with pytest.raises(DocumentTooComplexError) as excinfo:
+        text_extractor._extract_in_sandbox(_hang_with_helper, multi_page_pdf, None)
+
+    assert excinfo.value.reason == "timeout"
+    assert excinfo.value.as_dict()["limit"] == 2
+    helper_pid = int(multi_page_pdf.with_suffix(".pid").read_text())
+    deadline = time.monotonic() + 5
+    while not _process_gone(helper_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _process_gone(helper_pid)
+
+
+def test_sandbox_group_stops_when_its_parent_dies(multi_page_pdf: Path) -> None:
+    # Processus du pool tué en pleine extraction (limite de temps, recyclage)
+    parent = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from pathlib import Path; "
+            "from app.services import text_extractor; "
+            "from tests.test_text_extractor import _hang_with_helper; "
+            "text_extractor._extract_in_sandbox(_hang_with_helper, Path(sys.argv[1]), None)",
+            str(multi_page_pdf),
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(entry for entry in sys.path if entry)},
+    )
+    pid_file = multi_page_pdf.with_suffix(".pid")
+    deadline = time.monotonic() + 30
+    while not pid_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    helper_pid = int(pid_file.read_text())
+
+    parent.kill()
+    parent.wait()
+
+    deadline = time.monotonic() + 5
+    while not _process_gone(helper_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _process_gone(helper_pid)
+
+
+def test_sandbox_memory_cap(multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_MEMORY_MB", 512)
+
+    with pytest.raises(DocumentTooComplexError) as excinfo:
+        text_extractor._extract_in_sandbox(_allocate, multi_page_pdf, None)
+
+    assert excinfo.value.reason == "memory"
+    assert excinfo.value.limit == 512
+
+
+def test_sandbox_propagates_extraction_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "faux.pdf"
+    path.write_bytes(b"pas un pdf")
+    monkeypatch.setattr(settings, "EXTRACTION_SANDBOX_ENABLED", True)
+
+    with pytest.raises(ValueError) as excinfo:
+        extract_document(path)
+
+    assert not isinstance(excinfo.value, DocumentTooComplexError)
+
+
+def test_page_limit_rejects_before_parsing(
+    multi_page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _no_parse(*args: object, **kwargs: object) -> None:
+        raise AssertionError("le document ne doit pas être parsé")
+
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_PAGES", 10)
+    monkeypatch.setattr(text_extractor, "extract_pdf_document", _no_parse)
+
+    assert text_extractor._read_pdf_page_count(multi_page_pdf) == 12
+    with pytest.raises(DocumentTooComplexError) as excinfo:
+        extract_document(multi_page_pdf)
+
+    assert excinfo.value.reason == "pages"
+    assert excinfo.value.limit == 10
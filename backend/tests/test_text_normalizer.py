@@ -0,0 +1,73 @@
+"""Tests for the text normalization service."""
+
+from app.services.text_extractor import ExtractionResult
+from app.services.text_normalizer import (
+    describe_extraction,
+    estimate_tokens,
+    normalize_pages,
+    normalize_text,
+)
+
+BODIES = [
+    "Article 1 - Objet\nLe prestataire fournit les services décrits.\nEn annexe 1.",
+    "Article 2 - Prix\nLe client règle les factures à 30 jours.\nSans escompte.",
+    "Article 3 - Durée\nLe contrat est conclu pour un an.\nRenouvelable.",
+    "Article 4 - Résiliation\nPréavis de trois mois par lettre recommandée.\nFin.",
+]
+
+
+def _page(number: int, body: str) -> str:
+    return "SARL Exemple - Contrat de prestation confidentiel\n" f"{body}\n" f"Page {number} / 4"
+
+
+def test_running_headers_and_page_numbers_are_removed() -> None:
+    pages = [_page(i, body) for i, body in enumerate(BODIES, start=1)]
+
+    result = normalize_pages(pages)
+
+    assert "SARL Exemple" not in result.text
+    assert "Page 2 / 4" not in result.text
+    assert result.text.split("\n\n") == BODIES
+    assert result.stats.chars_saved > 0
+    assert result.stats.tokens_saved > 0
+
+
+def test_repeated_lines_below_threshold_are_kept() -> None:
+    pages = [
+        "Préambule\nLes parties conviennent.",
+        "Préambule\nArticle 1 - Objet.",
+        "Annexe\nArticle 2 - Prix.",
+        "Annexe\nArticle 3 - Durée.",
+    ]
+
+    result = normalize_pages(pages)
+
+    assert result.text.count("Préambule") == 2
+
+
+def test_dehyphenation_and_whitespace_collapse() -> None:
+    text = "Le sous-\ntraitant   s'engage :\n\n\n\n  à livrer   dans les délais ci-\n dessous.  "
+
+    result = normalize_text(text)
+
+    # Trait d'union conservé: en fin de ligne, il appartient le plus souvent au mot
+    assert result.text == "Le sous-traitant s'engage :\n\nà livrer dans les délais ci-dessous."
+
+
+def test_single_page_keeps_numeric_lines() -> None:
+    result = normalize_text("12\nmois de préavis")
+
+    assert result.text == "12\nmois de préavis"
+
+
+def test_describe_extraction_reports_savings() -> None:
+    extraction = ExtractionResult(pages=["a  b", "c"], page_count=5, truncated=True)
+    normalized = normalize_pages(extraction.pages)
+
+    report = describe_extraction(extraction, normalized)
+
+    assert report["page_count"] == 5
+    assert report["pages_parsed"] == 2
+    assert report["truncated"] is True
+    assert report["normalization"]["chars_saved"] == 1
+    assert estimate_tokens("x" * 9) == 3
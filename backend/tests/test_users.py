@@ -7,7 +7,7 @@ from sqlmodel import col
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.security import get_password_hash
-from app.models import Analysis, AnalysisStatus, Contract, ContractStatus, User
+from app.models import Analysis, AnalysisStatus, Contract, ContractStatus, LLMCacheEntry, User
 
 
 @pytest.mark.asyncio
@@ -84,12 +84,23 @@ async def test_delete_user_data(
     await db_session.commit()
     await db_session.refresh(contract)
 
+    cache_key = "llm-cache:analysis:claude:0123456789abcdef:" + "0" * 64
     analysis = Analysis(
         contract_id=contract.id,
         status=AnalysisStatus.COMPLETED,
         results={"foo": "bar"},
+        llm_cache_key=cache_key,
     )
     db_session.add(analysis)
+    db_session.add(
+        LLMCacheEntry(
+            cache_key=cache_key,
+            kind="analysis",
+            model="claude",
+            prompt_hash="0123456789abcdef",
+            result={"foo": "bar"},
+        )
+    )
     await db_session.commit()
 
     login_response = await async_client.post(
@@ -110,3 +121,5 @@ async def test_delete_user_data(
 
     user_result = await db_session.execute(select(User).where(col(User.id) == user.id))
     assert user_result.scalar_one_or_none() is None
+    db_session.expire_all()
+    assert await db_session.get(LLMCacheEntry, cache_key) is None
@@ -0,0 +1,170 @@
+"""Tests for the per-process Celery worker runtime."""
+
+import asyncio
+import json
+import threading
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.security import get_password_hash
+from app.models import Analysis, Contract, User
+from app.tasks import runtime as runtime_module
+from app.tasks.analysis import analyze_contract
+from app.tasks.runtime import WorkerRuntime, close_runtime, get_runtime
+from benchmarks.corpus import write_pdf
+
+
+@pytest.fixture
+def runtime(db_session: AsyncSession) -> Generator[WorkerRuntime, None, None]:
+    """Runtime neuf sur une base vide; la boucle de pytest est rétablie ensuite."""
+    previous_loop = asyncio.get_event_loop()
+    close_runtime()
+    yield get_runtime()
+    close_runtime()
+    asyncio.set_event_loop(previous_loop)
+
+
+@pytest.fixture
+def async_runtime(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> Generator[WorkerRuntime, None, None]:
+    """Runtime en mode async: boucle dans un thread, deux analyses en vol au plus."""
+    monkeypatch.setattr(settings, "ANALYSIS_WORKER_MODE", "async")
+    monkeypatch.setattr(settings, "ANALYSIS_MAX_IN_FLIGHT", 2)
+    close_runtime()
+    yield get_runtime()
+    close_runtime()
+
+
+def _enable_llm(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "LLM_REAL_CALLS_ENABLED", True)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "EXTRACTION_SANDBOX_ENABLED", False)
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def _llm_response(score: int) -> httpx.Response:
+    answer = {"summary": "Contrat simple", "score_equity": score, "score_clarity": 80}
+    return httpx.Response(200, json={"content": [{"text": json.dumps(answer)}]})
+
+
+def _create_contracts(runtime: WorkerRuntime, tmp_path: Path, count: int) -> list[str]:
+    async def _create() -> list[str]:
+        async with runtime.session_factory() as db:
+            user = User(email="worker@example.com", password_hash=get_password_hash("x"))
+            db.add(user)
+            await db.commit()
+            contracts = []
+            for number in range(count):
+                path = tmp_path / f"contrat-{number}.pdf"
+                write_pdf(path, [[f"Article 1 - Objet du contrat {number}"]])
+                contract = Contract(
+                    user_id=user.id,
+                    filename=path.name,
+                    file_path=str(path),
+                    file_size=path.stat().st_size,
+                    file_type="application/pdf",
+                )
+                db.add(contract)
+                contracts.append(contract)
+            await db.commit()
+            return [str(contract.id) for contract in contracts]
+
+    return runtime.run(_create())
+
+
+def test_tasks_share_the_process_engine_and_http_client(
+    runtime: WorkerRuntime, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _enable_llm(monkeypatch, tmp_path)
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return _llm_response(70)
+
+    runtime.run(runtime.http_client.aclose())
+    runtime.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    engine = runtime.engine
+
+    # Deux tâches successives du même processus
+    contract_ids = _create_contracts(runtime, tmp_path, 2)
+    results = [analyze_contract(contract_id) for contract_id in contract_ids]
+
+    assert [result["status"] for result in results] == ["completed", "completed"]
+    assert len(requests) == 2
+    assert get_runtime() is runtime and runtime.engine is engine
+    assert not runtime.loop.is_closed()
+
+    async def _scores() -> set[int | None]:
+        async with runtime.session_factory() as db:
+            analyses = await db.execute(select(Analysis))
+            return {analysis.score_equity for analysis in analyses.scalars().all()}
+
+    assert runtime.run(_scores()) == {70}
+
+
+def test_runtime_inherited_from_fork_is_replaced(runtime: WorkerRuntime) -> None:
+    # Simule un processus enfant: le runtime hérité appartient à un autre pid
+    runtime_module._runtime_pid = -1
+
+    child = get_runtime()
+
+    assert child is not runtime
+    assert child.loop is not runtime.loop and child.engine is not runtime.engine
+    runtime.close()
+
+
+def test_async_mode_runs_analyses_concurrently_up_to_the_limit(
+    async_runtime: WorkerRuntime, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _enable_llm(monkeypatch, tmp_path)
+    in_flight = 0
+    peak = 0
+    loop_threads: set[str] = set()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        loop_threads.add(threading.current_thread().name)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return _llm_response(60)
+
+    async_runtime.run(async_runtime.http_client.aclose())
+    async_runtime.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    contract_ids = _create_contracts(async_runtime, tmp_path, 4)
+
+    # Les threads du pool Celery soumettent chacun une analyse à la boucle partagée
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(analyze_contract, contract_ids))
+
+    assert [result["status"] for result in results] == ["completed"] * 4
+    assert peak == 2
+    assert loop_threads == {"analysis-event-loop"}
+
+
+def test_async_mode_enforces_the_task_time_limit(async_runtime: WorkerRuntime) -> None:
+    # Le pool de threads Celery n'applique pas task_soft_time_limit
+    async_runtime.time_limit = 0.1
+    cancelled = threading.Event()
+
+    async def stuck() -> None:
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(SoftTimeLimitExceeded):
+        async_runtime.run(stuck())
+    assert cancelled.is_set()
@@ -14,9 +14,21 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Alert, AlertDescription, AlertTitle } from '@/components/ui/alert';
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from '@/components/ui/accordion';
 import { Progress } from '@/components/ui/progress';
-import { useContracts } from '@/hooks/useContracts';
+import { useContractProgress, useContracts } from '@/hooks/useContracts';
 import { getApiErrorMessage } from '@/lib/errors';
 import { FileText, ArrowLeft, AlertTriangle, CheckCircle, XCircle, Download, Loader2 } from 'lucide-react';
+import type { AnalysisStage } from '@/types';
+
+// Avancement affiché pour chaque étape publiée par le worker
+const STAGE_PROGRESS: Record<AnalysisStage, { value: number; label: string }> = {
+  queued: { value: 5, label: "En file d'attente" },
+  extracting: { value: 20, label: 'Extraction du texte' },
+  searching_sources: { value: 35, label: 'Recherche de sources juridiques' },
+  calling_model: { value: 50, label: 'Analyse par le modèle' },
+  scoring: { value: 90, label: 'Calcul des scores' },
+  completed: { value: 100, label: 'Analyse terminée' },
+  failed: { value: 0, label: "Échec de l'analyse" },
+};
 
 export default function ContractDetailPage() {
   const params = useParams();
@@ -43,7 +55,16 @@ function ContractDetailContent({ contractId }: { contractId: string }) {
     error: contractError,
   } = getContract(contractId);
 
+  const { event: progressEvent, isStreaming } = useContractProgress(
+    contractId,
+    contract?.status === 'pending' || contract?.status === 'processing'
+  );
+
   const { data: status, error: statusError } = getContractStatus(contractId, (query) => {
+    // Avancement reçu en direct : pas de sondage
+    if (isStreaming) {
+      return false;
+    }
     const statusValue = query.state.data?.status ?? contract?.status;
     if (!statusValue) {
       return 5000;
@@ -62,6 +83,7 @@ function ContractDetailContent({ contractId }: { contractId: string }) {
 
   const [analysisProgress, setAnalysisProgress] = useState(0);
   const isAnalyzing = resolvedStatus === 'pending' || resolvedStatus === 'processing';
+  const stageProgress = progressEvent ? STAGE_PROGRESS[progressEvent.stage] : null;
 
   useEffect(() => {
     if (resolvedStatus === 'completed') {
@@ -74,6 +96,11 @@ function ContractDetailContent({ contractId }: { contractId: string }) {
       return;
     }
 
+    if (stageProgress) {
+      setAnalysisProgress(stageProgress.value);
+      return;
+    }
+
     const target = resolvedStatus === 'processing' ? 85 : 45;
     // Progression estimée : on avance par paliers tant que l'analyse est en cours.
     setAnalysisProgress((prev) => (prev === 0 ? 10 : prev));
@@ -86,7 +113,7 @@ function ContractDetailContent({ contractId }: { contractId: string }) {
     }, 1200);
 
     return () => clearInterval(interval);
-  }, [resolvedStatus, isAnalyzing]);
+  }, [resolvedStatus, isAnalyzing, stageProgress]);
 
   if (isLoadingContract) {
     return (
@@ -162,7 +189,11 @@ function ContractDetailContent({ contractId }: { contractId: string }) {
             </p>
             <div className="mt-3 space-y-1">
               <Progress value={analysisProgress} className="h-2" />
-              <p className="text-xs text-slate-500">Progression estimée : {analysisProgress}%</p>
+              <p className="text-xs text-slate-500">
+                {stageProgress
+                  ? `${stageProgress.label} : ${analysisProgress}%`
+                  : `Progression estimée : ${analysisProgress}%`}
+              </p>
             </div>
           </AlertDescription>
         </Alert>
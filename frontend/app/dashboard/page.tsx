@@ -7,7 +7,7 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Skeleton } from '@/components/ui/skeleton';
-import { useContracts } from '@/hooks/useContracts';
+import { useContracts, usePendingStatuses } from '@/hooks/useContracts';
 import { FileText, Upload, CheckCircle, Clock, AlertCircle, ArrowRight } from 'lucide-react';
 
 export default function DashboardPage() {
@@ -29,6 +29,7 @@ function DashboardContent() {
   const totalContracts = contracts.length;
   const completedContracts = contracts.filter((c) => c.status === 'completed').length;
   const pendingContracts = contracts.filter((c) => c.status === 'pending' || c.status === 'processing').length;
+  usePendingStatuses(pendingContracts);
   const recentContracts = contracts.slice(0, 5);
 
   return (
@@ -1,9 +1,10 @@
 'use client';
 
+import { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import type { UseQueryOptions } from '@tanstack/react-query';
 import { contractsApi } from '@/lib/api';
-import { AnalysisStatusResponse, Contract } from '@/types';
+import { AnalysisProgressEvent, AnalysisStatusResponse, Contract } from '@/types';
 
 const CONTRACTS_KEY = 'contracts';
 
@@ -67,3 +68,59 @@ export function useContracts() {
     getContractStatus,
   };
 }
+
+// Suit l'avancement d'une analyse via le flux SSE. Tant que `isStreaming` est vrai,
+// le sondage du statut est inutile ; si le flux est indisponible, il reprend.
+export function useContractProgress(id: string, enabled: boolean) {
+  const queryClient = useQueryClient();
+  const [event, setEvent] = useState<AnalysisProgressEvent | null>(null);
+  const [isStreaming, setIsStreaming] = useState(false);
+
+  useEffect(() => {
+    if (!id || !enabled) return;
+
+    const controller = new AbortController();
+    setIsStreaming(true);
+    contractsApi
+      .streamContractEvents(
+        id,
+        (next) => {
+          setEvent(next);
+          if (next.stage === 'completed' || next.stage === 'failed') {
+            // Contrat, statut et analyse rechargés une seule fois
+            queryClient.invalidateQueries({ queryKey: [CONTRACTS_KEY, id] });
+          }
+        },
+        controller.signal
+      )
+      .catch(() => undefined)
+      .finally(() => {
+        if (!controller.signal.aborted) setIsStreaming(false);
+      });
+
+    return () => controller.abort();
+  }, [id, enabled, queryClient]);
+
+  return { event, isStreaming };
+}
+
+// Suit les analyses non terminées du tableau de bord en une seule requête groupée ;
+// la liste des contrats est rechargée dès que l'une d'elles se termine.
+export function usePendingStatuses(pendingCount: number) {
+  const queryClient = useQueryClient();
+
+  const { data: statuses = [] } = useQuery({
+    queryKey: [CONTRACTS_KEY, 'statuses'],
+    queryFn: () => contractsApi.getContractStatuses(),
+    enabled: pendingCount > 0,
+    refetchInterval: 5000,
+  });
+
+  useEffect(() => {
+    if (pendingCount > 0 && statuses.length < pendingCount) {
+      queryClient.invalidateQueries({ queryKey: [CONTRACTS_KEY], exact: true });
+    }
+  }, [statuses, pendingCount, queryClient]);
+
+  return statuses;
+}
@@ -2,6 +2,7 @@ import axios, { AxiosError, AxiosInstance } from 'axios';
 import {
   Contract,
   Analysis,
+  AnalysisProgressEvent,
   AnalysisStatusResponse,
   User,
   LoginCredentials,
@@ -124,8 +125,51 @@ export const contractsApi = {
     return response.data;
   },
 
+  // Statuts de plusieurs contrats en une requête (par défaut, analyses non terminées)
+  getContractStatuses: async (ids?: string[]): Promise<AnalysisStatusResponse[]> => {
+    const response = await apiClient.post('/api/v1/contracts/statuses', {
+      contract_ids: ids ?? null,
+    });
+    return response.data;
+  },
+
   getContractAnalysis: async (id: string): Promise<Analysis> => {
     const response = await apiClient.get(`/api/v1/contracts/${id}/analysis`);
     return response.data;
   },
+
+  // Flux SSE de l'avancement (fetch plutôt qu'EventSource pour envoyer le jeton).
+  // Se termine après l'étape finale ; rejette si le flux est indisponible (503).
+  streamContractEvents: async (
+    id: string,
+    onEvent: (event: AnalysisProgressEvent) => void,
+    signal?: AbortSignal
+  ): Promise<void> => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE_URL}/api/v1/contracts/${id}/events`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Flux d'avancement indisponible (${response.status})`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) return;
+      buffer += value;
+      const messages = buffer.split('\n\n');
+      buffer = messages.pop() ?? '';
+      for (const message of messages) {
+        const data = message
+          .split('\n')
+          .filter((line) => line.startsWith('data: '))
+          .map((line) => line.slice('data: '.length))
+          .join('\n');
+        if (data) onEvent(JSON.parse(data) as AnalysisProgressEvent);
+      }
+    }
+  },
 };
@@ -47,6 +47,27 @@ export interface AnalysisStatusResponse {
   error_message?: string | null;
   created_at: string;
   updated_at: string;
+  queue_position?: number | null;
+}
+
+export type AnalysisStage =
+  | 'queued'
+  | 'extracting'
+  | 'searching_sources'
+  | 'calling_model'
+  | 'scoring'
+  | 'completed'
+  | 'failed';
+
+// Événement du flux GET /api/v1/contracts/{id}/events
+export interface AnalysisProgressEvent {
+  contract_id: string;
+  stage: AnalysisStage;
+  at: string;
+  queue_position?: number | null;
+  score_equity?: number | null;
+  score_clarity?: number | null;
+  error?: string | null;
 }
 
 export interface LoginCredentials {